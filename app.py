@@ -1,28 +1,43 @@
 import streamlit as st
 import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
+
+import calc_graph
+import charts
+import perf
 
 st.title("Samprama ROI Calculator")
 st.set_page_config(layout="wide")
 
+perf.begin("app.py")
+
+# The cascade lives in a per-session dependency graph: each input is set as
+# its widget is read and each figure is read from its graph node, so an
+# edit recomputes only the nodes downstream of the changed input.
+if "app_calc_graph" not in st.session_state:
+    st.session_state["app_calc_graph"] = calc_graph.margin_graph()
+model = st.session_state["app_calc_graph"]
+model.recomputed.clear()
+model.set(annual_iiot_cost=0.0)
+
 # User Inputs
 
 annual_turnover = st.number_input("Annual Turnover", min_value=0.0)
+model.set(annual_turnover=annual_turnover)
 
 # Profit 
 col_input, col_output = st.columns(2)
 
 with col_input:
  profit_margin = st.number_input("Profit Margin (%)", min_value=0.0)
+ model.set(profit_margin=profit_margin)
 
 with col_output:
- profit_from_margin = annual_turnover * (profit_margin / 100)
+ profit_from_margin = model["profit_from_margin"]
  st.metric("Profit (from margin)",f"{profit_from_margin:,.2f}")
     
 
 # Revenue
-revenue = annual_turnover - profit_from_margin
+revenue = model["revenue"]
 st.metric ("Revenue",f"{revenue:,.2f}")
 
 # Sales and Admin Cost
@@ -30,14 +45,15 @@ col_input, col_output = st.columns(2)
 
 with col_input:
  sales_admin_margin = st.number_input("Sales and Admin Margin (%)", min_value=0.0)
+ model.set(sales_admin_margin=sales_admin_margin)
 
 with col_output:
- sales_admin_percent = revenue * (sales_admin_margin / 100)
+ sales_admin_percent = model["sales_admin_cost"]
  st.metric("Sales and Admin Cost(from margin)",f"{sales_admin_percent:,.2f}")
     
 
 # Manufactring cost
-mfg_expense = revenue - sales_admin_percent
+mfg_expense = model["mfg_expense"]
 st.metric ("Manufacturing cost",f"{mfg_expense:,.2f}")
 
 # Material Cost
@@ -45,9 +61,10 @@ col_input, col_output = st.columns(2)
 
 with col_input:
  mat_margin = st.number_input("Material Margin (%)", min_value=0.0)
+ model.set(mat_margin=mat_margin)
 
 with col_output:
- mat_from_margin = mfg_expense * (mat_margin / 100)
+ mat_from_margin = model["mat_cost"]
  st.metric("Material Cost (from margin)",f"{mat_from_margin:,.2f}")
     
 
@@ -56,15 +73,19 @@ col_input, col_output = st.columns(2)
 
 with col_input:
  labor_margin = st.number_input("labor Margin (%)", min_value=0.0)
+ model.set(labor_margin=labor_margin)
 
 with col_output:
-  labor_from_margin = mfg_expense * (labor_margin / 100)
+  labor_from_margin = model["labor_cost"]
   st.metric("Labor Cost (from margin)",f"{labor_from_margin:,.2f}")
     
 
 # Capital Cost
 
 capital_cost = st.number_input("Capital Cost", min_value=0.0)
+model.set(capital_cost=capital_cost)
+
+perf.lap("margin cascade")
 
 
 before_col, mid_col, after_col = st.columns(3)
@@ -76,20 +97,21 @@ with before_col:
 # Production
 
 	units_per_year = st.number_input("Production units per year", min_value=1.0)
+	model.set(units_per_year=units_per_year)
 
-	cost_per_unit = mfg_expense / units_per_year
+	cost_per_unit = model["cost_per_unit"]
 	st.metric ("Cost per unit",f"{cost_per_unit:,.2f}")
 
-	prod_per_day = units_per_year / 300
+	prod_per_day = model["prod_per_day"]
 	st.metric ("Production per day (assuming 300 working days)", f"{prod_per_day:,.2f}")
 
-	mat_per_unit = mat_from_margin / units_per_year 
+	mat_per_unit = model["mat_per_unit"]
 	st.metric ("Material cost per piece",f"{mat_per_unit:,.2f}")
 
-	labor_per_unit = labor_from_margin / units_per_year
+	labor_per_unit = model["labor_per_unit"]
 	st.metric ("Labor cost per piece",f"{labor_per_unit:,.2f}")
 
-	fixed_per_unit = capital_cost*0.1/units_per_year
+	fixed_per_unit = model["fixed_per_unit"]
 	st.metric ("Fixed cost per piece",f"{fixed_per_unit:,.2f}")
 
 
@@ -101,39 +123,42 @@ with mid_col:
 	iiot_cost = st.number_input("Cost of Vsmart IIOT solution license", min_value=0.0)
 	imp_cost = st.number_input("Cost of implementation" , min_value=0.0)
 	prod_inc_per = st.number_input("Increase in production (in %)", min_value=0.0)
+	model.set(iiot_cost=iiot_cost, imp_cost=imp_cost, prod_inc_per=prod_inc_per)
 
 # After IIoT
 #-----------------After IIoT------------------
 
 with after_col:
 	st.subheader("After VSmart")
-	
+
 #Production after results
-	units_per_sol = units_per_year + (units_per_year*prod_inc_per /100)
+	units_per_sol = model["units_after"]
 	st.metric("New Production units per year",f"{units_per_sol:,.2f}", delta=f"{units_per_sol - units_per_year:,.0f}")
 
-	cost_per_sol = mfg_expense / units_per_sol
+	cost_per_sol = model["cost_per_unit_after"]
 	st.metric("New cost per unit",f"{cost_per_sol:,.2f}", delta=f"{cost_per_sol - cost_per_unit:,.0f}")
 
-	prod_per_sol = units_per_sol / 300
+	prod_per_sol = model["prod_per_day_after"]
 	st.metric("New production per day",f"{prod_per_sol:,.2f}", delta=f"{prod_per_sol - prod_per_day:,.0f}")
 
-	fixed_per_sol = (capital_cost*0.1)/units_per_sol
+	fixed_per_sol = model["fixed_per_unit_after"]
 	st.metric("New fixed cost per piece",f"{fixed_per_sol:,.2f}", delta=f"{fixed_per_sol - fixed_per_unit:,.0f}")
 
-	labor_per_sol = labor_from_margin/units_per_sol
+	labor_per_sol = model["labor_per_unit_after"]
 	st.metric("New labor cost",f"{labor_per_sol:,.2f}", delta=f"{labor_per_sol - labor_per_unit:,.0f}")
 	
-	savings_per_unit = ((labor_per_unit + fixed_per_unit) -(labor_per_sol + fixed_per_sol))
+	savings_per_unit = model["savings_per_unit"]
 	st.metric("Savings",f"{savings_per_unit:,.2f}")
 
-	overall_profit = profit_from_margin + (units_per_sol * savings_per_unit)
+	overall_profit = model["profit_after"]
 	st.metric("Overall improvement in profit",f"{overall_profit:,.2f}", delta=f"{overall_profit - profit_from_margin:,.0f}" )
+
+perf.lap("before / after metrics")
 	
 #-------------------- ROI , payback and NPV --------------------
 
-incremental_profit = overall_profit - profit_from_margin
-total_iiot_investment = iiot_cost + imp_cost
+incremental_profit = model["incremental_profit"]
+total_iiot_investment = model["total_iiot_investment"]
 #if total_iiot_investment > 0:
 #    roi_percent = (incremental_profit / total_iiot_investment) * 100
 #else:
@@ -161,295 +186,92 @@ total_iiot_investment = iiot_cost + imp_cost
 #st.metric("Net Present Value (NPV)", f"{npv:,.2f}")
 #----------------- Graphs ------------------------------
 
-df = pd.DataFrame({
-    "Scenario": ["Before IIoT", "After IIoT"],
-    "Profit": [profit_from_margin, overall_profit],
-    "Production": [units_per_year, units_per_sol]
-})
-	
-fig = go.Figure()
-
-# Profit (Bar)
-fig.add_trace(
-    go.Bar(
-        x=df["Scenario"],
-        y=df["Profit"],
-        name="Profit",
-        text=df["Profit"],
-        texttemplate="%{text:,.0f}",
-        textposition="outside",
-        yaxis="y1"
-    )
-)
-
-# Production (Line)
-fig.add_trace(
-    go.Scatter(
-        x=df["Scenario"],
-        y=df["Production"],
-        name="Production Units",
-        mode="lines+markers",
-        yaxis="y2"
-    )
-)
-
-# Layout FIXES
-fig.update_layout(
-    title="Before vs After IIoT: Profit & Production Impact",
-    height=500,
-    margin=dict(l=90, r=90, t=80, b=60), 
-
-    xaxis=dict(
-        title="Scenario"
-    ),
-
-    yaxis=dict(
-        title="Profit",
-        automargin=True,
-        showgrid=True
-    ),
-
-    yaxis2=dict(
-        title="Production Units",
-        overlaying="y",
-        side="right",
-        automargin=True,
-        position=1.0 
-    ),
-
-    legend=dict(
-        orientation="h",
-        yanchor="bottom",
-        y=-0.25,
-        xanchor="center",
-        x=0.5
-    )
-)
+fig = charts.impact_figure(profit_from_margin, overall_profit, units_per_year, units_per_sol)
+perf.lap("fig build")
 
 st.plotly_chart(fig, use_container_width=True)
+perf.lap("fig chart")
 # ---------------------------------------------------------------waterfall chart----------------------------------
 
-fig1 = go.Figure(
-    go.Waterfall(
-        name="Profit Bridge",
-        orientation="v",
-        measure=["absolute", "relative", "relative", "total"],
-        x=[
-            "Profit Before IIoT",
-            "Production Increase",
-            "Cost Reduction",
-            "Profit After IIoT"
-        ],
-        y=[
-            profit_from_margin,
-            units_per_sol,
-            savings_per_unit,
-            overall_profit
-        ],
-        text=[
-            f"{profit_from_margin:,.0f}",
-            f"+{units_per_sol:,.0f}",
-            f"+{savings_per_unit:,.0f}",
-            f"{overall_profit:,.0f}"
-        ],
-        textposition="outside",
-        connector={"line": {"width": 1}},
-    )
-)
-
-fig1.update_layout(
-    title="Profit Waterfall: Impact of IIoT Implementation",
-    height=500,
-    margin=dict(l=80, r=80, t=80, b=60),
-    yaxis_title="Profit",
-)
+fig1 = charts.profit_waterfall(profit_from_margin, units_per_sol, savings_per_unit, overall_profit)
+perf.lap("fig1 build")
 
 st.plotly_chart(fig1, use_container_width=True)
+perf.lap("fig1 chart")
 
 #----------------------------------------------- Over the years graph ---------------------------
-analysis_years_options = [3, 5, 7, 10]
-
-analysis_years = st.selectbox("Select Analysis Period (Years)",analysis_years_options,index=1)
-discount_rate = st.number_input("Discount Rate (%)",min_value=0.0,value=10.0) / 100
-
-years = list(range(0, analysis_years + 1))
-cash_flows = []
-
-for year in years:
-    if year == 0:
-        cash_flows.append(-total_iiot_investment)
-    else:
-        cash_flows.append(incremental_profit)
-
-cumulative_cashflow = []
-running_total = 0
-
-for cf in cash_flows:
-    running_total += cf
-    cumulative_cashflow.append(running_total)
-
-payback_year = 0
-for year, value in zip(years, cumulative_cashflow):
-    if value >= 0 and year != 0:
-        payback_year = year
-        break
-
-npv_by_year = []
-npv_running = 0
-
-for year, cf in zip(years, cash_flows):
-    if year == 0:
-        npv_running += cf
-    else:
-        npv_running += cf / ((1 + discount_rate) ** year)
-    npv_by_year.append(npv_running)
-
-
-roi_by_year = []
-
-for cum_cf in cumulative_cashflow:
-    if total_iiot_investment > 0:
-        roi_by_year.append((cum_cf / total_iiot_investment) * 100)
-    else:
-        roi_by_year.append(0)
-
-df_yearly = pd.DataFrame({
-    "Year": years,
-    "Annual Cash Flow": cash_flows,
-    "Cumulative Cash Flow": cumulative_cashflow,
-    "NPV": npv_by_year,
-    "ROI (%)": roi_by_year
-})
-
-st.subheader("Year-wise Financial Performance")
-st.dataframe(df_yearly)
-
-
-fig_cf = px.line(
-    df_yearly,
-    x="Year",
-    y="Cumulative Cash Flow",
-    title="Cumulative Cash Flow (Payback Analysis)",
-    markers=True
-)
-
-fig_cf.add_hline(y=0, line_dash="dash")
-
-st.plotly_chart(fig_cf, use_container_width=True)
-
-fig_npv = px.line(
-    df_yearly,
-    x="Year",
-    y="NPV",
-    title="NPV Evolution Over Time",
-    markers=True
-)
-
-fig_npv.add_hline(y=0, line_dash="dash")
-
-st.plotly_chart(fig_npv, use_container_width=True)
-
-fig_roi = px.line(
-    df_yearly,
-    x="Year",
-    y="ROI (%)",
-    title="ROI Growth Over Time",
-    markers=True
-)
-
-st.plotly_chart(fig_roi, use_container_width=True)
-
-#-------------------------------------------------- one graph for all 3 KPis -----------------------------------
-
-df_before = df_yearly[df_yearly["Year"] <= payback_year]
-df_after = df_yearly[df_yearly["Year"] >= payback_year]
-
-
-fig2 = go.Figure()
-
-# ---------- CUMULATIVE CASH FLOW ----------
-fig2.add_trace(
-    go.Scatter(
-        x=df_before["Year"],
-        y=df_before["Cumulative Cash Flow"],
-        name="Cumulative Cash Flow (Before BE)",
-        line=dict(color="red", width=3),
-        yaxis="y1"
-    )
-)
-
-fig2.add_trace(
-    go.Scatter(
-        x=df_after["Year"],
-        y=df_after["Cumulative Cash Flow"],
-        name="Cumulative Cash Flow (After BE)",
-        line=dict(color="green", width=3),
-        yaxis="y1"
-    )
-)
-
-# ---------- NPV ----------
-fig2.add_trace(
-    go.Scatter(
-        x=df_yearly["Year"],
-        y=df_yearly["NPV"],
-        name="NPV",
-        line=dict(color="blue", dash="dash"),
-        yaxis="y1"
-    )
-)
-
-# ---------- ROI ----------
-fig2.add_trace(
-    go.Scatter(
-        x=df_yearly["Year"],
-        y=df_yearly["ROI (%)"],
-        name="ROI (%)",
-        line=dict(color="orange", dash="dot"),
-        yaxis="y2"
-    )
-)
-
-# ---------- BREAK-EVEN MARKER ----------
-fig2.add_vline(
-    x=payback_year,
-    line_dash="dot",
-    line_width=2,
-    line_color="black",
-    annotation_text=f"Break-even Year {payback_year}",
-    annotation_position="top"
-)
-
-# ---------- LAYOUT ----------
-fig2.update_layout(
-    title="IIoT Investment Performance Over Time",
-    height=550,
-    margin=dict(l=80, r=80, t=80, b=60),
-
-    xaxis=dict(title="Year"),
-
-    yaxis=dict(
-        title="Cash Flow / NPV",
-        automargin=True
-    ),
-
-    yaxis2=dict(
-        title="ROI (%)",
-        overlaying="y",
-        side="right",
-        automargin=True
-    ),
-
-    legend=dict(
-        orientation="h",
-        yanchor="bottom",
-        y=-0.3,
-        xanchor="center",
-        x=0.5
-    )
-)
-
-st.plotly_chart(fig2, use_container_width=True)
+# The analysis period and discount rate only drive the year-wise table and
+# charts below, so this section reruns on its own when they change. The
+# calculation trace is drawn here too so it reflects fragment reruns; the
+# full run sets app_full_run, and a rerun of the fragment alone starts a
+# fresh recomputed list.
+@st.fragment
+def year_wise_performance(model):
+    perf.begin_fragment("year-wise performance")
+    if not st.session_state.pop("app_full_run", False):
+        model.recomputed.clear()
+    analysis_years_options = [3, 5, 7, 10]
+
+    analysis_years = st.selectbox("Select Analysis Period (Years)",analysis_years_options,index=1)
+    discount_rate = st.number_input("Discount Rate (%)",min_value=0.0,value=10.0) / 100
+
+    # Only the yearly node depends on these two inputs
+    model.set(analysis_years=analysis_years, discount_rate=discount_rate)
+    yearly = model["yearly"]
+
+    years = yearly["years"]
+    cash_flows = yearly["cash_flows"]
+    cumulative_cashflow = yearly["cumulative_cf"]
+    payback_year = yearly["payback_year"]
+    npv_by_year = yearly["npv_vals"]
+    roi_by_year = yearly["roi_vals"]
+    perf.lap("yearly cash flows")
+
+    df_yearly = pd.DataFrame({
+        "Year": years,
+        "Annual Cash Flow": cash_flows,
+        "Cumulative Cash Flow": cumulative_cashflow,
+        "NPV": npv_by_year,
+        "ROI (%)": roi_by_year
+    })
+
+    st.subheader("Year-wise Financial Performance")
+    st.dataframe(df_yearly)
+    perf.lap("df_yearly table")
+
+
+    fig_cf = charts.year_line("app.cumulative_cf", "Cumulative Cash Flow (Payback Analysis)", "Cumulative Cash Flow",
+                              years, cumulative_cashflow, zero_line=True)
+    st.plotly_chart(fig_cf, use_container_width=True)
+
+    fig_npv = charts.year_line("app.npv", "NPV Evolution Over Time", "NPV", years, npv_by_year, zero_line=True)
+    st.plotly_chart(fig_npv, use_container_width=True)
+
+    fig_roi = charts.year_line("app.roi", "ROI Growth Over Time", "ROI (%)", years, roi_by_year)
+    st.plotly_chart(fig_roi, use_container_width=True)
+    perf.lap("kpi line charts")
+
+    #-------------------------------------------------- one graph for all 3 KPis -----------------------------------
+    fig2 = charts.yearly_figure(years, cumulative_cashflow, npv_by_year, roi_by_year, payback_year)
+    st.plotly_chart(fig2, use_container_width=True)
+    perf.lap("fig2 chart")
+
+    # Which nodes this run recomputed, and which nodes each input feeds
+    with st.expander("Calculation trace"):
+        st.write("Recomputed this run:", ", ".join(model.recomputed) or "nothing")
+        trace = model.trace()
+        st.dataframe(pd.DataFrame({
+            "Input": list(trace),
+            "Feeds": [", ".join(nodes) for nodes in trace.values()]
+        }), hide_index=True)
+    perf.lap("calculation trace")
+    perf.end_fragment()
+
+
+st.session_state["app_full_run"] = True
+year_wise_performance(model)
+
+perf.report()
 
 
 
@@ -0,0 +1,245 @@
+import argparse
+import os
+import re
+import signal
+import struct
+import sys
+import time
+import zipfile
+import zlib
+from collections import deque
+
+import batch_score
+import parallel
+import portfolio
+import reports
+import roi_engine
+
+# --------------------------------------------------
+# BULK CUSTOMER REPORTS
+# --------------------------------------------------
+# Renders the new_app1.py customer report (reports.scenario_report) for
+# every row of a CSV / Parquet scenario file, e.g. a scored batch_score.py
+# output, into one zip archive. The file is read chunk by chunk and each
+# chunk is evaluated in one vectorized pass. The per-row documents are
+# rendered in batches on the process pool (each worker keeps its own
+# figure templates, so only the first report per worker builds figures)
+# and written into the zip as they come back, in row order, with at most
+# 2 x workers batches in flight: memory does not grow with the file.
+#
+# Members are named "<row>_<name>.<format>". Re-running on an existing
+# archive appends to it and skips the rows already in it, so an
+# interrupted run resumes where it stopped. Ctrl+C / SIGTERM close the
+# archive cleanly; after a hard kill the archive has no central directory
+# and is first rebuilt from its complete entries (salvage()). An archive
+# holds one format: resuming with another --format is refused, and
+# --overwrite starts again from scratch.
+#
+#   python batch_reports.py scored.csv reports.zip --workers 4
+#   python batch_reports.py prospects.parquet reports.zip --format xlsx --name-column Customer
+
+DEFAULT_BATCH_SIZE = 25
+
+# Seconds between progress lines
+REPORT_EVERY = 5
+
+
+def _slug(name):
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", str(name)).strip("_")[:60] or "report"
+
+
+def member_name(row, name, fmt):
+    return f"{row:06d}_{_slug(name)}.{fmt}"
+
+
+def _row_of(member):
+    head = member.split("_", 1)[0]
+    return int(head) if head.isdigit() else None
+
+
+class MixedArchive(Exception):
+    pass
+
+
+# Copies every complete stored entry of a zip whose central directory was
+# never written into a new archive; returns the number of entries kept.
+# Stored entries written by ZipFile.writestr carry their size and CRC in
+# the local header, so the file can be walked from the start.
+_LOCAL_HEADER = struct.Struct("<4sHHHHHIIIHH")
+
+
+def salvage(path):
+    kept = 0
+    tmp = path + ".salvage"
+    with open(path, "rb") as f, zipfile.ZipFile(tmp, "w", compression=zipfile.ZIP_STORED) as out:
+        while True:
+            header = f.read(_LOCAL_HEADER.size)
+            if len(header) < _LOCAL_HEADER.size or header[:4] != b"PK\x03\x04":
+                break
+            _, _, _, method, _, _, crc, size, _, name_length, extra_length = _LOCAL_HEADER.unpack(header)
+            name = f.read(name_length).decode("utf-8")
+            f.read(extra_length)
+            data = f.read(size)
+            if method != zipfile.ZIP_STORED or len(data) < size or zlib.crc32(data) != crc:
+                break
+            out.writestr(name, data)
+            kept += 1
+    os.replace(tmp, path)
+    return kept
+
+
+# An archive written to the end closes with its end-of-central-directory
+# record (no comment). Without it, zipfile searches back up to 64 KB and
+# can open the end record of an xlsx document (itself a zip) instead.
+_END_RECORD = struct.Struct("<4sHHHHIIH")
+
+
+def _complete(path):
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() < _END_RECORD.size:
+            return False
+        f.seek(-_END_RECORD.size, os.SEEK_END)
+        record = _END_RECORD.unpack(f.read(_END_RECORD.size))
+    return record[0] == b"PK\x05\x06" and record[-1] == 0
+
+
+# Rows already rendered as fmt; an archive with reports in another format
+# raises MixedArchive
+def done_rows(path, fmt):
+    if not os.path.exists(path):
+        return set()
+    if not _complete(path):
+        print(f"Recovered {salvage(path):,} reports from the incomplete archive {path}", file=sys.stderr)
+    with zipfile.ZipFile(path) as archive:
+        members = [name for name in archive.namelist() if _row_of(name) is not None]
+
+    other = sorted({os.path.splitext(name)[1].lstrip(".") for name in members} - {fmt})
+    if other:
+        raise MixedArchive(f"{path} holds {', '.join(other)} reports; use --overwrite to start a new {fmt} archive")
+    return {_row_of(name) for name in members}
+
+
+# One chunk of the file -> [(member name, report)] for the rows not done
+# yet. Columns are roi_engine.INPUT_FIELDS (missing ones and blank cells
+# take the defaults, as in batch_score.py).
+def chunk_reports(df, first_row, fmt, name_column, analysis_years, discount_rate, skip=()):
+    n = len(df)
+    inputs = batch_score.chunk_inputs(df)
+    result = roi_engine.evaluate_inputs(inputs, analysis_years=analysis_years, discount_rate=discount_rate)
+    names = df[name_column].astype(str).tolist() if name_column in df else [f"Row {first_row + i + 1}" for i in range(n)]
+
+    items = []
+    for i in range(n):
+        row = first_row + i
+        if row in skip:
+            continue
+        report = reports.scenario_report(roi_engine.scenario(result, i), analysis_years,
+                                         float(inputs["annual_iiot_cost"][i]), subtitle=names[i])
+        items.append((member_name(row, names[i], fmt), report))
+    return items
+
+
+def render_batch(items, fmt):
+    return [(name, reports.render(report, fmt)) for name, report in items]
+
+
+def _batches(input_path, fmt, name_column, analysis_years, discount_rate, skip, chunk_size, batch_size):
+    first_row = 0
+    for chunk in batch_score.read_chunks(input_path, chunk_size):
+        items = chunk_reports(chunk, first_row, fmt, name_column, analysis_years, discount_rate, skip)
+        first_row += len(chunk)
+        for start in range(0, len(items), batch_size):
+            yield items[start:start + batch_size]
+
+
+class _Progress:
+
+    def __init__(self, skipped):
+        self.skipped = skipped
+        self.written = 0
+        self.started = self.last = time.perf_counter()
+
+    def rate(self):
+        return self.written / max(time.perf_counter() - self.started, 1e-9)
+
+    def add(self, count):
+        self.written += count
+        now = time.perf_counter()
+        if now - self.last >= REPORT_EVERY:
+            self.last = now
+            print(f"{self.written:,} reports ({self.rate():,.1f} reports/s)", file=sys.stderr)
+
+
+def _stop(signum, frame):
+    raise KeyboardInterrupt
+
+
+def render_file(input_path, output_path, fmt="pdf", workers=1, name_column=portfolio.NAME_COLUMN,
+                analysis_years=5, discount_rate=0.10, chunk_size=batch_score.DEFAULT_CHUNK_SIZE,
+                batch_size=DEFAULT_BATCH_SIZE, overwrite=False):
+    if fmt not in reports.available_formats():
+        raise ImportError(f"{reports.FORMATS[fmt][0]} export needs one of: {', '.join(reports.FORMATS[fmt][2])}")
+    if overwrite and os.path.exists(output_path):
+        os.remove(output_path)
+
+    skip = done_rows(output_path, fmt)
+    progress = _Progress(len(skip))
+    batches = _batches(input_path, fmt, name_column, analysis_years, discount_rate, skip, chunk_size, batch_size)
+
+    # Documents are already compressed (PDF streams, xlsx is itself a zip)
+    with zipfile.ZipFile(output_path, "a", compression=zipfile.ZIP_STORED) as archive:
+        def write(documents):
+            for name, data in documents:
+                archive.writestr(name, data)
+            progress.add(len(documents))
+
+        if workers <= 1:
+            for items in batches:
+                write(render_batch(items, fmt))
+        else:
+            pool = parallel.get_pool(workers)
+            pending = deque()
+            try:
+                for items in batches:
+                    pending.append(pool.submit(render_batch, items, fmt))
+                    if len(pending) >= 2 * workers:
+                        write(pending.popleft().result())
+                while pending:
+                    write(pending.popleft().result())
+            finally:
+                for future in pending:
+                    future.cancel()
+    return progress
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render a customer ROI report for every row of a scenario file.")
+    parser.add_argument("input", help="CSV or Parquet file of scenarios (e.g. batch_score.py output)")
+    parser.add_argument("output", help="zip archive to write; an existing one is resumed")
+    parser.add_argument("--format", choices=list(reports.FORMATS), default="pdf", help="document format")
+    parser.add_argument("--workers", type=int, default=parallel.WORKERS, help="worker processes")
+    parser.add_argument("--name-column", default=portfolio.NAME_COLUMN, help="column printed on each report")
+    parser.add_argument("--analysis-years", type=int, default=5, help="analysis period in years")
+    parser.add_argument("--discount-rate", type=float, default=10.0, help="discount rate in %%")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="reports per worker task")
+    parser.add_argument("--overwrite", action="store_true", help="start a new archive instead of resuming")
+    args = parser.parse_args(argv)
+
+    signal.signal(signal.SIGTERM, _stop)
+    try:
+        progress = render_file(args.input, args.output, fmt=args.format, workers=args.workers,
+                               name_column=args.name_column, analysis_years=args.analysis_years,
+                               discount_rate=args.discount_rate / 100, batch_size=args.batch_size,
+                               overwrite=args.overwrite)
+    except KeyboardInterrupt:
+        print(f"Interrupted; run again with the same arguments to resume {args.output}", file=sys.stderr)
+        sys.exit(130)
+    except MixedArchive as exc:
+        parser.error(str(exc))
+    print(f"Rendered {progress.written:,} reports ({progress.skipped:,} already done) -> {args.output}"
+          f" at {progress.rate():,.1f} reports/s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+import parallel
+import roi_engine
+
+# --------------------------------------------------
+# HEADLESS BATCH SCORING
+# --------------------------------------------------
+# Streams a CSV or Parquet file of plant scenarios through the new_app1.py
+# model chunk by chunk and writes the input rows back out with the scored
+# columns appended (irr / payback_period / discounted_payback are empty
+# where undefined). Input columns are named after roi_engine.INPUT_FIELDS;
+# any that are missing, and blank cells in the others, fall back to the
+# new_app1.py defaults, as in the calculator form.
+#
+#   python batch_score.py plants.csv scored.csv --workers 4
+#   python batch_score.py plants.parquet scored.parquet --analysis-years 7
+
+OUTPUT_FIELDS = ("profit_after", "net_annual_benefit", "npv", "roi", "irr",
+                 "payback_year", "payback_period", "discounted_payback")
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+# {field: array} for every roi_engine.INPUT_FIELDS; missing columns and
+# blank cells take the calculator defaults
+def chunk_inputs(df):
+    return {
+        field: df[field].fillna(roi_engine.DEFAULT_INPUTS[field]).to_numpy(dtype=float) if field in df
+        else np.full(len(df), roi_engine.DEFAULT_INPUTS[field])
+        for field in roi_engine.INPUT_FIELDS
+    }
+
+
+# The chunk's rows are sharded over the parallel.py pool (workers > 1):
+# its input columns are shared once and each task evaluates chunk_size rows.
+def score_chunk(df, analysis_years=5, discount_rate=0.10, workers=1, chunk_size=None):
+    inputs = chunk_inputs(df)
+    result = parallel.evaluate(inputs, analysis_years, discount_rate, fields=OUTPUT_FIELDS,
+                               workers=workers, chunk_size=chunk_size)
+
+    scored = df.copy()
+    for field in OUTPUT_FIELDS:
+        scored[field] = result[field]
+    # 0 means "not recovered" inside the engine; leave those rows empty
+    scored["payback_year"] = scored["payback_year"].astype("Int64").mask(scored["payback_year"] == 0)
+    return scored
+
+
+def _is_parquet(path):
+    return os.path.splitext(path)[1].lower() in (".parquet", ".pq")
+
+
+# Always yields at least one chunk, so an empty input (no rows, or an empty
+# CSV without even a header) still produces an output file.
+def read_chunks(path, chunk_size):
+    empty = True
+    if _is_parquet(path):
+        import pyarrow.parquet as pq
+
+        parquet = pq.ParquetFile(path)
+        for batch in parquet.iter_batches(batch_size=chunk_size):
+            empty = False
+            yield batch.to_pandas()
+        if empty:
+            yield parquet.schema_arrow.empty_table().to_pandas()
+    else:
+        try:
+            for chunk in pd.read_csv(path, chunksize=chunk_size):
+                empty = False
+                yield chunk
+        except pd.errors.EmptyDataError:
+            pass
+        if empty:
+            yield pd.DataFrame()
+
+
+# CSV chunks infer their column types one chunk at a time: an integer
+# column turns float in a chunk with a blank cell, and a column that is
+# blank throughout a chunk comes out as float (or untyped). A Parquet file
+# has one schema, so it is fixed from the first chunk and every later chunk
+# is cast to it: integer input columns are widened to float64, and blank
+# ones become float64 for model inputs and string otherwise. The scored
+# columns always come out of the engine with the same types.
+def _parquet_schema(table):
+    import pyarrow as pa
+
+    fields = []
+    for field, column in zip(table.schema, table.columns):
+        blank = len(table) == 0 or column.null_count == len(table)
+        if field.name in OUTPUT_FIELDS:
+            pass
+        elif pa.types.is_integer(field.type) or (blank and field.name in roi_engine.INPUT_FIELDS):
+            field = field.with_type(pa.float64())
+        elif blank:
+            field = field.with_type(pa.string())
+        fields.append(field)
+    return pa.schema(fields, metadata=table.schema.metadata)
+
+
+class ChunkWriter:
+
+    def __init__(self, path):
+        self.path = path
+        self.parquet = _is_parquet(path)
+        self.writer = None
+        self.rows = 0
+
+    def write(self, df):
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self.writer is None:
+                self.writer = pq.ParquetWriter(self.path, _parquet_schema(table))
+            self.writer.write_table(table.cast(self.writer.schema))
+        else:
+            df.to_csv(self.path, mode="w" if self.rows == 0 else "a", header=self.rows == 0, index=False)
+        self.rows += len(df)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+# The file is read workers x chunk_size rows at a time and each block is
+# split into one chunk_size task per worker, so memory stays bounded
+# however large the input file is.
+def score_file(input_path, output_path, chunk_size=DEFAULT_CHUNK_SIZE, workers=1,
+               analysis_years=5, discount_rate=0.10):
+    writer = ChunkWriter(output_path)
+    try:
+        for block in read_chunks(input_path, chunk_size * max(workers, 1)):
+            writer.write(score_chunk(block, analysis_years, discount_rate, workers, chunk_size))
+    finally:
+        writer.close()
+    return writer.rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a CSV/Parquet file of plant scenarios with the ROI model.")
+    parser.add_argument("input", help="CSV or Parquet file of scenarios")
+    parser.add_argument("output", help="CSV or Parquet file to write (format from extension)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="rows per chunk")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes (default: 1, in-process)")
+    parser.add_argument("--analysis-years", type=int, default=5, help="analysis period in years")
+    parser.add_argument("--discount-rate", type=float, default=10.0, help="discount rate in %%")
+    args = parser.parse_args(argv)
+
+    rows = score_file(args.input, args.output, chunk_size=args.chunk_size, workers=args.workers,
+                      analysis_years=args.analysis_years, discount_rate=args.discount_rate / 100)
+    print(f"Scored {rows:,} scenarios -> {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
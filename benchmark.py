@@ -0,0 +1,300 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+import batch_reports
+import goal_seek
+import line_results
+import parallel
+import portfolio
+import pricing_optimizer
+import reports
+import roi_engine
+import scenario_compare
+
+# --------------------------------------------------
+# BENCHMARK SUITE
+# --------------------------------------------------
+# Times the calculation engine, DataFrame / Plotly figure construction and
+# full headless page runs, and appends the results to a JSON history file
+# so that a slowdown shows up against the previous commit.
+#
+#   python benchmark.py                 # full suite
+#   python benchmark.py --quick         # skip the 1M / 10k cases and AppTest
+#   python benchmark.py --compare       # print the change vs. the last entry
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_HISTORY = os.path.join(HERE, "bench_history.json")
+PAGES = ("app.py", "new_app.py", "new_app1.py", "example.py", "portfolio_app.py")
+
+REGRESSION_THRESHOLD = 1.2
+
+
+def time_call(fn, repeat=5, min_time=0.2):
+    # Run at least once and until min_time has elapsed, keep the per-call times
+    fn()
+    times = []
+    start = time.perf_counter()
+    while len(times) < repeat or time.perf_counter() - start < min_time:
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+        if len(times) >= 1000:
+            break
+    return {"best": min(times), "median": float(np.median(times)), "runs": len(times)}
+
+
+def _scenarios(n, seed=0):
+    rng = np.random.default_rng(seed)
+    inputs = {f: np.full(n, v) for f, v in roi_engine.DEFAULT_INPUTS.items()}
+    inputs["annual_turnover"] = rng.uniform(5e5, 5e6, n)
+    inputs["prod_inc_per"] = rng.uniform(0, 40, n)
+    inputs["annual_iiot_cost"] = rng.uniform(0, 5e4, n)
+    return inputs
+
+
+def _lines(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(100, 200, n), rng.uniform(50, 100, n), rng.integers(100, 1000, n).astype(float)
+
+
+# --------------------------------------------------
+# CASES
+# --------------------------------------------------
+def core_cases(quick):
+    cases = {}
+    for n in (1, 1_000) if quick else (1, 1_000, 1_000_000):
+        inputs = _scenarios(n)
+        cases[f"core.evaluate[{n}]"] = lambda inputs=inputs: roi_engine.evaluate_inputs(inputs, solve_irr=False)
+        cases[f"core.evaluate_irr[{n}]"] = lambda inputs=inputs: roi_engine.evaluate_inputs(inputs)
+
+    for n in (1, 1_000) if quick else (1, 1_000, 10_000):
+        inputs = _scenarios(n)
+        cases[f"core.monthly_30y[{n}]"] = lambda inputs=inputs: roi_engine.monthly_cash_flows(
+            inputs["iiot_cost"] + inputs["imp_cost"], inputs["annual_turnover"] * 0.05, inputs["annual_iiot_cost"],
+            30, 0.10, ramp_months=12, cost_escalation=0.03)
+
+    for n in (10, 100, 1_000) if quick else (10, 100, 1_000, 10_000):
+        price, cost, units = _lines(n)
+        cases[f"lines.value_added[{n}]"] = (
+            lambda price=price, cost=cost, units=units: roi_engine.line_value_added(price, cost, units, [5.0, 3.0, 2.0]))
+
+    base = dict(roi_engine.DEFAULT_INPUTS, discount_rate=0.10)
+    for n in (1, 200) if quick else (1, 200, 10_000):
+        targets = np.linspace(0.25, 4.5, n)
+        cases[f"seek.payback_curve[{n}]"] = lambda targets=targets: goal_seek.seek(
+            base, "prod_inc_per", "payback_period", targets)
+
+    rows = [{"Scenario": f"Scenario {i}", "prod_inc_per": p} for i, p in enumerate(np.linspace(0, 40, 50))]
+    cases["compare.evaluate[50]"] = lambda: scenario_compare.evaluate(base, rows, analysis_years=10)
+
+    if not quick:
+        inputs = _scenarios(1_000_000)
+        for workers in sorted({1, parallel.WORKERS}):
+            cases[f"parallel.evaluate[1000000 x {workers}w]"] = (
+                lambda inputs=inputs, workers=workers: parallel.evaluate(inputs, workers=workers))
+
+    for n in (100,) if quick else (100, 1_000):
+        customers = portfolio.sample_portfolio(n)
+        cases[f"pricing.optimize[{n}x1000]"] = lambda customers=customers: pricing_optimizer.optimize(
+            customers, prices=pricing_optimizer.price_grid(10))
+    return cases
+
+
+def frame_cases(quick):
+    import pandas as pd
+
+    calc = roi_engine.scenario(roi_engine.evaluate_inputs(roi_engine.DEFAULT_INPUTS, analysis_years=10))
+    price, cost, units = _lines(10 if quick else 10_000)
+    lines = roi_engine.line_value_added(price, cost, units, [5.0, 3.0])
+    n_table = 1_000 if quick else 100_000
+    table = line_results.LineTable(roi_engine.line_value_added(*_lines(n_table), [5.0, 3.0, 2.0]))
+
+    def df_yearly():
+        return pd.DataFrame({
+            "Year": calc["years"],
+            "Cumulative Cash Flow": calc["cumulative_cf"],
+            "NPV": calc["npv_vals"],
+            "ROI (%)": calc["roi_vals"]
+        })
+
+    return {
+        "frames.df_yearly": df_yearly,
+        f"frames.line_table[{len(lines['value_added'])}]": lambda: line_results.LineTable(lines).frame(),
+        f"frames.line_page[{n_table}]": lambda: table.frame(0, line_results.PAGE_SIZE),
+    }
+
+
+# Figure construction mirrors the investment-performance figure and the
+# comparison bar charts the pages build.
+def figure_cases(quick):
+    import pandas as pd
+    import plotly.graph_objects as go
+
+    calc = roi_engine.scenario(roi_engine.evaluate_inputs(roi_engine.DEFAULT_INPUTS, analysis_years=10))
+    df_yearly = pd.DataFrame({
+        "Year": calc["years"],
+        "Cumulative Cash Flow": calc["cumulative_cf"],
+        "NPV": calc["npv_vals"],
+        "ROI (%)": calc["roi_vals"]
+    })
+    df_compare = pd.DataFrame({
+        "Scenario": ["Before IIoT", "After IIoT"],
+        "Profit": [calc["profit_from_margin"], calc["profit_after"]]
+    })
+
+    def investment_figure():
+        fig = go.Figure()
+        fig.add_bar(x=df_yearly["Year"], y=df_yearly["Cumulative Cash Flow"], name="Cumulative Cash Flow")
+        fig.add_scatter(x=df_yearly["Year"], y=df_yearly["NPV"], name="NPV")
+        fig.add_scatter(x=df_yearly["Year"], y=df_yearly["ROI (%)"], name="ROI (%)", yaxis="y2")
+        fig.add_vline(x=calc["payback_year"], line_dash="dash")
+        fig.update_layout(yaxis2=dict(title="ROI (%)", overlaying="y", side="right"), height=500)
+        return fig
+
+    def comparison_bar():
+        return go.Figure(go.Bar(x=df_compare["Scenario"], y=df_compare["Profit"], text=df_compare["Profit"],
+                                texttemplate="%{text:,.0f}", textposition="outside", cliponaxis=False,
+                                marker_color=["#9ecae1", "#2ca02c"]))
+
+    fig = investment_figure()
+
+    cases = {
+        "figures.investment_go": investment_figure,
+        "figures.comparison_go": comparison_bar,
+        "figures.to_json": fig.to_json,
+    }
+
+    report = reports.investment_report(
+        "IIoT Investment Report", [("NPV", calc["npv"], "{:,.0f}")], calc,
+        reports.waterfall("Annual Profit Bridge", ["Before", "Increase", "After"],
+                          [calc["profit_from_margin"], calc["incremental_profit"], calc["profit_after"]],
+                          ["absolute", "relative", "total"]))
+    for fmt in reports.available_formats():
+        cases[f"reports.render_{fmt}"] = lambda fmt=fmt: reports.render(report, fmt)
+
+    # 25 rows of a scored file, rendered on one worker's figure templates
+    scored = portfolio.sample_portfolio(25)
+    items = batch_reports.chunk_reports(scored, 0, "pdf", portfolio.NAME_COLUMN, 5, 0.10)
+    if "pdf" in reports.available_formats():
+        cases["reports.render_batch[25]"] = lambda: batch_reports.render_batch(items, "pdf")
+    return cases
+
+
+# Cold start of the compute and CLI modules in a fresh interpreter: none of
+# them may pull in streamlit, plotly or (except the file-based CLIs) pandas.
+STARTUP_MODULES = ("roi_engine", "monte_carlo", "sensitivity", "goal_seek", "parallel",
+                   "scenario_compare", "line_results", "batch_score", "batch_reports", "pricing_optimizer")
+
+
+def startup_cases(quick):
+    return {
+        f"startup.{module}": lambda module=module: subprocess.run(
+            [sys.executable, "-c", f"import {module}"], cwd=HERE, check=True)
+        for module in STARTUP_MODULES
+    }
+
+
+def page_cases(quick):
+    if quick:
+        return {}
+    from streamlit.testing.v1 import AppTest
+
+    return {
+        f"page.{page}": lambda page=page: AppTest.from_file(os.path.join(HERE, page), default_timeout=120).run()
+        for page in PAGES
+    }
+
+
+# --------------------------------------------------
+# HISTORY
+# --------------------------------------------------
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_history(path, history):
+    with open(path, "w") as f:
+        json.dump(history, f, indent=2)
+
+
+def compare(previous, current, threshold=REGRESSION_THRESHOLD):
+    rows = []
+    for name, result in current["results"].items():
+        before = previous["results"].get(name)
+        if before is None:
+            continue
+        ratio = result["best"] / before["best"] if before["best"] else float("inf")
+        rows.append((name, before["best"], result["best"], ratio, ratio > threshold))
+    return rows
+
+
+def run(quick=False, select=None):
+    groups = (core_cases, frame_cases, figure_cases, startup_cases, page_cases)
+    results = {}
+    for group in groups:
+        for name, fn in group(quick).items():
+            if select and select not in name:
+                continue
+            results[name] = time_call(fn, repeat=3 if name.startswith(("page.", "startup.")) else 5)
+            print(f"{name:<40} best {results[name]['best'] * 1000:>10.3f} ms"
+                  f"   median {results[name]['median'] * 1000:>10.3f} ms", file=sys.stderr)
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "quick": quick,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the ROI calculator.")
+    parser.add_argument("--quick", action="store_true", help="skip the largest cases and the AppTest page runs")
+    parser.add_argument("--select", help="only run cases whose name contains this text")
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="JSON history file to append to")
+    parser.add_argument("--no-save", action="store_true", help="do not append this run to the history")
+    parser.add_argument("--compare", action="store_true", help="compare with the last entry in the history")
+    args = parser.parse_args(argv)
+
+    history = load_history(args.history)
+    entry = run(quick=args.quick, select=args.select)
+
+    regressions = []
+    if args.compare and history:
+        for name, before, after, ratio, regressed in compare(history[-1], entry):
+            flag = "  REGRESSION" if regressed else ""
+            print(f"{name:<40} {before * 1000:>10.3f} -> {after * 1000:>10.3f} ms  x{ratio:.2f}{flag}")
+            if regressed:
+                regressions.append(name)
+
+    if not args.no_save:
+        history.append(entry)
+        save_history(args.history, history)
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
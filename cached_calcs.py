@@ -0,0 +1,182 @@
+import io
+
+import streamlit as st
+import pandas as pd
+
+import line_results
+import perf
+import portfolio
+import result_cache
+import roi_engine
+import sensitivity
+
+# --------------------------------------------------
+# CACHE SETTINGS
+# --------------------------------------------------
+# Each stage keeps at most CACHE_MAX_ENTRIES results (oldest evicted first)
+# and drops anything older than CACHE_TTL seconds.
+CACHE_MAX_ENTRIES = 512
+CACHE_TTL = 60 * 60
+
+cached = st.cache_data(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+
+# Stages of plain numeric inputs also go through the on-disk result cache,
+# so a scenario computed by any server process is not computed again by
+# another (st.cache_data above stays the per-process fast path).
+persistent = result_cache.persistent(depends=(roi_engine, line_results, sensitivity))
+
+
+# --------------------------------------------------
+# new_app.py / new_app1.py STAGES
+# --------------------------------------------------
+# Stage 1 depends only on the plant inputs; stage 2 only on the investment,
+# the annual benefit and the sidebar settings. Moving the discount rate
+# slider therefore re-runs stage 2 alone.
+@cached
+@persistent
+def margin_cascade(annual_turnover, profit_margin, sales_admin_margin, mat_margin,
+                   labor_margin, units_per_year, capital_cost, prod_inc_per):
+    return roi_engine.scenario(roi_engine.margin_cascade(
+        annual_turnover, profit_margin, sales_admin_margin, mat_margin,
+        labor_margin, units_per_year, capital_cost, prod_inc_per))
+
+
+@cached
+@persistent
+def yearly_cash_flows(total_iiot_investment, net_annual_benefit, analysis_years, discount_rate):
+    yearly = roi_engine.scenario(roi_engine.yearly_cash_flows(
+        total_iiot_investment, net_annual_benefit, analysis_years, discount_rate))
+
+    with perf.stage("df_yearly build"):
+        yearly["df_yearly"] = pd.DataFrame({
+            "Year": yearly["years"],
+            "Cumulative Cash Flow": yearly["cumulative_cf"],
+            "NPV": yearly["npv_vals"],
+            "ROI (%)": yearly["roi_vals"]
+        })
+    return yearly
+
+
+@cached
+@persistent
+def monthly_cash_flows(total_iiot_investment, incremental_profit, annual_iiot_cost, analysis_years,
+                       discount_rate, ramp_months, ramp_shape, cost_escalation):
+    monthly = roi_engine.scenario(roi_engine.monthly_cash_flows(
+        total_iiot_investment, incremental_profit, annual_iiot_cost, analysis_years,
+        discount_rate, ramp_months, ramp_shape, cost_escalation))
+
+    with perf.stage("df_monthly build"):
+        monthly["df_monthly"] = pd.DataFrame({
+            "Month": monthly["months"],
+            "Cash Flow": monthly["cash_flows"],
+            "Cumulative Cash Flow": monthly["cumulative_cf"],
+            "NPV": monthly["npv_vals"],
+            "ROI (%)": monthly["roi_vals"]
+        })
+    return monthly
+
+
+@cached
+def compare_frame(profit_before, profit_after, units_before, units_after):
+    return pd.DataFrame({
+        "Scenario": ["Before IIoT", "After IIoT"],
+        "Profit": [profit_before, profit_after],
+        "Production": [units_before, units_after]
+    })
+
+
+# --------------------------------------------------
+# example.py STAGES
+# --------------------------------------------------
+LINE_FIELDS = roi_engine.LINE_FIELDS
+
+
+# Line files carry one row per production line with LINE_FIELDS columns and
+# an optional "Line" name column; missing value columns count as 0, the same
+# as an unselected metric on the manual-entry form.
+def _read_table(data, file_name):
+    buffer = io.BytesIO(data)
+    if file_name.lower().endswith((".parquet", ".pq")):
+        return pd.read_parquet(buffer)
+    return pd.read_csv(buffer)
+
+
+@cached
+def read_line_file(data, file_name):
+    df = _read_table(data, file_name)
+
+    lines = pd.DataFrame({
+        "Line": df["Line"].astype(str) if "Line" in df else [f"Line {i + 1}" for i in range(len(df))]
+    })
+    for field in LINE_FIELDS:
+        lines[field] = pd.to_numeric(df[field], errors="coerce").fillna(0.0) if field in df else 0.0
+    return lines
+
+
+@cached
+@persistent
+def line_value_added(avg_unit_price, avg_unit_cost, prod_unit, incremental_pcts, line_names=None):
+    lines = roi_engine.line_value_added(avg_unit_price, avg_unit_cost, prod_unit, incremental_pcts)
+    return {
+        "table": line_results.LineTable(lines, line_names),
+        "step_value_added": lines["step_value_added"].tolist(),
+        "total_old_profit": lines["total_old_profit"],
+        "total_annual_benefit": lines["total_annual_benefit"],
+    }
+
+
+@cached
+@persistent
+def plant_investment(net_annual_cashflow, investment_cost, total_annual_benefit,
+                     analysis_years, discount_rate):
+    return roi_engine.plant_investment(net_annual_cashflow, investment_cost, total_annual_benefit,
+                                       analysis_years, discount_rate)
+
+
+# --------------------------------------------------
+# new_app1.py SENSITIVITY STAGES
+# --------------------------------------------------
+# Keyed on the inputs each chart depends on, so changing the tornado metric
+# does not recompute the heatmap grid and the heatmap settings do not
+# recompute the tornado. The two-way grid (up to 500 x 500 scenarios, tens
+# of MB) stays in the process cache and is not written to disk.
+@cached
+@persistent
+def one_way_sensitivity(base_inputs, spread_pct, analysis_years):
+    return sensitivity.one_way(base_inputs, spread_pct=spread_pct, analysis_years=analysis_years)
+
+
+@cached
+def two_way_sensitivity(base_inputs, x_field, y_field, spread_pct, grid_size, analysis_years):
+    return sensitivity.two_way(
+        base_inputs,
+        x_field, sensitivity.value_range(base_inputs[x_field], spread_pct, grid_size, x_field),
+        y_field, sensitivity.value_range(base_inputs[y_field], spread_pct, grid_size, y_field),
+        analysis_years=analysis_years
+    )
+
+
+# --------------------------------------------------
+# portfolio_app.py STAGES
+# --------------------------------------------------
+# Plants are scored once per file / settings; filtering and grouping work
+# on the scored table and only re-run the (cheap) consolidation.
+@cached
+def read_portfolio_file(data, file_name):
+    return portfolio.normalize(_read_table(data, file_name))
+
+
+@cached
+def sample_portfolio(n_plants, seed=0):
+    return portfolio.sample_portfolio(n_plants, seed)
+
+
+@cached
+def evaluate_portfolio(plants, analysis_years, discount_rate):
+    return portfolio.evaluate(plants, analysis_years, discount_rate)
+
+
+@cached
+def consolidate_portfolio(scored, by, analysis_years, discount_rate):
+    totals, group_flows = portfolio.consolidate(scored, by, analysis_years, discount_rate)
+    return totals, {key: group_flows[key] for key in ("years", "cumulative_cf", "npv_vals")}
@@ -0,0 +1,236 @@
+import inspect
+
+import numpy as np
+
+import roi_engine
+
+# --------------------------------------------------
+# DEPENDENCY GRAPH
+# --------------------------------------------------
+# Named inputs and nodes; a node is a function whose parameter names are
+# the nodes / inputs it reads, so the graph is declared by the functions
+# themselves and nodes must be added after everything they read (the
+# insertion order is a topological order).
+#
+# Values are memoized. Every input write and every node result that
+# actually changed gets a new stamp from a clock; reading a node walks only
+# its own upstream nodes and recomputes those with a dependency stamped
+# after their last computation. An input change therefore recomputes only
+# its downstream nodes, and a recomputed node whose value did not change
+# stops the propagation there.
+#
+# Recomputed node names are appended to .recomputed (cleared by the caller)
+# and trace() maps every input to the nodes it feeds.
+def _same(a, b):
+    if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        return np.array_equal(a, b)
+    try:
+        return bool(a == b)
+    except (TypeError, ValueError):
+        return False
+
+
+class CalcGraph:
+
+    def __init__(self):
+        self._functions = {}
+        self._deps = {}
+        self._upstream = {}
+        self._order = []
+        self._values = {}
+        self._changed_at = {}
+        self._computed_at = {}
+        self._clock = 0
+        self.recomputed = []
+
+    def input(self, *names):
+        for name in names:
+            self._add(name, None, ())
+
+    def node(self, fn=None, name=None):
+        if fn is None:
+            return lambda f: self.node(f, name)
+        self._add(name or fn.__name__, fn, tuple(inspect.signature(fn).parameters))
+        return fn
+
+    def _add(self, name, fn, deps):
+        if name in self._deps:
+            raise ValueError(f"{name} is already defined")
+        missing = [d for d in deps if d not in self._deps]
+        if missing:
+            raise ValueError(f"{name} reads undefined {', '.join(missing)}")
+        self._functions[name] = fn
+        self._deps[name] = deps
+        self._upstream[name] = set(deps).union(*(self._upstream[d] for d in deps))
+        self._order.append(name)
+
+    # --------------------------------------------------
+    # VALUES
+    # --------------------------------------------------
+    def set(self, **values):
+        for name, value in values.items():
+            if self._functions.get(name, 0) is not None:
+                raise KeyError(f"{name} is not an input")
+            if name in self._values and _same(self._values[name], value):
+                continue
+            self._clock += 1
+            self._values[name] = value
+            self._changed_at[name] = self._clock
+
+    def get(self, name):
+        needed = self._upstream[name] | {name}
+        for node in self._order:
+            if node not in needed:
+                continue
+            fn = self._functions[node]
+            if fn is None:
+                if node not in self._values:
+                    raise KeyError(f"input {node} has not been set")
+                continue
+            computed_at = self._computed_at.get(node)
+            if computed_at is not None and all(self._changed_at[d] <= computed_at for d in self._deps[node]):
+                continue
+
+            value = fn(*(self._values[d] for d in self._deps[node]))
+            self._clock += 1
+            self._computed_at[node] = self._clock
+            self.recomputed.append(node)
+            if computed_at is None or not _same(self._values[node], value):
+                self._values[node] = value
+                self._changed_at[node] = self._clock
+        return self._values[name]
+
+    __getitem__ = get
+
+    def values(self, *names):
+        return {name: self.get(name) for name in names or self.nodes()}
+
+    # --------------------------------------------------
+    # INTROSPECTION
+    # --------------------------------------------------
+    def inputs(self):
+        return [name for name in self._order if self._functions[name] is None]
+
+    def nodes(self):
+        return [name for name in self._order if self._functions[name] is not None]
+
+    def dependencies(self, name):
+        return self._deps[name]
+
+    # Inputs a node reads, directly or through other nodes
+    def upstream_inputs(self, name):
+        return [n for n in self._order if n in self._upstream[name] and self._functions[n] is None]
+
+    # Nodes an input or node feeds, in evaluation order
+    def downstream(self, name):
+        return [n for n in self._order if name in self._upstream[n]]
+
+    # {input: nodes it touches} for every input
+    def trace(self):
+        return {name: self.downstream(name) for name in self.inputs()}
+
+
+# --------------------------------------------------
+# MARGIN CASCADE GRAPH (app.py / new_app.py)
+# --------------------------------------------------
+# The same formulas as roi_engine.margin_cascade(), one node per
+# intermediate figure, followed by the investment and the yearly cash
+# flows. Scalars in, scalars out; roi_engine stays the batch path.
+def margin_graph():
+    graph = CalcGraph()
+    graph.input(*roi_engine.INPUT_FIELDS, "analysis_years", "discount_rate")
+
+    @graph.node
+    def profit_from_margin(annual_turnover, profit_margin):
+        return annual_turnover * profit_margin / 100
+
+    @graph.node
+    def revenue(annual_turnover, profit_from_margin):
+        return annual_turnover - profit_from_margin
+
+    @graph.node
+    def sales_admin_cost(revenue, sales_admin_margin):
+        return revenue * sales_admin_margin / 100
+
+    @graph.node
+    def mfg_expense(revenue, sales_admin_cost):
+        return revenue - sales_admin_cost
+
+    @graph.node
+    def mat_cost(mfg_expense, mat_margin):
+        return mfg_expense * mat_margin / 100
+
+    @graph.node
+    def labor_cost(mfg_expense, labor_margin):
+        return mfg_expense * labor_margin / 100
+
+    @graph.node
+    def annual_capital_amort(capital_cost):
+        return capital_cost / roi_engine.AMORTISATION_YEARS
+
+    @graph.node
+    def cost_per_unit(mfg_expense, units_per_year):
+        return mfg_expense / units_per_year
+
+    @graph.node
+    def mat_per_unit(mat_cost, units_per_year):
+        return mat_cost / units_per_year
+
+    @graph.node
+    def fixed_per_unit(annual_capital_amort, units_per_year):
+        return annual_capital_amort / units_per_year
+
+    @graph.node
+    def labor_per_unit(labor_cost, units_per_year):
+        return labor_cost / units_per_year
+
+    @graph.node
+    def prod_per_day(units_per_year):
+        return units_per_year / roi_engine.WORKING_DAYS
+
+    @graph.node
+    def units_after(units_per_year, prod_inc_per):
+        return units_per_year * (1 + prod_inc_per / 100)
+
+    @graph.node
+    def cost_per_unit_after(mfg_expense, units_after):
+        return mfg_expense / units_after
+
+    @graph.node
+    def prod_per_day_after(units_after):
+        return units_after / roi_engine.WORKING_DAYS
+
+    @graph.node
+    def fixed_per_unit_after(annual_capital_amort, units_after):
+        return annual_capital_amort / units_after
+
+    @graph.node
+    def labor_per_unit_after(labor_cost, units_after):
+        return labor_cost / units_after
+
+    @graph.node
+    def savings_per_unit(labor_per_unit, fixed_per_unit, labor_per_unit_after, fixed_per_unit_after):
+        return (labor_per_unit + fixed_per_unit) - (labor_per_unit_after + fixed_per_unit_after)
+
+    @graph.node
+    def profit_after(profit_from_margin, units_after, savings_per_unit):
+        return profit_from_margin + (units_after * savings_per_unit)
+
+    @graph.node
+    def incremental_profit(profit_after, profit_from_margin):
+        return profit_after - profit_from_margin
+
+    @graph.node
+    def total_iiot_investment(iiot_cost, imp_cost):
+        return iiot_cost + imp_cost
+
+    @graph.node
+    def net_annual_benefit(incremental_profit, annual_iiot_cost):
+        return incremental_profit - annual_iiot_cost
+
+    @graph.node
+    def yearly(total_iiot_investment, net_annual_benefit, analysis_years, discount_rate):
+        return roi_engine.scenario(roi_engine.yearly_cash_flows(
+            total_iiot_investment, net_annual_benefit, analysis_years, discount_rate))
+
+    return graph
@@ -0,0 +1,259 @@
+import numpy as np
+import plotly.graph_objects as go
+import streamlit as st
+from plotly.colors import qualitative
+from plotly.subplots import make_subplots
+
+import scenario_compare
+
+# --------------------------------------------------
+# FIGURE TEMPLATES
+# --------------------------------------------------
+# Building a figure (make_subplots, layout validation) costs far more than
+# the data it carries. Each view's figure is built once per session from
+# its template function; later reruns only update the trace arrays and the
+# few layout fields that depend on the inputs. This saves server time only:
+# st.plotly_chart still sends the whole figure spec on every rerun.
+MAX_POINTS = 200
+
+SCENARIO_COLORS = qualitative.Dark24
+
+
+def figure(name, build):
+    templates = st.session_state.setdefault("_chart_templates", {})
+    fig = templates.get(name)
+    if fig is None:
+        fig = templates[name] = build()
+    return fig
+
+
+def set_traces(fig, traces, **layout):
+    with fig.batch_update():
+        for trace, values in zip(fig.data, traces):
+            trace.update(values)
+        if layout:
+            fig.update_layout(**layout)
+    return fig
+
+
+# Min/max decimation: long series (e.g. monthly horizons) are cut to about
+# max_points per trace keeping each bucket's extremes and both end points,
+# so peaks and the break-even crossing survive.
+def downsample(x, y, max_points=MAX_POINTS):
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n <= max_points:
+        return x, y
+
+    buckets = max_points // 2
+    size = -(-n // buckets)
+    padded = np.pad(y, (0, buckets * size - n), mode="edge").reshape(buckets, size)
+    offsets = np.arange(buckets) * size
+    idx = np.concatenate([padded.argmin(axis=1) + offsets, padded.argmax(axis=1) + offsets, [0, n - 1]])
+    idx = np.unique(np.minimum(idx, n - 1))
+    return x[idx], y[idx]
+
+
+def _line(x, y, max_points=MAX_POINTS):
+    x, y = downsample(x, y, max_points)
+    return {"x": x, "y": y}
+
+
+# --------------------------------------------------
+# app.py VIEWS
+# --------------------------------------------------
+def _impact_template():
+    fig = go.Figure()
+    fig.add_bar(name="Profit", texttemplate="%{text:,.0f}", textposition="outside", yaxis="y1")
+    fig.add_scatter(name="Production Units", mode="lines+markers", yaxis="y2")
+    fig.update_layout(
+        title="Before vs After IIoT: Profit & Production Impact",
+        height=500,
+        margin=dict(l=90, r=90, t=80, b=60),
+        xaxis=dict(title="Scenario"),
+        yaxis=dict(title="Profit", automargin=True, showgrid=True),
+        yaxis2=dict(title="Production Units", overlaying="y", side="right", automargin=True, position=1.0),
+        legend=dict(orientation="h", yanchor="bottom", y=-0.25, xanchor="center", x=0.5)
+    )
+    return fig
+
+
+# Profit bar with the production units on a second axis
+def impact_figure(profit_before, profit_after, units_before, units_after):
+    scenarios = ["Before IIoT", "After IIoT"]
+    return set_traces(figure("app.impact", _impact_template), [
+        {"x": scenarios, "y": [profit_before, profit_after], "text": [profit_before, profit_after]},
+        {"x": scenarios, "y": [units_before, units_after]},
+    ])
+
+
+def _waterfall_template():
+    fig = go.Figure(go.Waterfall(
+        name="Profit Bridge",
+        orientation="v",
+        measure=["absolute", "relative", "relative", "total"],
+        x=["Profit Before IIoT", "Production Increase", "Cost Reduction", "Profit After IIoT"],
+        textposition="outside",
+        connector={"line": {"width": 1}},
+    ))
+    fig.update_layout(
+        title="Profit Waterfall: Impact of IIoT Implementation",
+        height=500,
+        margin=dict(l=80, r=80, t=80, b=60),
+        yaxis_title="Profit",
+    )
+    return fig
+
+
+def profit_waterfall(profit_before, units_after, savings_per_unit, profit_after):
+    return set_traces(figure("app.waterfall", _waterfall_template), [{
+        "y": [profit_before, units_after, savings_per_unit, profit_after],
+        "text": [f"{profit_before:,.0f}", f"+{units_after:,.0f}", f"+{savings_per_unit:,.0f}", f"{profit_after:,.0f}"]
+    }])
+
+
+# One KPI over the years with markers, the look of px.line(markers=True)
+# without loading plotly.express
+def year_line(name, title, label, years, values, zero_line=False, max_points=MAX_POINTS):
+    def build():
+        fig = go.Figure(go.Scatter(mode="lines+markers", showlegend=False,
+                                   hovertemplate=f"Year=%{{x}}<br>{label}=%{{y}}<extra></extra>"))
+        if zero_line:
+            fig.add_hline(y=0, line_dash="dash")
+        fig.update_layout(title=title, xaxis=dict(title="Year"), yaxis=dict(title=label))
+        return fig
+
+    return set_traces(figure(name, build), [_line(years, values, max_points)])
+
+
+def _yearly_template():
+    fig = go.Figure()
+    fig.add_scatter(name="Cumulative Cash Flow (Before BE)", line=dict(color="red", width=3), yaxis="y1")
+    fig.add_scatter(name="Cumulative Cash Flow (After BE)", line=dict(color="green", width=3), yaxis="y1")
+    fig.add_scatter(name="NPV", line=dict(color="blue", dash="dash"), yaxis="y1")
+    fig.add_scatter(name="ROI (%)", line=dict(color="orange", dash="dot"), yaxis="y2")
+    fig.update_layout(
+        title="IIoT Investment Performance Over Time",
+        height=550,
+        margin=dict(l=80, r=80, t=80, b=60),
+        xaxis=dict(title="Year"),
+        yaxis=dict(title="Cash Flow / NPV", automargin=True),
+        yaxis2=dict(title="ROI (%)", overlaying="y", side="right", automargin=True),
+        legend=dict(orientation="h", yanchor="bottom", y=-0.3, xanchor="center", x=0.5)
+    )
+    return fig
+
+
+# Cumulative cash flow (split at break-even), NPV and ROI on one chart, with
+# the break-even year marked
+def yearly_figure(years, cumulative_cf, npv_vals, roi_vals, payback_year, max_points=MAX_POINTS):
+    years = np.asarray(years)
+    cumulative_cf = np.asarray(cumulative_cf, dtype=float)
+    before = years <= payback_year
+    after = years >= payback_year
+
+    shapes = [dict(type="line", xref="x", yref="paper", x0=payback_year, x1=payback_year,
+                   y0=0, y1=1, line=dict(dash="dot", width=2, color="black"))]
+    annotations = [dict(text=f"Break-even Year {payback_year}", xref="x", yref="paper",
+                        x=payback_year, y=1.0, showarrow=False, yanchor="bottom")]
+
+    return set_traces(figure("app.yearly", _yearly_template), [
+        _line(years[before], cumulative_cf[before], max_points),
+        _line(years[after], cumulative_cf[after], max_points),
+        _line(years, npv_vals, max_points),
+        _line(years, roi_vals, max_points),
+    ], shapes=shapes, annotations=annotations)
+
+
+# --------------------------------------------------
+# new_app1.py VIEWS
+# --------------------------------------------------
+# Two labelled bars (before / after, benefit / cost); one trace coloured per
+# bar, the same look as px.bar(color=...) without loading plotly.express
+def comparison_bars(name, title, categories, values, x_title, y_title, colors=None):
+    def build():
+        fig = go.Figure(go.Bar(texttemplate="%{text:,.0f}", textposition="outside", cliponaxis=False,
+                               marker_color=colors))
+        fig.update_layout(title=title, xaxis=dict(title=x_title), yaxis=dict(title=y_title),
+                          height=400, showlegend=False)
+        return fig
+
+    return set_traces(figure(name, build), [{"x": categories, "y": values, "text": values}])
+
+
+def _compare_template():
+    fig = make_subplots(
+        rows=2, cols=1,
+        shared_xaxes=True,
+        vertical_spacing=0.08,
+        subplot_titles=("Cumulative Cash Flow", "NPV")
+    )
+    # One cash flow / NPV pair per scenario slot, sharing a legend entry;
+    # unused slots stay hidden
+    for i in range(scenario_compare.MAX_SCENARIOS):
+        color = SCENARIO_COLORS[i % len(SCENARIO_COLORS)]
+        fig.add_scatter(mode="lines+markers", line=dict(color=color), visible=False, row=1, col=1)
+        fig.add_scatter(mode="lines+markers", line=dict(color=color, dash="dash"), showlegend=False,
+                        visible=False, row=2, col=1)
+    fig.add_hline(y=0, line_dash="dot", line_color="gray", row=1, col=1)
+    fig.add_hline(y=0, line_dash="dot", line_color="gray", row=2, col=1)
+    fig.update_layout(
+        title="Scenario Comparison",
+        height=750,
+        legend=dict(orientation="h", y=-0.12),
+        hovermode="x unified"
+    )
+    fig.update_xaxes(title_text="Year", row=2, col=1)
+    fig.update_yaxes(title_text="Cash Flow", row=1, col=1)
+    fig.update_yaxes(title_text="NPV", row=2, col=1)
+    return fig
+
+
+# Every scenario's cumulative cash flow and NPV overlaid in one figure;
+# cumulative_cf / npv_vals hold one row per scenario
+def scenario_overlay(names, years, cumulative_cf, npv_vals):
+    fig = figure("new_app1.compare", _compare_template)
+    traces = []
+    for i in range(scenario_compare.MAX_SCENARIOS):
+        if i < len(names):
+            group = dict(name=names[i], legendgroup=f"scenario{i}", visible=True)
+            traces.append(dict(group, x=years, y=cumulative_cf[i]))
+            traces.append(dict(group, x=years, y=npv_vals[i]))
+        else:
+            traces.extend([dict(visible=False, x=[], y=[])] * 2)
+    return set_traces(fig, traces)
+
+
+def _monthly_template():
+    fig = go.Figure()
+    fig.add_scatter(name="Cumulative Cash Flow", line=dict(color="#4CAF50", width=3))
+    fig.add_scatter(name="NPV", line=dict(color="#1f77b4", dash="dash"))
+    fig.add_hline(y=0, line_dash="dot", line_color="gray")
+    fig.update_layout(
+        title="Monthly Cash Flow",
+        xaxis=dict(title="Year"),
+        yaxis=dict(title="Cash Flow / NPV"),
+        legend=dict(orientation="h", y=-0.25),
+        height=500
+    )
+    return fig
+
+
+# Month axis shown in years; long horizons are decimated per trace
+def monthly_figure(months, cumulative_cf, npv_vals, payback_month, max_points=MAX_POINTS):
+    years = np.asarray(months) / 12
+
+    fig = figure("new_app1.monthly", _monthly_template)
+    shapes = list(fig.layout.shapes[:1])
+    annotations = []
+    if payback_month:
+        shapes.append(dict(type="line", xref="x", yref="paper", x0=payback_month / 12, x1=payback_month / 12,
+                           y0=0, y1=1, line=dict(dash="dash", color="red")))
+        annotations.append(dict(text=f"Break-even (month {payback_month})", xref="x", yref="paper",
+                                x=payback_month / 12, y=1.0, showarrow=False, yanchor="bottom"))
+
+    return set_traces(fig, [
+        _line(years, cumulative_cf, max_points),
+        _line(years, npv_vals, max_points),
+    ], shapes=shapes, annotations=annotations)
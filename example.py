@@ -1,7 +1,16 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
-import plotly.express as px
+
+import cached_calcs
+import goal_seek
+import goal_seek_panel
+import line_results
+import perf
+import report_panel
+import reports
+import scenario_panel
 
 # --------------------------------------------------
 # PAGE CONFIG
@@ -11,6 +20,8 @@ st.set_page_config(
     layout="wide"
 )
 
+perf.begin("example.py")
+
 st.title("SAMPRAMA FINANCIAL CALCULATOR")
 
 # --------------------------------------------------
@@ -18,17 +29,17 @@ st.title("SAMPRAMA FINANCIAL CALCULATOR")
 # --------------------------------------------------
 with st.sidebar:
     st.header("Global Settings")
-    revenue = st.number_input("Annual Revenue",min_value=0.0, value = 1_000_000.0) 
-    num_lines = st.selectbox("Number of Production Lines", [1,2,3,4,5,6,7,8,9,10], index=0)
-    analysis_years = st.selectbox("Analysis Period (Years)", [3, 5, 7, 10], index=1)
-    discount_rate = st.slider("Discount Rate (%)", 5, 20, 10) / 100
+    revenue = st.number_input("Annual Revenue",min_value=0.0, value = 1_000_000.0, key="revenue") 
+    num_lines = st.selectbox("Number of Production Lines", [1,2,3,4,5,6,7,8,9,10], index=0, key="num_lines")
+    analysis_years = st.selectbox("Analysis Period (Years)", [3, 5, 7, 10], index=1, key="analysis_years")
+    discount_rate = st.slider("Discount Rate (%)", 5, 20, 10, key="discount_rate_pct") / 100
 
     st.header("IIoT Cost")
-    iiot_cost = st.number_input("IIoT License Cost", min_value=0.0, value=50_000.0)
-    imp_cost = st.number_input("Implementation Cost", min_value=0.0, value=25_000.0)
+    iiot_cost = st.number_input("IIoT License Cost", min_value=0.0, value=50_000.0, key="iiot_cost")
+    imp_cost = st.number_input("Implementation Cost", min_value=0.0, value=25_000.0, key="imp_cost")
    # prod_inc_per = st.number_input("Production Increase (%)", min_value=0.0, value=15.0)
 
-    num_increments = st.selectbox("Production Increase", [1,2,3,4,5], index=0)
+    num_increments = st.selectbox("Production Increase", [1,2,3,4,5], index=0, key="num_increments")
     cols = st.columns(num_increments)
     incremental_pcts = []
 
@@ -38,17 +49,18 @@ with st.sidebar:
             f"(%)",min_value=-100.0,max_value=100.0,value=0.0,step=0.5,format="%.2f", key=f"prod_inc_{i}")
             incremental_pcts.append(pct)
 
-    annual_iiot_cost = st.number_input("License fee/Annual cost",min_value=0.0,value=10000.00)
+    annual_iiot_cost = st.number_input("License fee/Annual cost",min_value=0.0,value=10000.00, key="annual_iiot_cost")
 
     
 
 # --------------------------------------------------
 # TABS STRUCTURE
 # --------------------------------------------------
-tab1, tab2, tab3 = st.tabs([
+tab1, tab2, tab3, tab4 = st.tabs([
     "Metrics Selection",
     "Financial Inputs",
-    "Investment Analysis"
+    "Investment Analysis",
+    "Goal Seek"
 ])
 
 #AVAILABLE_METRICS = {
@@ -97,12 +109,12 @@ with tab1:
        # default=["Production Volume", "Average Cost", "Average Price"]
    # )
 
-    production_selected = st.checkbox("Production Volume")
-    avg_cost_selected = st.checkbox("Average Cost")
-    avg_price_selected = st.checkbox("Average Price")
-    downtime_selected = st.checkbox("Downtime Reduction")
-    maintenance_selected = st.checkbox("Maintenance Cost")
-    labor_selected = st.checkbox("Labor Cost")
+    production_selected = st.checkbox("Production Volume", key="production_selected")
+    avg_cost_selected = st.checkbox("Average Cost", key="avg_cost_selected")
+    avg_price_selected = st.checkbox("Average Price", key="avg_price_selected")
+    downtime_selected = st.checkbox("Downtime Reduction", key="downtime_selected")
+    maintenance_selected = st.checkbox("Maintenance Cost", key="maintenance_selected")
+    labor_selected = st.checkbox("Labor Cost", key="labor_selected")
 
     selected_metrics = []
 
@@ -131,9 +143,9 @@ selected = st.session_state.get("selected_metrics", [])
 with tab2:
     st.header("Financial Inputs")
     
-    avg_unit_price = []
-    avg_unit_cost = []
-    prod_unit = [] 
+    avg_unit_price = np.zeros(num_lines)
+    avg_unit_cost = np.zeros(num_lines)
+    prod_unit = np.zeros(num_lines)
     downtime_before = 0
     maintenance_before = 0
     labor_before = 0
@@ -145,18 +157,69 @@ with tab2:
     
     if "Downtime Reduction" in selected:
        with col1:
-         downtime_before = st.number_input(f"Current Downtime (in months)",value=0)
-         downtime_new = st.number_input(f"Downtime period after IIOT (in months)", value=0)
+         downtime_before = st.number_input(f"Current Downtime (in months)",value=0, key="downtime_before")
+         downtime_new = st.number_input(f"Downtime period after IIOT (in months)", value=0, key="downtime_new")
     if "Maintenance Cost" in selected:
        with col2:
-         maintenance_before = st.number_input(f"Maintenance Cost (in %)")
-         maintenance_pct = st.number_input(f"Maintenance cost after IIOT (in %)")
+         maintenance_before = st.number_input(f"Maintenance Cost (in %)", key="maintenance_before")
+         maintenance_pct = st.number_input(f"Maintenance cost after IIOT (in %)", key="maintenance_pct")
     if "Labor Cost" in selected:
        with col3:
-         labor_before = st.number_input(f"Labor Cost (in %)")
-         labor_pct = st.number_input(f"Labor cost after IIOT (in %)")
-
-    for i in range(num_lines):
+         labor_before = st.number_input(f"Labor Cost (in %)", key="labor_before")
+         labor_pct = st.number_input(f"Labor cost after IIOT (in %)", key="labor_pct")
+
+    line_source = st.radio("Line Data", ["Enter manually", "Line table"], horizontal=True, key="line_source")
+
+    line_names = None
+
+    if line_source == "Line table":
+        line_file = st.file_uploader(
+            "Load lines from CSV or Parquet (avg_unit_price, avg_unit_cost, prod_unit columns)",
+            type=["csv", "parquet"]
+        )
+
+        if line_file is not None and st.session_state.get("line_file_id") != line_file.file_id:
+            st.session_state["line_file_id"] = line_file.file_id
+            st.session_state["line_table"] = cached_calcs.read_line_file(line_file.getvalue(), line_file.name)
+            st.session_state.pop("line_editor", None)
+
+        if "line_table" not in st.session_state:
+            st.session_state["line_table"] = pd.DataFrame({
+                "Line": [f"Line {i + 1}" for i in range(num_lines)],
+                "avg_unit_price": 100.0,
+                "avg_unit_cost": 100.0,
+                "prod_unit": 100.0
+            })
+
+        st.caption("Edit cells in place, paste rows copied from a spreadsheet, or add/delete rows at the bottom of the table.")
+
+        df_lines = st.data_editor(
+            st.session_state["line_table"],
+            num_rows="dynamic",
+            key="line_editor",
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                "Line": st.column_config.TextColumn("Line"),
+                "avg_unit_price": st.column_config.NumberColumn("Average Unit Price", min_value=0.0, format="%.2f"),
+                "avg_unit_cost": st.column_config.NumberColumn("Average Unit Cost", min_value=0.0, format="%.2f"),
+                "prod_unit": st.column_config.NumberColumn("Average Production Units", min_value=0, format="%d")
+            }
+        )
+
+        df_lines = df_lines.fillna({field: 0.0 for field in cached_calcs.LINE_FIELDS})
+        # Only keep per-row names when some line was actually renamed; blank
+        # and default "Line N" names are generated on demand by LineTable.
+        names = df_lines["Line"].astype("string").fillna("").to_numpy(dtype=object)
+        default_names = np.char.add("Line ", np.arange(1, len(names) + 1).astype(str)).astype(object)
+        blank = names == ""
+        if not (blank | (names == default_names)).all():
+            line_names = np.where(blank, default_names, names)
+        avg_unit_price = df_lines["avg_unit_price"].to_numpy()
+        avg_unit_cost = df_lines["avg_unit_cost"].to_numpy()
+        prod_unit = df_lines["prod_unit"].to_numpy()
+
+    for i in range(num_lines if line_source == "Enter manually" else 0):
         with st.expander(f"Line {i + 1} Details", expanded=(i == 0)):
 
           col1, col2, col3 = st.columns(3)
@@ -165,58 +228,36 @@ with tab2:
                price = st.number_input(f"Average Unit Price (Line {i + 1})",min_value=0.0,value=100.0,key=f"avg_unit_price_{i}")
           else:
                price = 0.0
-          avg_unit_price.append(price)  
+          avg_unit_price[i] = price
           if "Average Cost" in selected:
              with col2:
                cost = st.number_input(f"Average Unit Cost (Line {i + 1})", min_value=0.0,value=100.0, key=f"avg_unit_cost_{i}")
           else:
                cost = 0.0
-          avg_unit_cost.append(cost)  
+          avg_unit_cost[i] = cost
           if "Production Volume" in selected:
              with col3:
                units = st.number_input(f"Average Production Units (Line {i + 1})", min_value=0,value=100,key=f"prod_unit_{i}") 
           else:
                units = 0
-          prod_unit.append(units)  
+          prod_unit[i] = units
+
+perf.lap("widget read")
 
 #=====================================================
 # CORE CALUCALTIONS
 #=====================================================
 
-value_added_per_line = []
-results = []
-total_old_profit = 0
-#total_new_profit = 0
-step_value_added = [0] * len(incremental_pcts)
-
-for i in range(num_lines):
-    unit_profit = avg_unit_price[i] - avg_unit_cost[i]
-    old_units = prod_unit[i]
-    new_units = old_units
-    for idx,pct in enumerate(incremental_pcts):
-        new_units *= (1 + pct / 100)
-        inc_units = new_units - old_units 
-        step_value_added[idx] += inc_units * unit_profit
-    #new_units = old_units * (1 + prod_inc_per/100)
-    incremental_units = new_units - old_units
-
-    old_profit = old_units * unit_profit
-    total_old_profit += old_profit
-    value_added = incremental_units * unit_profit
-    #new_profit = new_units * unit_profit
-    #total_new_profit += new_profit
-
-    value_added_per_line.append(value_added)
-    
-    results.append({
-        "Line": f"Line {i + 1}",
-        "Unit Profit": unit_profit,
-        "Old Units": old_units,
-        "New Units": new_units,
-        "Incremental Units": incremental_units,
-        "Value Added": value_added
-        #"Old Profit": old_profit
-    })
+if line_source == "Line table":
+    line_state = st.session_state.setdefault("line_results", line_results.LineResults())
+    lines = line_state.update(avg_unit_price, avg_unit_cost, prod_unit, incremental_pcts, line_names)
+else:
+    lines = cached_calcs.line_value_added(avg_unit_price, avg_unit_cost, prod_unit, incremental_pcts)
+
+line_table = lines["table"]
+step_value_added = lines["step_value_added"]
+total_old_profit = lines["total_old_profit"]
+total_annual_benefit = lines["total_annual_benefit"]
 
 
 benefit = []
@@ -231,6 +272,8 @@ save_labor = old_labor - new_labor
 
 total_savings = save_maint + save_labor
 
+perf.lap("core calculations")
+
 #benefit.append({"Old Maintenance": old_maint,
 #                "New Maintenance": new_maint,
 #                "Maintenance Benefit": save_maint,
@@ -241,13 +284,21 @@ total_savings = save_maint + save_labor
 #    })
                 
 
-df_value_added = pd.DataFrame(results)
 #df_savings = pd.DataFrame(benefit)
 
 with tab2:
    st.header("Value Added After IIoT")
+   page_start = 0
+   page_size = line_results.PAGE_SIZE
+   if len(line_table) > page_size:
+       n_pages = -(-len(line_table) // page_size)
+       if st.session_state.get("value_added_page", 1) > n_pages:
+           st.session_state["value_added_page"] = n_pages
+       page = st.number_input(f"Page (of {n_pages:,})", min_value=1, max_value=n_pages, value=1, key="value_added_page")
+       page_start = (page - 1) * page_size
+       st.caption(f"Lines {page_start + 1:,}-{min(page_start + page_size, len(line_table)):,} of {len(line_table):,}")
    st.dataframe(
-    df_value_added.style.format({
+    line_table.frame(page_start, page_start + page_size).style.format({
         "Unit Profit": "{:,.2f}",
         "Old Units": "{:,.0f}",
         "New Units": "{:,.0f}",
@@ -256,6 +307,7 @@ with tab2:
     }),
     use_container_width=True
 )
+   perf.lap("value added table")
  
 
    st.header("Savings After IIoT")
@@ -264,6 +316,7 @@ with tab2:
    matrix_index = ["Maintenance" , "Labor" ]
    df_matrix = pd.DataFrame(matrix_data,columns=matrix_cols,index=matrix_index)
    st.dataframe(df_matrix.style.format("{:,.2f}"), use_container_width=True)
+   perf.lap("savings table")
 
 
       
@@ -280,23 +333,18 @@ with tab2:
 #    use_container_width=True
 #)
 
-total_annual_benefit = sum(value_added_per_line)
 net_annual_cashflow = total_annual_benefit - annual_iiot_cost + total_savings
 investment_cost = iiot_cost + imp_cost
 
+investment = cached_calcs.plant_investment(
+    net_annual_cashflow, investment_cost, total_annual_benefit, analysis_years, discount_rate
+)
 
-years = list(range(1, analysis_years + 1))
-
-pv_cashflows = [
-    net_annual_cashflow / ((1 + discount_rate) ** y)
-    for y in years
-]
-npv = sum(pv_cashflows) - investment_cost
-roi_percent = (sum(pv_cashflows) / investment_cost) * 100 if investment_cost else 0
+npv = investment["npv"]
+roi_percent = investment["roi_percent"]
+payback_months = investment["payback_months"]
 
-avg_annual_pv = sum(pv_cashflows) / analysis_years
-payback_years = investment_cost / total_annual_benefit if total_annual_benefit > 0 else 0
-payback_months = payback_years * 12 if payback_years else 0
+perf.lap("investment")
 
 
 
@@ -317,8 +365,15 @@ with tab3:
    k4.metric("Net Present Value",f"{npv:,.0f}")
 
    k5.metric("Annual Cashflow",f"{net_annual_cashflow:,.0f}")
+
+   d1, d2 = st.columns(2)
+
+   d1.metric("IRR", f"{investment['irr'] * 100:.1f}%" if investment["irr"] is not None else "n/a")
+
+   d2.metric("Discounted Payback", f"{investment['discounted_payback_months']:,.0f} months" if investment["discounted_payback_months"] is not None else "Not Recovered")
    
 
+   perf.lap("tab3 metrics")
 	
    new_total_cost = total_old_profit + total_annual_benefit + total_savings - annual_iiot_cost
  
@@ -330,8 +385,10 @@ with tab3:
    fig.update_layout(title="Annual Cost Reduction Breakdown (After IIoT)",yaxis_title="Annual Benefit (₹)", height=450, margin=dict(t=80, l=60, r=40, b=40),template="plotly_white",showlegend=False)
 
    fig.update_yaxes(tickformat=",")
+   perf.lap("fig waterfall build")
 
    fig
+   perf.lap("fig waterfall chart")
   
  #------------------- SECOND GRAPH ------------------------------------
 
@@ -357,7 +414,94 @@ with tab3:
     height=450,
     hovermode="x unified"
 )
+   perf.lap("fig1 build")
    st.plotly_chart(fig1, use_container_width=True)
+   perf.lap("fig1 chart")
+
+   st.subheader("Customer Report")
+
+   report_panel.render("example", reports.investment_report(
+      "IIoT Plant Investment Report",
+      [
+         ("Total Investment", investment_cost, "{:,.0f}"),
+         ("Annual Cashflow", net_annual_cashflow, "{:,.0f}"),
+         (f"NPV ({analysis_years} years)", npv, "{:,.0f}"),
+         ("Return on Investment (%)", roi_percent, "{:,.0f}%"),
+         ("IRR", investment["irr"] * 100 if investment["irr"] is not None else None, "{:.1f}%"),
+         ("Payback (Months)", payback_months, "{:,.0f}"),
+         ("Discounted Payback (Months)", investment["discounted_payback_months"], "{:,.0f}"),
+      ],
+      cached_calcs.yearly_cash_flows(investment_cost, net_annual_cashflow, analysis_years, discount_rate),
+      reports.waterfall(
+         "Annual Cost Reduction Breakdown (After IIoT)",
+         ["Old Savings", "Production Increase", "Maintenance and Labor Savings", "Annual IIoT Subscription Fee", "New Savings"],
+         [total_old_profit, total_annual_benefit, total_savings, -annual_iiot_cost, new_total_cost],
+         ["absolute", "relative", "relative", "relative", "total"]
+      )
+   ), "iiot_plant_report")
+   perf.lap("report panel")
+
+#===============================================================
+# TAB 4: GOAL SEEK
+#===============================================================
+
+with tab4:
+   st.header("Goal Seek")
+
+   goal_seek_panel.render(
+      "example", goal_seek.seek_plant,
+      {
+         "total_annual_benefit": total_annual_benefit,
+         "total_savings": total_savings,
+         "iiot_cost": iiot_cost,
+         "imp_cost": imp_cost,
+         "annual_iiot_cost": annual_iiot_cost,
+         "discount_rate": discount_rate
+      },
+      list(goal_seek.PLANT_SEEK_FIELDS), goal_seek.PLANT_SEEK_LABELS, goal_seek.PLANT_TARGETS,
+      analysis_years, "total_annual_benefit"
+   )
+
+# --------------------------------------------------
+# SAVED SCENARIOS
+# --------------------------------------------------
+# The line table is not a plain widget: it is saved as records and put back
+# as the editor's base table (dropping the editor's pending edits). The
+# uploaded file id is kept so the same upload is not read over it again.
+def restore_line_table(inputs):
+    if "line_table" in inputs:
+        st.session_state["line_table"] = pd.DataFrame(inputs["line_table"])
+        st.session_state.pop("line_editor", None)
+
+
+scenario_keys = [
+    "revenue", "num_lines", "analysis_years", "discount_rate_pct", "iiot_cost", "imp_cost",
+    "num_increments", "annual_iiot_cost", "line_source",
+    "production_selected", "avg_cost_selected", "avg_price_selected",
+    "downtime_selected", "maintenance_selected", "labor_selected",
+    "downtime_before", "downtime_new", "maintenance_before", "maintenance_pct", "labor_before", "labor_pct"
+]
+scenario_keys += [f"prod_inc_{i}" for i in range(num_increments)]
+scenario_keys += [f"{field}_{i}" for i in range(num_lines) for field in cached_calcs.LINE_FIELDS]
+
+scenario_panel.render(
+    "example.py",
+    scenario_keys,
+    {
+        "npv": npv,
+        "roi": roi_percent,
+        "irr": investment["irr"],
+        # payback_months of 0 means "not recovered"; store it as NULL, not 0 years
+        "payback": payback_months / 12 if payback_months else None,
+        "payback_months": payback_months or None,
+        "discounted_payback_months": investment["discounted_payback_months"]
+    },
+    extra_inputs={"line_table": df_lines.to_dict("records")} if line_source == "Line table" else None,
+    on_load=restore_line_table
+)
+
+perf.report()
+
 
 
      
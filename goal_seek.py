@@ -0,0 +1,192 @@
+import numpy as np
+
+import roi_engine
+
+# --------------------------------------------------
+# VECTORIZED ROOT FINDER
+# --------------------------------------------------
+# Solves residual(x, rows) = 0 for many rows at once, one bracket
+# [low, high] per row. Each step takes the Illinois (modified regula falsi)
+# point and falls back to bisection when that point is not strictly inside
+# the bracket (e.g. an infinite end), so every bracketed row converges; only
+# rows still open are re-evaluated. Rows whose bracket has no sign change
+# come back NaN. residual(x, rows) evaluates the rows listed in rows at x.
+def solve(residual, low, high, xtol=1e-9, max_iter=200):
+    a = np.array(low, dtype=float)
+    b = np.array(high, dtype=float)
+    rows = np.arange(len(a))
+    fa = residual(a, rows)
+    fb = residual(b, rows)
+
+    x = np.full(len(a), np.nan)
+    x[fa == 0] = a[fa == 0]
+    x[fb == 0] = b[fb == 0]
+    open_ = (np.sign(fa) * np.sign(fb) < 0)
+
+    a, b, fa, fb, rows = a[open_], b[open_], fa[open_], fb[open_], rows[open_]
+    for _ in range(max_iter):
+        if not len(rows):
+            break
+        with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+            c = b - fb * (b - a) / (fb - fa)
+        lo, hi = np.minimum(a, b), np.maximum(a, b)
+        bisect = ~((c > lo) & (c < hi))
+        c[bisect] = (lo[bisect] + hi[bisect]) / 2
+
+        fc = residual(c, rows)
+        flip = np.sign(fc) * np.sign(fb) < 0
+        # Keep the end on the other side of the root as a; halve its value
+        # when it is kept twice in a row (the Illinois step)
+        a = np.where(flip, b, a)
+        fa = np.where(flip, fb, fa / 2)
+        b, fb = c, fc
+
+        done = (fc == 0) | (np.abs(b - a) <= xtol * np.maximum(1.0, np.abs(b))) | np.isnan(fc)
+        x[rows[done]] = np.where(np.isnan(fc[done]), np.nan, b[done])
+        a, b, fa, fb, rows = a[~done], b[~done], fa[~done], fb[~done], rows[~done]
+
+    x[rows] = (a + b) / 2
+    return x
+
+
+# Widens each row's upper bound (x4 per step) until it brackets a sign
+# change or max_steps is reached.
+def bracket(residual, low, high, max_steps=30):
+    low = np.array(low, dtype=float)
+    high = np.array(high, dtype=float)
+    rows = np.arange(len(low))
+    f_low = residual(low, rows)
+    f_high = residual(high, rows)
+    for _ in range(max_steps):
+        missing = np.flatnonzero(np.sign(f_low) * np.sign(f_high) > 0)
+        if not len(missing):
+            break
+        high[missing] = low[missing] + (high[missing] - low[missing]) * 4
+        f_high[missing] = residual(high[missing], missing)
+    return low, high
+
+
+# --------------------------------------------------
+# GOAL SEEK (new_app1.py MODEL)
+# --------------------------------------------------
+# Any model input or the discount rate (as a fraction) can be solved for.
+SEEK_FIELDS = roi_engine.INPUT_FIELDS + ("discount_rate",)
+
+SEEK_LABELS = dict(roi_engine.INPUT_LABELS, discount_rate="Discount Rate")
+
+TARGETS = {
+    "NPV": "npv",
+    "ROI (%)": "roi",
+    "IRR": "irr",
+    "Payback (Years)": "payback_period",
+    "Discounted Payback (Years)": "discounted_payback"
+}
+
+# Undefined KPIs take the value that is "worst" for them, so a target stays
+# bracketed across the point where payback stops being reached
+UNDEFINED = {"irr": -np.inf, "payback_period": np.inf, "discounted_payback": np.inf,
+             "payback_months": np.inf, "discounted_payback_months": np.inf}
+
+
+def _kpi(values, kpi):
+    return np.where(np.isnan(values), UNDEFINED.get(kpi, np.nan), values)
+
+
+def kpi_values(base_inputs, field, values, kpi="npv", analysis_years=5):
+    inputs = dict(base_inputs)
+    inputs[field] = np.asarray(values, dtype=float)
+    discount_rate = inputs.pop("discount_rate")
+    result = roi_engine.evaluate_inputs(inputs, analysis_years=analysis_years, discount_rate=discount_rate,
+                                        solve_irr=kpi == "irr")
+    return _kpi(np.broadcast_to(result[kpi], np.shape(values)), kpi)
+
+
+def _seek(kpi_fn, targets, low, high):
+    targets = np.atleast_1d(np.asarray(targets, dtype=float))
+
+    def residual(x, rows):
+        return kpi_fn(x) - targets[rows]
+
+    n = len(targets)
+    low, high = bracket(residual, np.full(n, low), np.full(n, high))
+    values = solve(residual, low, high)
+    # A bracket can also close on the jump to an undefined KPI (payback past
+    # the analysis period); that is no solution either
+    achieved = kpi_fn(np.where(np.isnan(values), low, values))
+    values[~np.isfinite(achieved)] = np.nan
+    achieved[np.isnan(values)] = np.nan
+    return {"targets": targets, "values": values, "achieved": achieved}
+
+
+# The input value at which kpi reaches each target, everything else held at
+# base_inputs (which includes discount_rate). Targets are searched for from
+# the input's minimum upward; NaN where no value reaches the target.
+# "achieved" is the KPI at each solution.
+def seek(base_inputs, field, kpi, targets, analysis_years=5, low=None, high=None):
+    low = roi_engine.INPUT_MIN_VALUES.get(field, 0.0) if low is None else low
+    high = max(2 * abs(base_inputs[field]), low + 1.0) if high is None else high
+    result = _seek(lambda x: kpi_values(base_inputs, field, x, kpi, analysis_years), targets, low, high)
+    result.update(field=field, kpi=kpi)
+    return result
+
+
+# --------------------------------------------------
+# GOAL SEEK (example.py MODEL)
+# --------------------------------------------------
+# example.py's plant model reduced to the totals it actually uses; the
+# annual value added of all lines can be solved for as one figure.
+PLANT_SEEK_FIELDS = ("total_annual_benefit", "iiot_cost", "imp_cost", "annual_iiot_cost", "discount_rate")
+
+PLANT_SEEK_LABELS = {
+    "total_annual_benefit": "Annual Value Added",
+    "iiot_cost": "IIoT License Cost",
+    "imp_cost": "Implementation Cost",
+    "annual_iiot_cost": "License fee/Annual cost",
+    "discount_rate": "Discount Rate"
+}
+
+PLANT_TARGETS = {
+    "NPV": "npv",
+    "ROI (%)": "roi_percent",
+    "IRR": "irr",
+    "Payback (Months)": "payback_months",
+    "Discounted Payback (Months)": "discounted_payback_months"
+}
+
+
+# Vectorized roi_engine.plant_investment() over one varied field; base holds
+# total_annual_benefit, total_savings, iiot_cost, imp_cost, annual_iiot_cost
+# and discount_rate.
+def plant_kpi_values(base, field, values, kpi="npv", analysis_years=5):
+    inputs = {key: np.asarray(value, dtype=float) for key, value in base.items()}
+    inputs[field] = np.asarray(values, dtype=float)
+
+    investment_cost = inputs["iiot_cost"] + inputs["imp_cost"]
+    net_annual_cashflow = inputs["total_annual_benefit"] - inputs["annual_iiot_cost"] + inputs["total_savings"]
+    benefit = inputs["total_annual_benefit"]
+
+    if kpi == "payback_months":
+        with np.errstate(divide="ignore", invalid="ignore"):
+            payback = np.where(benefit > 0, investment_cost / benefit * 12, np.nan)
+        return _kpi(np.broadcast_to(payback, np.shape(values)), kpi)
+
+    yearly = roi_engine.yearly_cash_flows(investment_cost, net_annual_cashflow, analysis_years,
+                                          inputs["discount_rate"], solve_irr=kpi == "irr")
+    if kpi == "npv":
+        values_out = yearly["npv"]
+    elif kpi == "roi_percent":
+        with np.errstate(divide="ignore", invalid="ignore"):
+            values_out = np.where(investment_cost > 0, (yearly["npv"] + investment_cost) / investment_cost * 100, 0.0)
+    elif kpi == "irr":
+        values_out = yearly["irr"]
+    else:
+        values_out = yearly["discounted_payback"] * 12
+    return _kpi(np.broadcast_to(values_out, np.shape(values)), kpi)
+
+
+def seek_plant(base, field, kpi, targets, analysis_years=5, low=None, high=None):
+    low = 0.0 if low is None else low
+    high = max(2 * abs(base[field]), low + 1.0) if high is None else high
+    result = _seek(lambda x: plant_kpi_values(base, field, x, kpi, analysis_years), targets, low, high)
+    result.update(field=field, kpi=kpi)
+    return result
@@ -0,0 +1,106 @@
+import numpy as np
+import plotly.graph_objects as go
+import streamlit as st
+
+import perf
+
+# --------------------------------------------------
+# GOAL SEEK (page section)
+# --------------------------------------------------
+# Shared by new_app1.py (goal_seek.seek) and example.py
+# (goal_seek.seek_plant). The single target and the whole target curve go
+# through the root finder as one batch. Rates are entered and shown in %.
+
+# Default target and curve range per KPI
+DEFAULT_TARGETS = {
+    "npv": (0.0, -100_000.0, 500_000.0),
+    "roi": (100.0, 0.0, 400.0),
+    "roi_percent": (150.0, 0.0, 400.0),
+    "irr": (25.0, 5.0, 100.0),
+    "payback_period": (1.5, 0.25, 5.0),
+    "discounted_payback": (2.0, 0.25, 5.0),
+    "payback_months": (18.0, 3.0, 60.0),
+    "discounted_payback_months": (24.0, 3.0, 60.0)
+}
+
+PERCENT_FIELDS = ("discount_rate",)
+
+
+def _shown(field, value):
+    return value * 100 if field in PERCENT_FIELDS else value
+
+
+@st.fragment
+def render(page, seek, base, fields, labels, targets, analysis_years, default_field):
+    perf.begin_fragment("goal seek")
+
+    g1, g2, g3 = st.columns(3)
+    field = g1.selectbox("Solve For", fields, index=fields.index(default_field), format_func=labels.get,
+                         key=f"{page}_seek_field")
+    target_label = g2.selectbox("Target", list(targets), key=f"{page}_seek_kpi")
+    kpi = targets[target_label]
+
+    default, curve_from, curve_to = DEFAULT_TARGETS[kpi]
+    unit = " (%)" if kpi == "irr" else ""
+    target = g3.number_input(f"Target {target_label}{unit}", value=default, key=f"{page}_seek_target_{kpi}")
+
+    c1, c2, c3 = st.columns(3)
+    curve_from = c1.number_input(f"Curve From{unit}", value=curve_from, key=f"{page}_seek_from_{kpi}")
+    curve_to = c2.number_input(f"Curve To{unit}", value=curve_to, key=f"{page}_seek_to_{kpi}")
+    steps = c3.selectbox("Curve Points", [50, 200, 1000], index=1, key=f"{page}_seek_steps")
+    perf.lap("goal seek widgets")
+
+    scale = 100 if kpi == "irr" else 1
+    curve_targets = np.linspace(curve_from, curve_to, steps)
+    result = seek(base, field, kpi, np.append(curve_targets, target) / scale, analysis_years)
+    solution = result["values"][-1]
+    curve = result["values"][:-1]
+    perf.lap("goal seek solve")
+
+    label = labels[field]
+    field_unit = " (%)" if field in PERCENT_FIELDS else ""
+    current = _shown(field, base[field])
+
+    if np.isnan(solution):
+        st.warning(f"No {label} value reaches {target_label} = {target:,.2f}{unit}.")
+    else:
+        st.metric(f"Required {label}{field_unit}", f"{_shown(field, solution):,.2f}",
+                  delta=f"{_shown(field, solution) - current:,.2f} vs current")
+
+    fig_seek = go.Figure()
+
+    fig_seek.add_scatter(
+        x=curve_targets,
+        y=_shown(field, curve),
+        mode="lines",
+        name=f"Required {label}",
+        line=dict(color="#1f77b4", width=3)
+    )
+
+    if not np.isnan(solution):
+        fig_seek.add_scatter(
+            x=[target],
+            y=[_shown(field, solution)],
+            mode="markers",
+            name="Target",
+            marker=dict(color="#EF553B", size=12)
+        )
+
+    fig_seek.add_hline(y=current, line_dash="dot", line_color="gray",
+                       annotation_text="Current", annotation_position="bottom right")
+
+    fig_seek.update_layout(
+        title=f"{label} Needed per {target_label}",
+        xaxis=dict(title=f"{target_label}{unit}"),
+        yaxis=dict(title=f"{label}{field_unit}"),
+        legend=dict(orientation="h", y=-0.25),
+        height=450
+    )
+    perf.lap("fig_seek build")
+
+    st.plotly_chart(fig_seek, use_container_width=True)
+    if np.isnan(curve).any():
+        st.caption("Gaps mark targets that no value of the input reaches.")
+    perf.lap("fig_seek chart")
+
+    perf.end_fragment()
@@ -0,0 +1,121 @@
+import numpy as np
+
+import parallel
+import roi_engine
+
+# --------------------------------------------------
+# INPUT DISTRIBUTIONS
+# --------------------------------------------------
+# An input spec is either a plain number (held fixed) or a tuple:
+#   ("normal", mean, sd)
+#   ("uniform", low, high)
+#   ("triangular", low, mode, high)
+#   ("lognormal", median, sigma)
+DISTRIBUTIONS = ("Fixed", "Normal", "Uniform", "Triangular", "Lognormal")
+
+PERCENTILES = (5, 10, 50, 90, 95)
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+def sample_input(rng, spec, size):
+    if np.isscalar(spec):
+        return np.full(size, float(spec))
+
+    kind = spec[0]
+    if kind == "normal":
+        return rng.normal(spec[1], spec[2], size)
+    if kind == "uniform":
+        return rng.uniform(spec[1], spec[2], size)
+    if kind == "triangular":
+        low, mode, high = spec[1:]
+        if low == high:
+            return np.full(size, float(mode))
+        return rng.triangular(low, mode, high, size)
+    if kind == "lognormal":
+        return rng.lognormal(np.log(spec[1]), spec[2], size)
+
+    raise ValueError(f"Unknown distribution: {kind}")
+
+
+# Build a spec from the UI choice of distribution and a symmetric spread (in %)
+# around the point estimate. Lognormal keeps the point estimate as its median
+# with sigma = ln(1 + spread), i.e. one standard deviation in log space
+# multiplies or divides by (1 + spread); it needs a positive value, so a
+# zero or negative one stays fixed.
+def spread_spec(distribution, value, spread_pct):
+    delta = abs(value) * spread_pct / 100
+    if distribution == "Normal":
+        return ("normal", value, delta)
+    if distribution == "Uniform":
+        return ("uniform", value - delta, value + delta)
+    if distribution == "Triangular":
+        return ("triangular", value - delta, value, value + delta)
+    if distribution == "Lognormal" and value > 0:
+        return ("lognormal", value, float(np.log1p(spread_pct / 100)))
+    return value
+
+
+# --------------------------------------------------
+# SIMULATION
+# --------------------------------------------------
+# Scenarios are sampled and evaluated chunk_size at a time, so the
+# scenario x year matrices never exceed one chunk; only the per-scenario
+# NPV / ROI / payback vectors are kept for the full run. Every chunk draws
+# from its own stream spawned from seed, so with workers > 1 the chunks run
+# on the parallel.py pool and the results do not depend on the worker count.
+# IRR is the most expensive KPI; solve_irr=False leaves it out of the result.
+def simulate_chunk(specs, size, seed, analysis_years=5, discount_rate=0.10, solve_irr=True):
+    rng = np.random.default_rng(seed)
+
+    inputs = {}
+    for field in roi_engine.INPUT_FIELDS:
+        spec = specs.get(field, roi_engine.DEFAULT_INPUTS[field])
+        inputs[field] = np.maximum(sample_input(rng, spec, size),
+                                   roi_engine.INPUT_MIN_VALUES[field])
+    rate = np.maximum(sample_input(rng, specs.get("discount_rate", discount_rate), size), 0.0)
+
+    result = roi_engine.evaluate_inputs(inputs, analysis_years=analysis_years, discount_rate=rate,
+                                        solve_irr=solve_irr)
+    chunk = {
+        "npv": result["npv"],
+        "roi": result["roi"],
+        "payback_year": result["payback_year"].astype(np.int16)
+    }
+    if solve_irr:
+        chunk["irr"] = result["irr"]
+    return chunk
+
+
+def simulate(specs, n_sims=100_000, analysis_years=5, discount_rate=0.10,
+             seed=None, chunk_size=DEFAULT_CHUNK_SIZE, workers=1, solve_irr=True):
+    if n_sims < 1:
+        raise ValueError(f"n_sims must be at least 1, got {n_sims}")
+    sizes = [min(chunk_size, n_sims - start) for start in range(0, n_sims, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(specs, size, chunk_seed, analysis_years, discount_rate, solve_irr)
+             for size, chunk_seed in zip(sizes, seeds)]
+    return parallel.merge(parallel.run(simulate_chunk, tasks, workers))
+
+
+# Payback of 0 means "not recovered"; it is ranked above every real payback
+# year so its percentiles come back as inf. Scenarios without an IRR (never
+# cash-positive) are left out of its percentiles, which are None when no
+# scenario has one or the run did not solve IRR.
+def summarize(sim, percentiles=PERCENTILES, bins=60):
+    recovered = sim["payback_year"] > 0
+    payback = np.where(recovered, sim["payback_year"], np.inf)
+    irr = sim.get("irr")
+    irr = irr[~np.isnan(irr)] if irr is not None else np.empty(0)
+
+    return {
+        "n_sims": sim["npv"].size,
+        "npv_percentiles": dict(zip(percentiles, np.percentile(sim["npv"], percentiles))),
+        "roi_percentiles": dict(zip(percentiles, np.percentile(sim["roi"], percentiles))),
+        "irr_percentiles": dict(zip(percentiles, np.percentile(irr, percentiles) if irr.size else [None] * len(percentiles))),
+        "payback_percentiles": dict(zip(percentiles, np.percentile(payback, percentiles, method="nearest"))),
+        "npv_mean": sim["npv"].mean(),
+        "prob_negative_npv": (sim["npv"] < 0).mean(),
+        "prob_not_recovered": 1 - recovered.mean(),
+        "npv_histogram": np.histogram(sim["npv"], bins=bins),
+    }
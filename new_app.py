@@ -1,7 +1,9 @@
 import streamlit as st
-import pandas as pd
 import plotly.graph_objects as go
-import plotly.express as px
+
+import cached_calcs
+import calc_graph
+import perf
 
 # --------------------------------------------------
 # PAGE CONFIG
@@ -11,21 +13,9 @@ st.set_page_config(
     layout="wide"
 )
 
-st.title("SAMPRAMA FINANCIAL CALCULATOR")
-
-# --------------------------------------------------
-# SIDEBAR (GLOBAL SETTINGS ONLY)
-# --------------------------------------------------
-with st.sidebar:
-    st.header("Global Settings")
+perf.begin("new_app.py")
 
-    analysis_years = st.selectbox(
-        "Analysis Period (Years)", [3, 5, 7, 10], index=1
-    )
-
-    discount_rate = st.slider(
-        "Discount Rate (%)", 5, 20, 10
-    ) / 100
+st.title("SAMPRAMA FINANCIAL CALCULATOR")
 
 # --------------------------------------------------
 # TABS STRUCTURE
@@ -76,33 +66,33 @@ with tab1:
             """
         )
 
+perf.lap("widget read")
+
 # --------------------------------------------------
 # CORE CALCULATIONS (SHARED)
 # --------------------------------------------------
-profit_from_margin = annual_turnover * profit_margin / 100
-revenue = annual_turnover - profit_from_margin
-sales_admin_cost = revenue * sales_admin_margin / 100
-mfg_expense = revenue - sales_admin_cost
-
-mat_cost = mfg_expense * mat_margin / 100
-labor_cost = mfg_expense * labor_margin / 100
-
-annual_capital_amort = capital_cost / 10
-
-cost_per_unit = mfg_expense / units_per_year
-fixed_per_unit = annual_capital_amort / units_per_year
-labor_per_unit = labor_cost / units_per_year
-
-units_after = units_per_year * (1 + prod_inc_per / 100)
-fixed_per_unit_after = annual_capital_amort / units_after
-labor_per_unit_after = labor_cost / units_after
+# Per-session dependency graph of the cascade (calc_graph.margin_graph):
+# only the nodes downstream of the inputs edited since the last run are
+# recomputed, the rest are read back from the graph.
+if "new_app_calc_graph" not in st.session_state:
+    st.session_state["new_app_calc_graph"] = calc_graph.margin_graph()
+calc = st.session_state["new_app_calc_graph"]
+calc.recomputed.clear()
+calc.set(
+    annual_turnover=annual_turnover, profit_margin=profit_margin, sales_admin_margin=sales_admin_margin,
+    mat_margin=mat_margin, labor_margin=labor_margin, units_per_year=units_per_year,
+    capital_cost=capital_cost, iiot_cost=iiot_cost, imp_cost=imp_cost, prod_inc_per=prod_inc_per,
+    annual_iiot_cost=0.0
+)
 
-savings_per_unit = (labor_per_unit + fixed_per_unit) - (labor_per_unit_after + fixed_per_unit_after)
+profit_from_margin = calc["profit_from_margin"]
+profit_after = calc["profit_after"]
+incremental_profit = calc["incremental_profit"]
+units_after = calc["units_after"]
 
-profit_after = profit_from_margin + (units_after * savings_per_unit)
-incremental_profit = profit_after - profit_from_margin
+total_iiot_investment = calc["total_iiot_investment"]
 
-total_iiot_investment = iiot_cost + imp_cost
+perf.lap("core calculations")
 
 # ==================================================
 # TAB 2 : BREAK-EVEN & OPERATIONAL IMPACT
@@ -117,11 +107,8 @@ with tab2:
     k3.metric("Incremental Profit", f"{incremental_profit:,.0f}")
     k4.metric("Units After IIoT", f"{units_after:,.0f}")
 
-    df_compare = pd.DataFrame({
-        "Scenario": ["Before IIoT", "After IIoT"],
-        "Profit": [profit_from_margin, profit_after],
-        "Production": [units_per_year, units_after]
-    })
+    df_compare = cached_calcs.compare_frame(profit_from_margin, profit_after, units_per_year, units_after)
+    perf.lap("df_compare")
 
     fig_be = go.Figure()
 
@@ -146,48 +133,53 @@ with tab2:
         legend=dict(orientation="h", y=-0.25),
         height=450
     )
+    perf.lap("fig_be build")
 
     st.plotly_chart(fig_be, use_container_width=True)
+    perf.lap("fig_be chart")
 
 # ==================================================
 # TAB 3 : INVESTMENT ANALYSIS (ROI / NPV / PAYBACK)
 # ==================================================
-with tab3:
-    st.header("Investment Analysis")
+# The analysis period and discount rate only feed this tab, so they live
+# inside a fragment: moving them reruns the yearly series and fig_all
+# without touching tab1 / tab2. Editing a tab1 input still reruns it.
+@st.fragment
+def investment_analysis(total_iiot_investment, incremental_profit):
+    perf.begin_fragment("investment analysis")
 
-    years = list(range(0, analysis_years + 1))
-    cash_flows = [-total_iiot_investment] + [incremental_profit] * analysis_years
+    s1, s2 = st.columns(2)
 
-    cumulative_cf = []
-    running = 0
-    for cf in cash_flows:
-        running += cf
-        cumulative_cf.append(running)
+    analysis_years = s1.selectbox(
+        "Analysis Period (Years)", [3, 5, 7, 10], index=1
+    )
 
-    payback_year = next((y for y, v in zip(years, cumulative_cf) if v >= 0 and y > 0), None)
+    discount_rate = s2.slider(
+        "Discount Rate (%)", 5, 20, 10
+    ) / 100
 
-    npv_vals = []
-    npv_run = 0
-    for y, cf in zip(years, cash_flows):
-        if y == 0:
-            npv_run += cf
-        else:
-            npv_run += cf / ((1 + discount_rate) ** y)
-        npv_vals.append(npv_run)
+    yearly = cached_calcs.yearly_cash_flows(
+        total_iiot_investment, incremental_profit, analysis_years, discount_rate
+    )
+    perf.lap("yearly cash flows")
 
-    roi_vals = [(cf / total_iiot_investment) * 100 if total_iiot_investment else 0 for cf in cumulative_cf]
+    payback_year = yearly["payback_year"] or None
+    npv_vals = yearly["npv_vals"]
+    roi_vals = yearly["roi_vals"]
 
     r1, r2, r3 = st.columns(3)
     r1.metric("ROI (%)", f"{roi_vals[-1]:.1f}%")
     r2.metric("NPV", f"{npv_vals[-1]:,.0f}")
     r3.metric("Payback Period (Years)", payback_year if payback_year else "Not Recovered")
 
-    df_yearly = pd.DataFrame({
-        "Year": years,
-        "Cumulative Cash Flow": cumulative_cf,
-        "NPV": npv_vals,
-        "ROI (%)": roi_vals
-    })
+    r4, r5, r6 = st.columns(3)
+    r4.metric("IRR", f"{yearly['irr'] * 100:.1f}%" if yearly["irr"] is not None else "n/a")
+    r5.metric("Payback (interpolated)", f"{yearly['payback_period']:.2f} years" if yearly["payback_period"] is not None else "Not Recovered")
+    r6.metric("Discounted Payback", f"{yearly['discounted_payback']:.2f} years" if yearly["discounted_payback"] is not None else "Not Recovered")
+
+    perf.lap("tab3 metrics")
+
+    df_yearly = yearly["df_yearly"]
 
     fig_all = go.Figure()
 
@@ -223,5 +215,17 @@ with tab3:
         legend=dict(orientation="h", y=-0.3),
         height=500
     )
+    perf.lap("fig_all build")
 
     st.plotly_chart(fig_all, use_container_width=True)
+    perf.lap("fig_all chart")
+
+    perf.end_fragment()
+
+
+with tab3:
+    st.header("Investment Analysis")
+
+    investment_analysis(total_iiot_investment, incremental_profit)
+
+perf.report()
@@ -1,7 +1,19 @@
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
-import plotly.express as px
+
+import cached_calcs
+import charts
+import goal_seek
+import goal_seek_panel
+import monte_carlo
+import perf
+import report_panel
+import reports
+import roi_engine
+import scenario_compare
+import scenario_panel
+import sensitivity
 
 # --------------------------------------------------
 # PAGE CONFIG
@@ -11,6 +23,8 @@ st.set_page_config(
     layout="wide"
 )
 
+perf.begin("new_app1.py")
+
 st.title("SAMPRAMA FINANCIAL CALCULATOR")
 
 # --------------------------------------------------
@@ -20,23 +34,28 @@ with st.sidebar:
     st.header("Global Settings")
 
     analysis_years = st.selectbox(
-        "Analysis Period (Years)", [3, 5, 7, 10], index=1
+        "Analysis Period (Years)", [3, 5, 7, 10], index=1, key="analysis_years"
     )
 
     discount_rate = st.slider(
-        "Discount Rate (%)", 5, 20, 10
+        "Discount Rate (%)", 5, 20, 10, key="discount_rate_pct"
     ) / 100
     
-    annual_iiot_cost = st.number_input("License fee/Annual cost",min_value=0.0,value=10000.00)
+    annual_iiot_cost = st.number_input("License fee/Annual cost",min_value=0.0,value=10000.00, key="annual_iiot_cost")
 
 # --------------------------------------------------
 # TABS STRUCTURE
 # --------------------------------------------------
-tab1, tab4 = st.tabs([
+tab1, tab4, tab5, tab6, tab7, tab8, tab9 = st.tabs([
     "Financial Inputs",
    # "Break-Even & Impact",
    # "Investment Analysis",
-    "Investment Analysis"
+    "Investment Analysis",
+    "Risk Simulation",
+    "Sensitivity",
+    "Monthly Cash Flow",
+    "Goal Seek",
+    "Compare Scenarios"
 ])
 
 # ==================================================
@@ -50,22 +69,22 @@ with tab1:
     with col_inputs:
         st.subheader("Revenue & Margins")
 
-        annual_turnover = st.number_input("Annual Turnover", min_value=0.0, value=1_000_000.0)
-        profit_margin = st.number_input("Profit Margin (%)", min_value=0.0, value=10.0)
-        sales_admin_margin = st.number_input("Sales & Admin Margin (%)", min_value=0.0, value=10.0)
+        annual_turnover = st.number_input("Annual Turnover", min_value=0.0, value=1_000_000.0, key="annual_turnover")
+        profit_margin = st.number_input("Profit Margin (%)", min_value=0.0, value=10.0, key="profit_margin")
+        sales_admin_margin = st.number_input("Sales & Admin Margin (%)", min_value=0.0, value=10.0, key="sales_admin_margin")
 
         st.subheader("Manufacturing Cost Split")
-        mat_margin = st.number_input("Material Cost (%)", min_value=0.0, value=40.0)
-        labor_margin = st.number_input("Labor Cost (%)", min_value=0.0, value=20.0)
+        mat_margin = st.number_input("Material Cost (%)", min_value=0.0, value=40.0, key="mat_margin")
+        labor_margin = st.number_input("Labor Cost (%)", min_value=0.0, value=20.0, key="labor_margin")
 
         st.subheader("Production")
-        units_per_year = st.number_input("Production Units / Year", min_value=1.0, value=5000.0)
+        units_per_year = st.number_input("Production Units / Year", min_value=1.0, value=5000.0, key="units_per_year")
 
         st.subheader("Capital & IIoT")
-        capital_cost = st.number_input("Capital Cost", min_value=0.0, value=1_000_000.0)
-        iiot_cost = st.number_input("IIoT License Cost", min_value=0.0, value=50_000.0)
-        imp_cost = st.number_input("Implementation Cost", min_value=0.0, value=25_000.0)
-        prod_inc_per = st.number_input("Production Increase (%)", min_value=0.0, value=15.0)
+        capital_cost = st.number_input("Capital Cost", min_value=0.0, value=1_000_000.0, key="capital_cost")
+        iiot_cost = st.number_input("IIoT License Cost", min_value=0.0, value=50_000.0, key="iiot_cost")
+        imp_cost = st.number_input("Implementation Cost", min_value=0.0, value=25_000.0, key="imp_cost")
+        prod_inc_per = st.number_input("Production Increase (%)", min_value=0.0, value=15.0, key="prod_inc_per")
 
     with col_notes:
         st.info(
@@ -79,69 +98,55 @@ with tab1:
             """
         )
 
+perf.lap("widget read")
+
 # --------------------------------------------------
 # CORE CALCULATIONS (SHARED)
 # --------------------------------------------------
-profit_from_margin = annual_turnover * profit_margin / 100
-revenue = annual_turnover - profit_from_margin
-sales_admin_cost = revenue * sales_admin_margin / 100
-mfg_expense = revenue - sales_admin_cost
-
-mat_cost = mfg_expense * mat_margin / 100
-labor_cost = mfg_expense * labor_margin / 100
-
-annual_capital_amort = capital_cost / 10
-
-cost_per_unit = mfg_expense / units_per_year
-fixed_per_unit = annual_capital_amort / units_per_year
-labor_per_unit = labor_cost / units_per_year
-
-units_after = units_per_year * (1 + prod_inc_per / 100)
-fixed_per_unit_after = annual_capital_amort / units_after
-labor_per_unit_after = labor_cost / units_after
-
-savings_per_unit = (labor_per_unit + fixed_per_unit) - (labor_per_unit_after + fixed_per_unit_after)
+calc = cached_calcs.margin_cascade(
+    annual_turnover, profit_margin, sales_admin_margin, mat_margin,
+    labor_margin, units_per_year, capital_cost, prod_inc_per
+)
 
-profit_after = profit_from_margin + (units_after * savings_per_unit)
-incremental_profit = profit_after - profit_from_margin
+profit_from_margin = calc["profit_from_margin"]
+profit_after = calc["profit_after"]
+incremental_profit = calc["incremental_profit"]
+units_after = calc["units_after"]
 
 total_iiot_investment = iiot_cost + imp_cost
 
 net_annual_benefit = incremental_profit - annual_iiot_cost
 
-years = list(range(0, analysis_years + 1))
-cash_flows = [-total_iiot_investment] + [net_annual_benefit] * analysis_years
-
-cumulative_cf = []
-running = 0
-for cf in cash_flows:
-  running += cf
-  cumulative_cf.append(running)
-
-payback_year = next((y for y, v in zip(years, cumulative_cf) if v >= 0 and y > 0), None)
-
-npv_vals = []
-npv_run = 0
-for y, cf in zip(years, cash_flows):
-  if y == 0:
-     npv_run += cf
-  else:
-     npv_run += cf / ((1 + discount_rate) ** y)
-  npv_vals.append(npv_run)
+yearly = cached_calcs.yearly_cash_flows(
+    total_iiot_investment, net_annual_benefit, analysis_years, discount_rate
+)
 
-roi_vals = [(cf / total_iiot_investment) * 100 if total_iiot_investment else 0 for cf in cumulative_cf]
+payback_year = yearly["payback_year"] or None
+npv_vals = yearly["npv_vals"]
+roi_vals = yearly["roi_vals"]
 #r1, r2, r3 = st.columns(3)
 #r1.metric("ROI (%)", f"{roi_vals[-1]:.1f}%")
 #r2.metric("NPV", f"{npv_vals[-1]:,.0f}")
 #r3.metric("Payback Period (Years)", payback_year if payback_year else "Not Recovered")
 
 
-df_yearly = pd.DataFrame({
-        "Year": years,
-        "Cumulative Cash Flow": cumulative_cf,
-        "NPV": npv_vals,
-        "ROI (%)": roi_vals
-    })
+df_yearly = yearly["df_yearly"]
+
+point_inputs = {
+    "annual_turnover": annual_turnover,
+    "profit_margin": profit_margin,
+    "sales_admin_margin": sales_admin_margin,
+    "mat_margin": mat_margin,
+    "labor_margin": labor_margin,
+    "units_per_year": units_per_year,
+    "capital_cost": capital_cost,
+    "iiot_cost": iiot_cost,
+    "imp_cost": imp_cost,
+    "prod_inc_per": prod_inc_per,
+    "annual_iiot_cost": annual_iiot_cost,
+}
+
+perf.lap("core calculations")
 
 #=====================================================
 # TAB 4 : NEW INVESTMENT ANALYSIS (ROI / NPV / PAYBACK)
@@ -157,10 +162,20 @@ with tab4:
 
     k2.metric("Annual Benefit",f"{net_annual_benefit:,.0f}",delta=f"{(net_annual_benefit / total_iiot_investment)*100:.1f}% ROI")
 
-    k3.metric("Payback Period",f"{payback_year:.0f} years")
+    k3.metric("Payback Period",f"{payback_year:.0f} years" if payback_year else "Not Recovered")
 
     k4.metric("NPV",f"{npv_vals[-1]:,.0f}")
 
+    p1, p2, p3 = st.columns(3)
+
+    p1.metric("IRR", f"{yearly['irr'] * 100:.1f}%" if yearly["irr"] is not None else "n/a")
+
+    p2.metric("Payback (interpolated)", f"{yearly['payback_period']:.2f} years" if yearly["payback_period"] is not None else "Not Recovered")
+
+    p3.metric("Discounted Payback", f"{yearly['discounted_payback']:.2f} years" if yearly["discounted_payback"] is not None else "Not Recovered")
+
+
+    perf.lap("tab4 metrics")
 
     fig_main = go.Figure()
 
@@ -204,80 +219,410 @@ with tab4:
         legend=dict(orientation="h", y=-0.25),
     height=500
 )
+    perf.lap("fig_main build")
 
     st.plotly_chart(fig_main, use_container_width=True)
+    perf.lap("fig_main chart")
 
-    df_profit_compare = pd.DataFrame({
-    "Scenario": ["Before IIoT", "After IIoT"],
-    "Profit": [profit_from_margin, profit_after]
-})
-
-    fig_profit = px.bar(
-    df_profit_compare,
-    x="Scenario",
-    y="Profit",
-    text="Profit",
-    title="Profit Impact",
-    color="Scenario",
-    color_discrete_sequence=["#9ecae1", "#2ca02c"]
-)
-
-    fig_profit.update_traces(
-    texttemplate="%{text:,.0f}",
-    textposition="outside",
-    cliponaxis=False
-)
-
-    fig_profit.update_layout(
-    height=400,
-    showlegend=False
-)
-
-    df_prod_compare = pd.DataFrame({
-    "Scenario": ["Before IIoT", "After IIoT"],
-    "Production Units": [units_per_year, units_after]
-})
-
-    fig_prod = px.bar(
-    df_prod_compare,
-    x="Scenario",
-    y="Production Units",
-    text="Production Units",
-    title="Production Volume Impact",
-    color="Scenario",
-    color_discrete_sequence=["#c7c7c7", "#1f77b4"]
-)
-
-    fig_prod.update_traces(
-    texttemplate="%{text:,.0f}",
-    textposition="outside",
-    cliponaxis=False
-)
+    fig_profit = charts.comparison_bars(
+        "new_app1.profit", "Profit Impact",
+        ["Before IIoT", "After IIoT"], [profit_from_margin, profit_after],
+        "Scenario", "Profit", ["#9ecae1", "#2ca02c"]
+    )
+    perf.lap("fig_profit build")
 
-    fig_prod.update_layout(
-    height=400,
-    showlegend=False
-)
+    fig_prod = charts.comparison_bars(
+        "new_app1.production", "Production Volume Impact",
+        ["Before IIoT", "After IIoT"], [units_per_year, units_after],
+        "Scenario", "Production Units", ["#c7c7c7", "#1f77b4"]
+    )
+    perf.lap("fig_prod build")
 
-    df_benefit_cost = pd.DataFrame({
-    "Category": ["Annual Benefit", "Annual Cost"],
-    "Value": [net_annual_benefit, annual_iiot_cost]})
-
-    fig_bc = px.bar(
-    df_benefit_cost,
-    x="Category",
-    y="Value",
-    title="Annual Benefit vs Annual Cost",
-    text="Value")
-
-    fig_bc.update_traces(texttemplate="%{text:,.0f}", textposition="outside",cliponaxis=False)
-    fig_bc.update_layout(
-    height=400,
-    showlegend=False)
+    fig_bc = charts.comparison_bars(
+        "new_app1.benefit_cost", "Annual Benefit vs Annual Cost",
+        ["Annual Benefit", "Annual Cost"], [net_annual_benefit, annual_iiot_cost],
+        "Category", "Value"
+    )
+    perf.lap("fig_bc build")
    
     c1, c2, c3 = st.columns(3)
 
     c1.plotly_chart(fig_profit, use_container_width=True)
+    perf.lap("fig_profit chart")
     c2.plotly_chart(fig_prod, use_container_width=True)
+    perf.lap("fig_prod chart")
     c3.plotly_chart(fig_bc, use_container_width=True)
+    perf.lap("fig_bc chart")
+
+    st.subheader("Customer Report")
+
+    report_panel.render("new_app1", reports.scenario_report(
+        dict(calc, **yearly, total_iiot_investment=total_iiot_investment, net_annual_benefit=net_annual_benefit),
+        analysis_years, annual_iiot_cost
+    ), "iiot_investment_report")
+    perf.lap("report panel")
+
+
+#=====================================================
+# TAB 5 : RISK SIMULATION (MONTE CARLO)
+#=====================================================
+
+# The simulation settings only feed this tab; as a fragment, changing them
+# (or pressing Run) reruns the simulation panel alone.
+@st.fragment
+def risk_simulation(point_inputs, analysis_years, discount_rate):
+    perf.begin_fragment("risk simulation")
+
+    s1, s2, s3 = st.columns(3)
+    n_sims = s1.selectbox("Number of Simulations", [100_000, 250_000, 500_000, 1_000_000], index=0, format_func=lambda n: f"{n:,}")
+    fixed_seed = s2.checkbox("Fixed seed (reproducible)", value=True)
+    seed = s3.number_input("Seed", min_value=0, value=42, step=1, disabled=not fixed_seed)
+
+    uncertain = st.multiselect(
+        "Uncertain Inputs",
+        options=list(roi_engine.INPUT_FIELDS),
+        default=["prod_inc_per", "labor_margin", "annual_iiot_cost"],
+        format_func=roi_engine.INPUT_LABELS.get
+    )
+
+    specs = {}
+    for field in uncertain:
+        label = roi_engine.INPUT_LABELS[field]
+        d1, d2 = st.columns(2)
+        distribution = d1.selectbox(f"{label} distribution", monte_carlo.DISTRIBUTIONS[1:], index=2, key=f"mc_dist_{field}")
+        spread = d2.number_input(f"{label} spread (±%)", min_value=0.0, value=20.0, key=f"mc_spread_{field}")
+        specs[field] = monte_carlo.spread_spec(distribution, point_inputs[field], spread)
+
+    if st.button("Run Simulation"):
+        sim = monte_carlo.simulate(
+            specs, n_sims,
+            analysis_years=analysis_years, discount_rate=discount_rate,
+            seed=int(seed) if fixed_seed else None
+        )
+        st.session_state["mc_summary"] = monte_carlo.summarize(sim)
+        perf.lap("monte carlo")
+
+    perf.lap("tab5 widgets")
+
+    summary = st.session_state.get("mc_summary")
+
+    if summary:
+        m1, m2, m3, m4 = st.columns(4)
+        m1.metric("Median NPV", f"{summary['npv_percentiles'][50]:,.0f}")
+        m2.metric("Mean NPV", f"{summary['npv_mean']:,.0f}")
+        m3.metric("P(NPV < 0)", f"{summary['prob_negative_npv'] * 100:.1f}%")
+        m4.metric("P(Not Recovered)", f"{summary['prob_not_recovered'] * 100:.1f}%")
+
+        df_percentiles = pd.DataFrame({
+            "Percentile": [f"P{p}" for p in summary["npv_percentiles"]],
+            "NPV": list(summary["npv_percentiles"].values()),
+            "ROI (%)": list(summary["roi_percentiles"].values()),
+            "IRR (%)": [v * 100 if v is not None else None for v in summary["irr_percentiles"].values()],
+            "Payback (Years)": [f"{v:.0f}" if v != float("inf") else "Not Recovered" for v in summary["payback_percentiles"].values()]
+        })
+
+        st.dataframe(
+            df_percentiles.style.format({"NPV": "{:,.0f}", "ROI (%)": "{:,.1f}", "IRR (%)": "{:,.1f}"}, na_rep="n/a"),
+            use_container_width=True,
+            hide_index=True
+        )
+
+        counts, edges = summary["npv_histogram"]
+
+        fig_mc = go.Figure()
+
+        fig_mc.add_bar(
+            x=(edges[:-1] + edges[1:]) / 2,
+            y=counts,
+            width=edges[1] - edges[0],
+            name="Scenarios",
+            marker_color="#1f77b4"
+        )
+
+        fig_mc.add_vline(x=0, line_dash="dash", line_color="red", annotation_text="Break-even")
+
+        fig_mc.update_layout(
+            title=f"NPV Distribution ({summary['n_sims']:,} scenarios)",
+            xaxis=dict(title="NPV"),
+            yaxis=dict(title="Scenarios"),
+            showlegend=False,
+            height=450
+        )
+        perf.lap("fig_mc build")
+
+        st.plotly_chart(fig_mc, use_container_width=True)
+        perf.lap("fig_mc chart")
+
+    perf.end_fragment()
+
+
+with tab5:
+
+    st.subheader("Risk Simulation")
+
+    risk_simulation(point_inputs, analysis_years, discount_rate)
+
+
+#=====================================================
+# TAB 6 : SENSITIVITY (TORNADO + HEATMAP)
+#=====================================================
+
+# Range, metric and heatmap axes rerun only the sensitivity charts.
+@st.fragment
+def sensitivity_analysis(base_inputs, analysis_years, base_npv, base_roi):
+    perf.begin_fragment("sensitivity")
+
+    t1, t2 = st.columns(2)
+    spread_pct = t1.slider("Input Range (±%)", 5, 100, 20)
+    tornado_metric = t2.selectbox("Tornado Metric", ["NPV", "ROI (%)"])
+
+    one_way = cached_calcs.one_way_sensitivity(base_inputs, spread_pct, analysis_years)
+    rows = sensitivity.tornado(one_way, sensitivity.METRICS[tornado_metric])
+    base_value = base_npv if tornado_metric == "NPV" else base_roi
+    perf.lap("one-way sensitivity")
+
+    fig_tornado = go.Figure()
+
+    fig_tornado.add_bar(
+        y=[r["label"] for r in rows],
+        x=[r["low"] - base_value for r in rows],
+        base=base_value,
+        orientation="h",
+        name=f"Input -{spread_pct}%",
+        marker_color="#EF553B"
+    )
+
+    fig_tornado.add_bar(
+        y=[r["label"] for r in rows],
+        x=[r["high"] - base_value for r in rows],
+        base=base_value,
+        orientation="h",
+        name=f"Input +{spread_pct}%",
+        marker_color="#00CC96"
+    )
+
+    fig_tornado.add_vline(x=base_value, line_dash="dash", line_color="black")
+
+    fig_tornado.update_layout(
+        title=f"{tornado_metric} Sensitivity (Tornado)",
+        barmode="overlay",
+        yaxis=dict(autorange="reversed"),
+        xaxis=dict(title=tornado_metric),
+        legend=dict(orientation="h", y=-0.2),
+        height=500
+    )
+    perf.lap("fig_tornado build")
+
+    st.plotly_chart(fig_tornado, use_container_width=True)
+    perf.lap("fig_tornado chart")
+
+    st.subheader("Two-Input Heatmap")
+
+    field_options = list(sensitivity.SENSITIVITY_FIELDS)
+
+    h1, h2, h3, h4 = st.columns(4)
+    x_field = h1.selectbox("X Input", field_options, index=field_options.index("prod_inc_per"), format_func=sensitivity.SENSITIVITY_LABELS.get)
+    y_field = h2.selectbox("Y Input", field_options, index=field_options.index("annual_iiot_cost"), format_func=sensitivity.SENSITIVITY_LABELS.get)
+    heatmap_metric = h3.selectbox("Heatmap Metric", list(sensitivity.METRICS))
+    grid_size = h4.selectbox("Grid Size", [25, 50, 100, 250, 500], index=2)
+
+    if x_field == y_field:
+        st.warning("Pick two different inputs for the heatmap.")
+    else:
+        two_way = cached_calcs.two_way_sensitivity(base_inputs, x_field, y_field, spread_pct, grid_size, analysis_years)
+        perf.lap("two-way sensitivity")
+
+        fig_heat = go.Figure(go.Heatmap(
+            z=two_way[sensitivity.METRICS[heatmap_metric]],
+            x=two_way["x_values"],
+            y=two_way["y_values"],
+            colorscale="RdYlGn_r" if heatmap_metric == "Payback (Years)" else "RdYlGn",
+            colorbar=dict(title=heatmap_metric)
+        ))
+
+        fig_heat.update_layout(
+            title=f"{heatmap_metric}: {sensitivity.SENSITIVITY_LABELS[x_field]} vs {sensitivity.SENSITIVITY_LABELS[y_field]}",
+            xaxis=dict(title=sensitivity.SENSITIVITY_LABELS[x_field]),
+            yaxis=dict(title=sensitivity.SENSITIVITY_LABELS[y_field]),
+            height=550
+        )
+        perf.lap("fig_heat build")
+
+        st.plotly_chart(fig_heat, use_container_width=True)
+        perf.lap("fig_heat chart")
+
+    perf.end_fragment()
+
+
+with tab6:
+
+    st.subheader("Sensitivity Analysis")
+
+    sensitivity_analysis(dict(point_inputs, discount_rate=discount_rate), analysis_years, npv_vals[-1], roi_vals[-1])
+
+
+#=====================================================
+# TAB 7 : MONTHLY CASH FLOW (LONG HORIZONS)
+#=====================================================
+
+# Month-by-month model over up to 30 years with a ramp-up of the production
+# increase and a yearly escalation of the annual IIoT cost.
+@st.fragment
+def monthly_cash_flow(total_iiot_investment, incremental_profit, annual_iiot_cost, discount_rate):
+    perf.begin_fragment("monthly cash flow")
+
+    c1, c2, c3, c4 = st.columns(4)
+    horizon_years = c1.slider("Horizon (Years)", 1, roi_engine.MAX_ANALYSIS_YEARS, 10)
+    ramp_months = c2.number_input("Ramp-up (Months)", min_value=0, max_value=120, value=6, step=1)
+    ramp_shape = c3.selectbox("Ramp-up Shape", roi_engine.RAMP_SHAPES, format_func=str.capitalize)
+    cost_escalation = c4.number_input("Annual Cost Escalation (%)", min_value=0.0, value=3.0) / 100
+
+    monthly = cached_calcs.monthly_cash_flows(
+        total_iiot_investment, incremental_profit, annual_iiot_cost, horizon_years,
+        discount_rate, ramp_months, ramp_shape, cost_escalation
+    )
+    perf.lap("monthly cash flows")
+
+    payback_month = monthly["payback_month"] or None
+
+    m1, m2, m3, m4, m5 = st.columns(5)
+    m1.metric("NPV", f"{monthly['npv']:,.0f}")
+    m2.metric("ROI (%)", f"{monthly['roi']:.1f}%")
+    m3.metric("IRR (annualised)", f"{monthly['irr'] * 100:.1f}%" if monthly["irr"] is not None else "n/a")
+    m4.metric("Payback", f"{monthly['payback_period']:.1f} months" if monthly["payback_period"] is not None else "Not Recovered")
+    m5.metric("Discounted Payback", f"{monthly['discounted_payback']:.1f} months" if monthly["discounted_payback"] is not None else "Not Recovered")
+
+    fig_monthly = charts.monthly_figure(
+        monthly["months"], monthly["cumulative_cf"], monthly["npv_vals"], payback_month
+    )
+    perf.lap("fig_monthly build")
+
+    st.plotly_chart(fig_monthly, use_container_width=True)
+    perf.lap("fig_monthly chart")
+
+    with st.expander("Monthly cash flow table"):
+        st.dataframe(
+            monthly["df_monthly"].style.format({
+                "Cash Flow": "{:,.0f}",
+                "Cumulative Cash Flow": "{:,.0f}",
+                "NPV": "{:,.0f}",
+                "ROI (%)": "{:,.1f}"
+            }),
+            use_container_width=True,
+            hide_index=True
+        )
+
+    perf.end_fragment()
+
+
+with tab7:
+
+    st.subheader("Monthly Cash Flow")
+
+    monthly_cash_flow(total_iiot_investment, incremental_profit, annual_iiot_cost, discount_rate)
+
+#=====================================================
+# TAB 8 : GOAL SEEK
+#=====================================================
+
+with tab8:
+
+    st.subheader("Goal Seek")
+
+    goal_seek_panel.render(
+        "new_app1", goal_seek.seek, dict(point_inputs, discount_rate=discount_rate),
+        list(goal_seek.SEEK_FIELDS), goal_seek.SEEK_LABELS, goal_seek.TARGETS, analysis_years, "prod_inc_per"
+    )
+
+#=====================================================
+# TAB 9 : SCENARIO COMPARISON
+#=====================================================
+
+def reset_compare_table(base_inputs):
+    st.session_state["compare_table"] = pd.DataFrame(scenario_compare.preset_scenarios(base_inputs))
+    st.session_state.pop("compare_editor", None)
+
+
+# Named variants of the tab1 inputs side by side: every row of the table is
+# one scenario and all of them are evaluated in a single vectorized pass,
+# so comparing options costs one rerun of this fragment.
+@st.fragment
+def scenario_comparison(base_inputs, analysis_years, discount_rate):
+    perf.begin_fragment("scenario comparison")
+
+    if "compare_table" not in st.session_state:
+        reset_compare_table(base_inputs)
+
+    st.caption(
+        f"Up to {scenario_compare.MAX_SCENARIOS} scenarios. Blank cells keep the value from Financial Inputs."
+    )
+    st.button("Reset to Conservative / Expected / Aggressive", on_click=reset_compare_table, args=(base_inputs,))
+
+    df_scenarios = st.data_editor(
+        st.session_state["compare_table"],
+        num_rows="dynamic",
+        key="compare_editor",
+        hide_index=True,
+        use_container_width=True,
+        column_config=dict(
+            {"Scenario": st.column_config.TextColumn("Scenario")},
+            **{field: st.column_config.NumberColumn(roi_engine.INPUT_LABELS[field], min_value=0.0, format="%.2f")
+               for field in scenario_compare.COMPARE_FIELDS}
+        )
+    )
+    perf.lap("scenario table")
+
+    scenarios = df_scenarios.to_dict("records")
+    if not scenarios:
+        st.info("Add a row to compare scenarios.")
+        perf.end_fragment()
+        return
+    if len(scenarios) > scenario_compare.MAX_SCENARIOS:
+        st.warning(f"Only the first {scenario_compare.MAX_SCENARIOS} scenarios are compared.")
+        scenarios = scenarios[:scenario_compare.MAX_SCENARIOS]
+
+    names, result = scenario_compare.evaluate(base_inputs, scenarios, analysis_years, discount_rate)
+    perf.lap("scenario evaluation")
+
+    df_kpis = pd.DataFrame(dict({"Scenario": names}, **scenario_compare.kpi_table(result)))
+    st.dataframe(
+        df_kpis.style.format({label: "{:,.1f}" for label in scenario_compare.KPI_LABELS.values()}, na_rep="n/a"),
+        use_container_width=True,
+        hide_index=True
+    )
+
+    fig_compare = charts.scenario_overlay(names, result["years"], result["cumulative_cf"], result["npv_vals"])
+    perf.lap("fig_compare build")
+
+    st.plotly_chart(fig_compare, use_container_width=True)
+    perf.lap("fig_compare chart")
+
+    perf.end_fragment()
+
+
+with tab9:
+
+    st.subheader("Scenario Comparison")
+
+    scenario_comparison(point_inputs, analysis_years, discount_rate)
+
+# --------------------------------------------------
+# SAVED SCENARIOS
+# --------------------------------------------------
+scenario_panel.render(
+    "new_app1.py",
+    list(roi_engine.INPUT_FIELDS) + ["analysis_years", "discount_rate_pct"],
+    {
+        "npv": npv_vals[-1],
+        "roi": roi_vals[-1],
+        "irr": yearly["irr"],
+        "payback": yearly["payback_period"],
+        "payback_year": payback_year,
+        "discounted_payback": yearly["discounted_payback"],
+        "total_iiot_investment": total_iiot_investment,
+        "net_annual_benefit": net_annual_benefit,
+        "profit_after": profit_after
+    }
+)
 
+perf.report()
@@ -0,0 +1,207 @@
+import atexit
+import os
+import threading
+
+import numpy as np
+
+import roi_engine
+
+# --------------------------------------------------
+# PARALLEL SETTINGS
+# --------------------------------------------------
+# Scenario arrays are cut into row chunks that run on a process pool. The
+# input arrays are copied once into shared memory and every worker maps its
+# rows from there, so only the chunk bounds and the (small) per-scenario
+# results cross process boundaries. workers = 1 runs in-process, and the
+# multiprocessing modules are only imported once a pool is needed.
+#   ROI_WORKERS     worker processes (default: all cores)
+#   ROI_CHUNK_SIZE  scenarios per task
+WORKERS = int(os.environ.get("ROI_WORKERS", os.cpu_count() or 1))
+CHUNK_SIZE = int(os.environ.get("ROI_CHUNK_SIZE", 100_000))
+
+# KPIs returned per scenario by evaluate() / evaluate_monthly()
+KPI_FIELDS = ("npv", "roi", "irr", "payback_year", "payback_period", "discounted_payback")
+MONTHLY_KPI_FIELDS = ("npv", "roi", "irr", "payback_month", "payback_period", "discounted_payback")
+
+
+# --------------------------------------------------
+# PROCESS POOL
+# --------------------------------------------------
+# One pool per process, kept between calls so workers import numpy and the
+# engine once. Workers are spawned, not forked: forking a threaded server
+# (Streamlit) can copy a held lock into the child.
+#
+# The pool is shared by every caller (scenario engine, report queues, other
+# sessions), so its size is set by the first call and a later call with a
+# different worker count gets the same pool: replacing it would cancel
+# everyone else's queued tasks. It is only rebuilt once broken.
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool(workers=None):
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    global _pool
+    with _pool_lock:
+        # A worker that died (e.g. out of memory) breaks the whole pool and
+        # already failed its pending tasks
+        if _pool is None or getattr(_pool, "_broken", False):
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=workers or WORKERS,
+                                        mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+@atexit.register
+def shutdown():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+
+
+# Runs fn(*args) for every args tuple, on the pool when workers > 1, and
+# returns the results in order.
+def run(fn, tasks, workers=None):
+    workers = workers or WORKERS
+    tasks = list(tasks)
+    if workers <= 1 or len(tasks) <= 1:
+        return [fn(*args) for args in tasks]
+    return list(get_pool(workers).map(fn, *zip(*tasks)))
+
+
+# --------------------------------------------------
+# SHARED INPUT ARRAYS
+# --------------------------------------------------
+# Copies a dict of arrays into shared memory blocks; specs() is the
+# picklable handle workers attach with. Blocks are unlinked on exit.
+class SharedArrays:
+
+    def __init__(self, arrays):
+        from multiprocessing import shared_memory
+
+        self._blocks = []
+        self._specs = {}
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            self._blocks.append(block)
+            np.ndarray(array.shape, array.dtype, buffer=block.buf)[...] = array
+            self._specs[name] = (block.name, array.shape, array.dtype.str)
+
+    def specs(self):
+        return self._specs
+
+    def close(self):
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _attach(name):
+    from multiprocessing import shared_memory
+
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 has no track flag; the parent owns the unlink
+        return shared_memory.SharedMemory(name=name)
+
+
+def _run_shared(fn, specs, args):
+    blocks = {name: _attach(spec[0]) for name, spec in specs.items()}
+    try:
+        arrays = {name: np.ndarray(spec[1], np.dtype(spec[2]), buffer=blocks[name].buf)
+                  for name, spec in specs.items()}
+        # Results must not point into the shared blocks once they are closed
+        result = {key: np.array(value) for key, value in fn(arrays, *args).items()}
+        del arrays
+    finally:
+        for block in blocks.values():
+            block.close()
+    return result
+
+
+# Runs fn(arrays, *args) for every args tuple and returns the results in
+# order. fn returns a dict of arrays. On the pool, arrays is shared once
+# and each task only pickles its own args.
+def run_shared(fn, arrays, tasks, workers=None):
+    workers = workers or WORKERS
+    tasks = list(tasks)
+    if workers <= 1 or len(tasks) <= 1:
+        return [fn(arrays, *args) for args in tasks]
+    with SharedArrays(arrays) as shared:
+        return run(_run_shared, [(fn, shared.specs(), args) for args in tasks], workers)
+
+
+# --------------------------------------------------
+# ROW-SHARDED MAP
+# --------------------------------------------------
+# fn(rows, **kwargs) takes a dict of row slices of the input arrays (all
+# the same length along axis 0) and returns a dict of per-row arrays; the
+# chunk results are concatenated back in row order. Empty input still runs
+# fn once on the empty slices, so the result has the usual keys and dtypes.
+def map_rows(fn, arrays, workers=None, chunk_size=None, **kwargs):
+    chunk_size = chunk_size or CHUNK_SIZE
+    n = len(next(iter(arrays.values())))
+    bounds = [(start, min(start + chunk_size, n)) for start in range(0, n, chunk_size)] or [(0, 0)]
+    return merge(run_shared(_slice_rows, arrays, [(fn, start, stop, kwargs) for start, stop in bounds], workers))
+
+
+def _slice_rows(arrays, fn, start, stop, kwargs):
+    return fn({name: a[start:stop] for name, a in arrays.items()}, **kwargs)
+
+
+def merge(parts):
+    return {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+
+
+# --------------------------------------------------
+# MODEL KERNELS
+# --------------------------------------------------
+# Per-scenario KPIs of the new_app1.py model. inputs holds any of
+# roi_engine.INPUT_FIELDS (others take the defaults) and may carry a
+# per-scenario "discount_rate".
+def evaluate_kpis(inputs, analysis_years=5, discount_rate=0.10, fields=KPI_FIELDS):
+    inputs = dict(inputs)
+    discount_rate = inputs.pop("discount_rate", discount_rate)
+    result = roi_engine.evaluate_inputs(inputs, analysis_years=analysis_years, discount_rate=discount_rate,
+                                        solve_irr="irr" in fields)
+    n = len(next(iter(inputs.values())))
+    return {field: np.broadcast_to(result[field], n) for field in fields}
+
+
+def evaluate(inputs, analysis_years=5, discount_rate=0.10, fields=KPI_FIELDS, workers=None, chunk_size=None):
+    arrays = {name: np.asarray(value, dtype=float) for name, value in inputs.items()}
+    return map_rows(evaluate_kpis, arrays, workers, chunk_size,
+                    analysis_years=analysis_years, discount_rate=discount_rate, fields=fields)
+
+
+# Per-scenario KPIs of the monthly model (up to 360 periods per scenario);
+# inputs holds total_iiot_investment, incremental_profit, annual_iiot_cost
+# and optionally ramp_months and cost_escalation.
+def monthly_kpis(inputs, analysis_years=5, discount_rate=0.10, ramp_shape="linear", fields=MONTHLY_KPI_FIELDS):
+    result = roi_engine.monthly_cash_flows(
+        inputs["total_iiot_investment"], inputs["incremental_profit"], inputs["annual_iiot_cost"],
+        analysis_years, discount_rate, inputs.get("ramp_months", 0), ramp_shape,
+        inputs.get("cost_escalation", 0.0), solve_irr="irr" in fields)
+    n = len(inputs["total_iiot_investment"])
+    return {field: np.broadcast_to(result[field], n) for field in fields}
+
+
+def evaluate_monthly(inputs, analysis_years=5, discount_rate=0.10, ramp_shape="linear",
+                     fields=MONTHLY_KPI_FIELDS, workers=None, chunk_size=None):
+    arrays = {name: np.asarray(value, dtype=float) for name, value in inputs.items()}
+    return map_rows(monthly_kpis, arrays, workers, chunk_size, analysis_years=analysis_years,
+                    discount_rate=discount_rate, ramp_shape=ramp_shape, fields=fields)
@@ -0,0 +1,166 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+import numpy as np
+import streamlit as st
+
+# --------------------------------------------------
+# RERUN INSTRUMENTATION (opt-in)
+# --------------------------------------------------
+# Enabled with ?perf=1 in the page URL or ROI_PERF=1 in the environment.
+# A page calls begin() once at the top, lap() after each stage (the time
+# since the previous lap is booked to that stage) and report() at the end.
+# report() shows the rerun in a sidebar expander, logs it as one JSON line
+# to the "roi_perf" logger (and to ROI_PERF_LOG if set) and adds it to the
+# per-stage samples shared by every session in this process.
+#
+# A st.fragment body calls begin_fragment() / end_fragment() around its
+# laps. During a full rerun these do nothing; when the fragment reruns on
+# its own they record it as a separate "page:fragment" run (logged and
+# aggregated, but not drawn, since fragments cannot write to the sidebar).
+#
+# While disabled every call is a session_state lookup and nothing else.
+
+SAMPLE_WINDOW = 1000
+
+# The logger is set to INFO with a NullHandler: records reach the handlers
+# of ROI_PERF_LOG or of a host application's logging config (through the
+# root logger) and are dropped when neither exists.
+logger = logging.getLogger("roi_perf")
+logger.setLevel(logging.INFO)
+logger.addHandler(logging.NullHandler())
+
+_samples = defaultdict(lambda: deque(maxlen=SAMPLE_WINDOW))
+_lock = threading.Lock()
+_log_file_added = False
+
+
+def _enabled():
+    return bool(os.environ.get("ROI_PERF")) or st.query_params.get("perf") == "1"
+
+
+def _current():
+    return st.session_state.get("_perf_run")
+
+
+def begin(page):
+    if not _enabled():
+        st.session_state["_perf_run"] = None
+        return
+    now = time.perf_counter()
+    st.session_state["_perf_run"] = {"page": page, "start": now, "last": now, "stages": [], "open": True}
+
+
+def begin_fragment(name):
+    run = _current()
+    if run is None or run["open"]:
+        return
+    now = time.perf_counter()
+    st.session_state["_perf_run"] = {"page": f"{run['page'].split(':')[0]}:{name}", "start": now,
+                                     "last": now, "stages": [], "open": True, "fragment": True}
+
+
+def end_fragment():
+    run = _current()
+    if run is None or not run.get("fragment"):
+        return
+    _record(run)
+
+
+def lap(stage):
+    run = _current()
+    if run is None:
+        return
+    now = time.perf_counter()
+    run["stages"].append((stage, now - run["last"]))
+    run["last"] = now
+
+
+# For work that is not a straight run of page code, e.g. inside a cached
+# function (only recorded on a cache miss). The time is not counted again
+# by the next lap().
+@contextmanager
+def stage(name):
+    run = _current()
+    if run is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        run["stages"].append((name, elapsed))
+        run["last"] += elapsed
+
+
+def _percentiles(values):
+    p50, p95 = np.percentile(values, [50, 95])
+    return p50 * 1000, p95 * 1000
+
+
+def summary(page=None):
+    with _lock:
+        items = [(key, list(values)) for key, values in _samples.items()
+                 if page is None or key[0].split(":")[0] == page]
+    rows = []
+    for (page_name, stage_name), values in items:
+        p50, p95 = _percentiles(values)
+        rows.append({"Page": page_name, "Stage": stage_name, "Samples": len(values),
+                     "p50 (ms)": p50, "p95 (ms)": p95})
+    return sorted(rows, key=lambda r: r["p95 (ms)"], reverse=True)
+
+
+def _log(record):
+    global _log_file_added
+    path = os.environ.get("ROI_PERF_LOG")
+    if path and not _log_file_added:
+        handler = logging.FileHandler(path)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        _log_file_added = True
+    logger.info(json.dumps(record))
+
+
+def _record(run):
+    run["open"] = False
+    total = time.perf_counter() - run["start"]
+    stages = run["stages"] + [("total", total)]
+
+    with _lock:
+        for name, elapsed in stages:
+            _samples[(run["page"], name)].append(elapsed)
+
+    _log({
+        "page": run["page"],
+        "time": time.time(),
+        "stages": {name: round(elapsed * 1000, 3) for name, elapsed in stages},
+    })
+    return total, stages
+
+
+def report():
+    run = _current()
+    if run is None:
+        return
+    total, stages = _record(run)
+
+    with st.sidebar.expander("Performance", expanded=True):
+        st.caption(f"This rerun: {total * 1000:,.1f} ms")
+        st.dataframe(
+            [{"Stage": name, "ms": round(elapsed * 1000, 2)} for name, elapsed in stages],
+            use_container_width=True,
+            hide_index=True
+        )
+        st.caption("All sessions (p50 / p95)")
+        st.dataframe(
+            [{k: round(v, 2) if isinstance(v, float) else v for k, v in row.items()}
+             for row in summary(run["page"])],
+            use_container_width=True,
+            hide_index=True
+        )
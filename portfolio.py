@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+
+import roi_engine
+
+# --------------------------------------------------
+# PORTFOLIO TABLE
+# --------------------------------------------------
+# One row per plant: the new_app1.py inputs (roi_engine.INPUT_FIELDS) plus a
+# name and the columns plants can be filtered and grouped by. Missing input
+# columns fall back to the calculator defaults, missing labels to
+# "Unassigned".
+NAME_COLUMN = "Plant"
+GROUP_COLUMNS = ("Region", "Plant Type")
+
+RESULT_FIELDS = ("total_iiot_investment", "net_annual_benefit", "profit_after",
+                 "npv", "roi", "irr", "payback_year", "payback_period")
+
+
+def normalize(df):
+    plants = pd.DataFrame(index=pd.RangeIndex(len(df)))
+    plants[NAME_COLUMN] = (df[NAME_COLUMN].astype(str).to_numpy() if NAME_COLUMN in df
+                           else [f"Plant {i + 1}" for i in range(len(df))])
+    for column in GROUP_COLUMNS:
+        plants[column] = df[column].fillna("Unassigned").astype(str).to_numpy() if column in df else "Unassigned"
+    for field in roi_engine.INPUT_FIELDS:
+        default = roi_engine.DEFAULT_INPUTS[field]
+        values = pd.to_numeric(df[field], errors="coerce").fillna(default).to_numpy() if field in df else default
+        plants[field] = np.maximum(values, roi_engine.INPUT_MIN_VALUES[field])
+    return plants
+
+
+# Random but plausible plants for trying the page out at scale
+def sample_portfolio(n_plants, seed=0):
+    rng = np.random.default_rng(seed)
+    regions = np.array(["North", "South", "East", "West"])
+    plant_types = np.array(["Assembly", "Machining", "Process", "Packaging"])
+    df = pd.DataFrame({
+        NAME_COLUMN: [f"Plant {i + 1}" for i in range(n_plants)],
+        "Region": regions[rng.integers(0, len(regions), n_plants)],
+        "Plant Type": plant_types[rng.integers(0, len(plant_types), n_plants)],
+        "annual_turnover": rng.lognormal(np.log(2e6), 0.6, n_plants).round(-3),
+        "profit_margin": rng.uniform(5, 20, n_plants).round(1),
+        "sales_admin_margin": rng.uniform(5, 15, n_plants).round(1),
+        "mat_margin": rng.uniform(30, 55, n_plants).round(1),
+        "labor_margin": rng.uniform(10, 30, n_plants).round(1),
+        "units_per_year": rng.integers(1_000, 50_000, n_plants).astype(float),
+        "capital_cost": rng.lognormal(np.log(1e6), 0.5, n_plants).round(-3),
+        "iiot_cost": rng.uniform(2e4, 1e5, n_plants).round(-2),
+        "imp_cost": rng.uniform(1e4, 5e4, n_plants).round(-2),
+        "prod_inc_per": rng.uniform(5, 25, n_plants).round(1),
+        "annual_iiot_cost": rng.uniform(5e3, 2e4, n_plants).round(-2),
+    })
+    return normalize(df)
+
+
+# --------------------------------------------------
+# PER-PLANT EVALUATION
+# --------------------------------------------------
+# Every plant goes through the engine in one batch. Returns the plant table
+# with RESULT_FIELDS appended; payback_year is empty where not recovered.
+def evaluate(plants, analysis_years=5, discount_rate=0.10):
+    inputs = {field: plants[field].to_numpy(dtype=float) for field in roi_engine.INPUT_FIELDS}
+    result = roi_engine.evaluate_inputs(inputs, analysis_years=analysis_years, discount_rate=discount_rate)
+
+    scored = plants.copy()
+    n = len(plants)
+    for field in RESULT_FIELDS:
+        scored[field] = np.broadcast_to(result[field], n)
+    scored["payback_year"] = scored["payback_year"].astype("Int64").mask(scored["payback_year"] == 0)
+    return scored
+
+
+# --------------------------------------------------
+# CONSOLIDATION
+# --------------------------------------------------
+# Each plant's flows are -investment in year 0 then a level net benefit, so
+# any sum of plants is again a level annuity: a group's cash flows are
+# yearly_cash_flows() of its summed investment and summed benefit. All
+# groups go through the engine as one batch. by=None consolidates every
+# plant into a single "All plants" row.
+def consolidate(scored, by=None, analysis_years=5, discount_rate=0.10):
+    columns = ["total_iiot_investment", "net_annual_benefit", "profit_after"]
+    if by is None:
+        totals = scored[columns].sum().to_frame().T
+        totals.insert(0, "Group", ["All plants"])
+        totals.insert(1, "Plants", [len(scored)])
+    else:
+        grouped = scored.groupby(by, sort=True)
+        totals = grouped[columns].sum().reset_index().rename(columns={by: "Group"})
+        totals.insert(1, "Plants", grouped.size().to_numpy())
+
+    group_flows = roi_engine.yearly_cash_flows(
+        totals["total_iiot_investment"].to_numpy(dtype=float),
+        totals["net_annual_benefit"].to_numpy(dtype=float),
+        analysis_years, discount_rate)
+
+    for field in ("npv", "roi", "irr", "payback_period", "discounted_payback"):
+        totals[field] = group_flows[field]
+    totals["payback_year"] = pd.array(group_flows["payback_year"], dtype="Int64")
+    totals["payback_year"] = totals["payback_year"].mask(totals["payback_year"] == 0)
+    return totals, group_flows
@@ -0,0 +1,217 @@
+import streamlit as st
+import pandas as pd
+import plotly.graph_objects as go
+
+import cached_calcs
+import perf
+import portfolio
+import roi_engine
+
+# --------------------------------------------------
+# PAGE CONFIG
+# --------------------------------------------------
+st.set_page_config(
+    page_title="SAMPRAMA PORTFOLIO CALCULATOR",
+    layout="wide"
+)
+
+perf.begin("portfolio_app.py")
+
+st.title("SAMPRAMA PORTFOLIO CALCULATOR")
+
+# --------------------------------------------------
+# SIDEBAR (GLOBAL SETTINGS ONLY)
+# --------------------------------------------------
+with st.sidebar:
+    st.header("Global Settings")
+
+    analysis_years = st.selectbox(
+        "Analysis Period (Years)", [3, 5, 7, 10], index=1
+    )
+
+    discount_rate = st.slider(
+        "Discount Rate (%)", 5, 20, 10
+    ) / 100
+
+    st.header("Plants")
+
+    source = st.radio("Plant Data", ["Sample portfolio", "Upload file"])
+
+    if source == "Upload file":
+        plant_file = st.file_uploader(
+            "Plant file (CSV or Parquet)", type=["csv", "parquet"],
+            help="One row per plant. Columns: Plant, Region, Plant Type and "
+                 + ", ".join(roi_engine.INPUT_FIELDS) + ". Missing inputs use the calculator defaults."
+        )
+        plants = cached_calcs.read_portfolio_file(plant_file.getvalue(), plant_file.name) if plant_file else None
+    else:
+        n_plants = st.selectbox("Sample Size", [25, 100, 1_000, 10_000], index=1, format_func=lambda n: f"{n:,} plants")
+        plants = cached_calcs.sample_portfolio(n_plants)
+
+if plants is None or plants.empty:
+    st.info("Upload a plant file to build the portfolio.")
+    st.stop()
+
+perf.lap("widget read")
+
+# --------------------------------------------------
+# CORE CALCULATIONS (SHARED)
+# --------------------------------------------------
+scored = cached_calcs.evaluate_portfolio(plants, analysis_years, discount_rate)
+
+perf.lap("score plants")
+
+# --------------------------------------------------
+# FILTERS
+# --------------------------------------------------
+f1, f2, f3 = st.columns(3)
+
+selected = {}
+for col, column in zip((f1, f2), portfolio.GROUP_COLUMNS):
+    options = sorted(scored[column].unique())
+    selected[column] = col.multiselect(column, options, placeholder=f"All {column.lower()}s")
+
+group_by = f3.selectbox("Group By", ["None"] + list(portfolio.GROUP_COLUMNS))
+
+mask = pd.Series(True, index=scored.index)
+for column, values in selected.items():
+    if values:
+        mask &= scored[column].isin(values)
+filtered = scored[mask]
+
+if filtered.empty:
+    st.warning("No plants match the selected filters.")
+    st.stop()
+
+totals, consolidated = cached_calcs.consolidate_portfolio(filtered, None, analysis_years, discount_rate)
+total = totals.iloc[0]
+
+perf.lap("consolidate")
+
+# ==================================================
+# CONSOLIDATED RESULTS
+# ==================================================
+st.subheader("Consolidated")
+
+k1, k2, k3, k4, k5, k6 = st.columns(6)
+k1.metric("Plants", f"{len(filtered):,}")
+k2.metric("Total Investment", f"{total['total_iiot_investment']:,.0f}")
+k3.metric("Annual Benefit", f"{total['net_annual_benefit']:,.0f}")
+k4.metric("NPV", f"{total['npv']:,.0f}")
+k5.metric("IRR", f"{total['irr'] * 100:.1f}%" if pd.notna(total["irr"]) else "n/a")
+k6.metric("Payback", f"{total['payback_period']:.2f} years" if pd.notna(total["payback_period"]) else "Not Recovered")
+
+fig_portfolio = go.Figure()
+
+fig_portfolio.add_bar(
+    x=consolidated["years"],
+    y=consolidated["cumulative_cf"][0],
+    name="Cumulative Cash Flow",
+    marker_color="#4CAF50"
+)
+
+fig_portfolio.add_scatter(
+    x=consolidated["years"],
+    y=consolidated["npv_vals"][0],
+    name="NPV",
+    line=dict(color="#1f77b4", width=3)
+)
+
+fig_portfolio.update_layout(
+    title="Consolidated Cash Flow",
+    yaxis=dict(title="Cash Flow / NPV"),
+    xaxis=dict(title="Year"),
+    legend=dict(orientation="h", y=-0.25),
+    height=450
+)
+
+st.plotly_chart(fig_portfolio, use_container_width=True)
+perf.lap("fig_portfolio")
+
+# ==================================================
+# GROUPS
+# ==================================================
+if group_by != "None":
+    st.subheader(f"By {group_by}")
+
+    groups, _ = cached_calcs.consolidate_portfolio(filtered, group_by, analysis_years, discount_rate)
+
+    fig_groups = go.Figure()
+
+    fig_groups.add_bar(
+        x=groups["Group"],
+        y=groups["npv"],
+        name="NPV",
+        marker_color="#1f77b4",
+        text=groups["npv"],
+        texttemplate="%{text:,.0f}",
+        textposition="outside",
+        cliponaxis=False
+    )
+
+    fig_groups.update_layout(
+        title=f"NPV by {group_by}",
+        yaxis=dict(title="NPV"),
+        showlegend=False,
+        height=400
+    )
+
+    g1, g2 = st.columns([1, 1.3])
+    g1.plotly_chart(fig_groups, use_container_width=True)
+    g2.dataframe(
+        groups.drop(columns=["profit_after", "discounted_payback"]).rename(columns={
+            "total_iiot_investment": "Investment",
+            "net_annual_benefit": "Annual Benefit",
+            "npv": "NPV",
+            "roi": "ROI (%)",
+            "irr": "IRR",
+            "payback_period": "Payback (Years)",
+            "payback_year": "Payback Year"
+        }),
+        column_config={
+            "Investment": st.column_config.NumberColumn(format="localized"),
+            "Annual Benefit": st.column_config.NumberColumn(format="localized"),
+            "NPV": st.column_config.NumberColumn(format="localized"),
+            "ROI (%)": st.column_config.NumberColumn(format="%.1f"),
+            "IRR": st.column_config.NumberColumn(format="percent"),
+            "Payback (Years)": st.column_config.NumberColumn(format="%.2f")
+        },
+        use_container_width=True,
+        hide_index=True
+    )
+    perf.lap("groups")
+
+# ==================================================
+# PLANTS
+# ==================================================
+# column_config formats in the browser; a pandas Styler would format every
+# cell of a 10k-row table on the server on each rerun.
+st.subheader("Plants")
+
+st.dataframe(
+    filtered[[portfolio.NAME_COLUMN, *portfolio.GROUP_COLUMNS, *portfolio.RESULT_FIELDS]],
+    column_config={
+        "total_iiot_investment": st.column_config.NumberColumn("Investment", format="localized"),
+        "net_annual_benefit": st.column_config.NumberColumn("Annual Benefit", format="localized"),
+        "profit_after": st.column_config.NumberColumn("Profit After", format="localized"),
+        "npv": st.column_config.NumberColumn("NPV", format="localized"),
+        "roi": st.column_config.NumberColumn("ROI (%)", format="%.1f"),
+        "irr": st.column_config.NumberColumn("IRR", format="percent"),
+        "payback_year": st.column_config.NumberColumn("Payback Year"),
+        "payback_period": st.column_config.NumberColumn("Payback (Years)", format="%.2f")
+    },
+    use_container_width=True,
+    hide_index=True,
+    height=400
+)
+
+# The CSV is only built when the button is clicked
+st.download_button(
+    "Download scored plants (CSV)",
+    data=lambda: filtered.to_csv(index=False),
+    file_name="portfolio_scored.csv",
+    mime="text/csv"
+)
+perf.lap("plants table")
+
+perf.report()
@@ -0,0 +1,178 @@
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+import parallel
+import portfolio
+import roi_engine
+
+# --------------------------------------------------
+# TIERED PRICE OPTIMIZER
+# --------------------------------------------------
+# Finds one price tier (iiot_cost, imp_cost, annual_iiot_cost) per customer
+# segment. A customer buys at a price when its payback (the new_app1.py
+# model at that price) is within max_payback years; each buyer pays
+# iiot_cost + imp_cost up front plus annual_iiot_cost for every year of the
+# analysis period. Per segment, every price on the grid is evaluated
+# against every customer and the price with the highest revenue wins, among
+# those at which at least min_coverage of the segment buys.
+#
+#   python pricing_optimizer.py plants.csv --segment "Plant Type" --max-payback 1.5
+#   python pricing_optimizer.py plants.parquet --steps 25 --workers 4
+#
+# Customer files use the portfolio_app.py layout (portfolio.normalize); the
+# price columns in them are ignored.
+PRICE_FIELDS = ("iiot_cost", "imp_cost", "annual_iiot_cost")
+
+PAYBACK_KINDS = ("payback_period", "discounted_payback")
+
+# Customer x price evaluations per task
+DEFAULT_CHUNK_SIZE = 250_000
+
+
+# --------------------------------------------------
+# PRICE GRID
+# --------------------------------------------------
+# steps levels per price between low_pct and high_pct of the calculator
+# default, as a (steps ** 3, 3) matrix of candidate tiers.
+def price_grid(steps=15, low_pct=25.0, high_pct=400.0, base=None):
+    base = base or roi_engine.DEFAULT_INPUTS
+    levels = [np.linspace(base[f] * low_pct / 100, base[f] * high_pct / 100, steps) for f in PRICE_FIELDS]
+    return np.stack([g.ravel() for g in np.meshgrid(*levels, indexing="ij")], axis=1)
+
+
+# --------------------------------------------------
+# EVALUATION
+# --------------------------------------------------
+# The margin cascade does not depend on the price, so it runs once per
+# customer; only the cash flows are evaluated per customer x price.
+def incremental_profit(customers):
+    cascade_fields = [f for f in roi_engine.INPUT_FIELDS if f not in PRICE_FIELDS]
+    return roi_engine.margin_cascade(
+        *(customers[f].to_numpy(dtype=float) for f in cascade_fields))["incremental_profit"]
+
+
+# Buyers and revenue of each candidate price for one segment's customers
+def score_prices(profit, prices, max_payback, analysis_years=5, discount_rate=0.10,
+                 payback_kind="payback_period"):
+    investment = prices[:, 0] + prices[:, 1]
+    net_benefit = profit[None, :] - prices[:, 2, None]
+
+    yearly = roi_engine.yearly_cash_flows(
+        np.repeat(investment, len(profit)), net_benefit.ravel(), analysis_years, discount_rate, solve_irr=False)
+    payback = yearly[payback_kind].reshape(len(prices), len(profit))
+
+    with np.errstate(invalid="ignore"):
+        buyers = (payback <= max_payback).sum(axis=1)
+    revenue = buyers * (investment + prices[:, 2] * analysis_years)
+    return buyers, revenue
+
+
+def _score_slice(arrays, start, stop, prices, max_payback, analysis_years, discount_rate, payback_kind):
+    buyers, revenue = score_prices(arrays["profit"][start:stop], prices, max_payback, analysis_years,
+                                   discount_rate, payback_kind)
+    return {"buyers": buyers, "revenue": revenue}
+
+
+def _chunks(n_prices, n_customers, chunk_size):
+    step = max(1, chunk_size // max(n_customers, 1))
+    return [slice(i, i + step) for i in range(0, n_prices, step)]
+
+
+# Segments are independent and their price chunks are too, so every
+# (segment, chunk) pair is one task; with workers > 1 they run on the
+# parallel.py pool. Customers are sorted by segment so a segment is one
+# slice of the shared profit array, and a task only carries its bounds and
+# price chunk. Returns one row per segment with the winning tier, or NaN
+# prices where no candidate reaches min_coverage.
+def optimize(customers, segment_column="Plant Type", max_payback=1.5, min_coverage=0.8,
+             prices=None, analysis_years=5, discount_rate=0.10, payback_kind="payback_period",
+             workers=1, chunk_size=DEFAULT_CHUNK_SIZE):
+    if payback_kind not in PAYBACK_KINDS:
+        raise ValueError(f"Unknown payback kind: {payback_kind}")
+    prices = price_grid() if prices is None else np.asarray(prices, dtype=float)
+    segments = customers[segment_column].to_numpy()
+    order = np.argsort(segments, kind="stable")
+    profit = incremental_profit(customers)[order]
+    names, starts, counts = np.unique(segments[order], return_index=True, return_counts=True)
+
+    tasks = []
+    for segment, start, count in zip(names, starts, counts):
+        for chunk in _chunks(len(prices), count, chunk_size):
+            tasks.append((segment, chunk, start, start + count))
+
+    args = [(start, stop, prices[chunk], max_payback, analysis_years, discount_rate, payback_kind)
+            for _, chunk, start, stop in tasks]
+    results = parallel.run_shared(_score_slice, {"profit": profit}, args, workers)
+
+    merged = {}
+    for (segment, chunk, start, stop), result in zip(tasks, results):
+        entry = merged.setdefault(segment, {
+            "customers": int(stop - start),
+            "buyers": np.zeros(len(prices), dtype=int),
+            "revenue": np.zeros(len(prices))
+        })
+        entry["buyers"][chunk] = result["buyers"]
+        entry["revenue"][chunk] = result["revenue"]
+
+    rows = []
+    for segment, entry in merged.items():
+        coverage = entry["buyers"] / entry["customers"]
+        revenue = np.where(coverage >= min_coverage, entry["revenue"], -np.inf)
+        best = int(np.argmax(revenue))
+        found = np.isfinite(revenue[best])
+        row = {"Segment": segment, "Customers": entry["customers"]}
+        row.update({f: prices[best, i] if found else np.nan for i, f in enumerate(PRICE_FIELDS)})
+        row.update({
+            "Buyers": int(entry["buyers"][best]) if found else 0,
+            "Coverage": coverage[best] if found else np.nan,
+            "Revenue": entry["revenue"][best] if found else 0.0
+        })
+        rows.append(row)
+
+    result = pd.DataFrame(rows)
+    result.attrs["evaluations"] = len(prices) * len(customers)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find revenue-maximising price tiers per customer segment.")
+    parser.add_argument("input", nargs="?", help="CSV or Parquet file of customer plants (default: sample portfolio)")
+    parser.add_argument("--sample", type=int, default=1_000, help="sample portfolio size when no input is given")
+    parser.add_argument("--segment", default="Plant Type", help="column that defines the segments")
+    parser.add_argument("--max-payback", type=float, default=1.5, help="payback threshold in years")
+    parser.add_argument("--discounted", action="store_true", help="use the discounted payback")
+    parser.add_argument("--min-coverage", type=float, default=80.0, help="share of a segment that must buy, in %%")
+    parser.add_argument("--steps", type=int, default=15, help="price levels per price field")
+    parser.add_argument("--low", type=float, default=25.0, help="lowest price, in %% of the default")
+    parser.add_argument("--high", type=float, default=400.0, help="highest price, in %% of the default")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes (default: 1, in-process)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="evaluations per task")
+    parser.add_argument("--analysis-years", type=int, default=5, help="analysis period in years")
+    parser.add_argument("--discount-rate", type=float, default=10.0, help="discount rate in %%")
+    parser.add_argument("--output", help="CSV file to write the tiers to")
+    args = parser.parse_args(argv)
+
+    if args.input:
+        if args.input.lower().endswith((".parquet", ".pq")):
+            customers = portfolio.normalize(pd.read_parquet(args.input))
+        else:
+            customers = portfolio.normalize(pd.read_csv(args.input))
+    else:
+        customers = portfolio.sample_portfolio(args.sample)
+
+    tiers = optimize(
+        customers, args.segment, args.max_payback, args.min_coverage / 100,
+        price_grid(args.steps, args.low, args.high), args.analysis_years, args.discount_rate / 100,
+        "discounted_payback" if args.discounted else "payback_period", args.workers, args.chunk_size)
+
+    if args.output:
+        tiers.to_csv(args.output, index=False)
+    print(tiers.to_string(index=False))
+    print(f"{tiers.attrs['evaluations']:,} model evaluations", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import streamlit as st
+
+import reports
+
+# --------------------------------------------------
+# CUSTOMER REPORT EXPORT
+# --------------------------------------------------
+# The page builds the report from the results it already has; "Generate"
+# only queues it on the process-wide ReportQueue. The panel is a fragment:
+# its widgets (customer name, format, Generate) rerun the panel alone, not
+# the page and its charts. While the job runs a nested fragment polls its
+# status every POLL_SECONDS and triggers one full rerun when it finishes,
+# which swaps the progress bar for the download button.
+POLL_SECONDS = 1
+
+
+@st.cache_resource
+def get_queue():
+    return reports.ReportQueue()
+
+
+def _submit(page, report, fmt):
+    report = dict(report, subtitle=st.session_state.get(f"{page}_report_customer", "").strip() or report["subtitle"])
+    try:
+        st.session_state[f"{page}_report_job"] = get_queue().submit(report, fmt)
+    except reports.QueueFull:
+        st.session_state[f"{page}_report_status"] = "The report queue is full, try again in a moment"
+
+
+@st.fragment(run_every=POLL_SECONDS)
+def _progress(job_key):
+    job = get_queue().status(job_key)
+    if job is None or job["status"] in ("done", "failed"):
+        st.rerun()
+    st.progress(job["progress"], text=job["message"])
+
+
+@st.fragment
+def render(page, report, file_stem):
+    formats = reports.available_formats()
+    if not formats:
+        st.caption("Report export needs matplotlib (PDF) or openpyxl / xlsxwriter (Excel).")
+        return
+
+    if f"{page}_report_customer" not in st.session_state:
+        st.session_state[f"{page}_report_customer"] = st.session_state.get("scenario_customer", "")
+
+    c1, c2, c3 = st.columns([2, 1, 1])
+    c1.text_input("Prepared For", key=f"{page}_report_customer")
+    fmt = c2.radio("Format", formats, format_func=lambda f: reports.FORMATS[f][0], horizontal=True,
+                   key=f"{page}_report_format")
+    c3.button("Generate Report", on_click=_submit, args=(page, report, fmt), use_container_width=True)
+
+    status = st.session_state.pop(f"{page}_report_status", None)
+    if status:
+        st.warning(status)
+
+    job_key = st.session_state.get(f"{page}_report_job")
+    job = get_queue().status(job_key) if job_key else None
+    if job is None:
+        return
+
+    label, mime, _ = reports.FORMATS[job["format"]]
+    if job["status"] in ("queued", "running"):
+        _progress(job_key)
+    elif job["status"] == "failed":
+        st.error(f"Report failed: {job['error']}")
+    else:
+        st.download_button(f"Download Report ({label})", data=job["data"],
+                           file_name=f"{file_stem}.{job['format']}", mime=mime)
@@ -0,0 +1,436 @@
+import importlib.util
+import io
+import os
+import threading
+from collections import OrderedDict
+
+import parallel
+import result_cache
+
+# --------------------------------------------------
+# REPORT SETTINGS
+# --------------------------------------------------
+# Customer reports are rendered on the parallel.get_pool() worker processes,
+# so CPU-bound matplotlib work never holds the GIL of the Streamlit server;
+# the script thread only queues a job and polls its status.
+#   ROI_REPORT_QUEUE    queued + running jobs accepted before submit() refuses
+MAX_PENDING = int(os.environ.get("ROI_REPORT_QUEUE", 8))
+
+# Finished jobs kept for download (oldest dropped first)
+KEEP_DONE = 32
+
+# format: (label, mime type, modules of which one must be installed)
+FORMATS = {
+    "pdf": ("PDF", "application/pdf", ("matplotlib",)),
+    "xlsx": ("Excel", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+             ("openpyxl", "xlsxwriter")),
+}
+
+PAGE_SIZE = (11.69, 8.27)
+TABLE_ROWS_PER_PAGE = 24
+
+INCREASE_COLOR = "#00CC96"
+DECREASE_COLOR = "#EF553B"
+TOTAL_COLOR = "#636EFA"
+
+
+def _installed(module):
+    return importlib.util.find_spec(module) is not None
+
+
+def available_formats():
+    return [fmt for fmt, (_, _, modules) in FORMATS.items() if any(_installed(m) for m in modules)]
+
+
+# --------------------------------------------------
+# REPORT CONTENT
+# --------------------------------------------------
+# A report is plain data (strings, numbers, lists), so it hashes into a
+# result_cache key and pickles into a worker: the pages fill it from the
+# results they already computed and the renderers never touch the model.
+#   kpis       [[label, value, format], ...]; None values print as "n/a"
+#   tables     [[sheet name, {column: values}], ...]
+#   waterfall  bridge chart: labels, values, measures ("absolute",
+#              "relative" or "total", as in go.Waterfall)
+#   flows      line chart: x values and {series name: values}
+def waterfall(title, labels, values, measures):
+    return {"title": title, "labels": list(labels), "values": [float(v) for v in values], "measures": list(measures)}
+
+
+def investment_report(title, kpis, yearly, bridge, subtitle=""):
+    return {
+        "title": title,
+        "subtitle": subtitle,
+        "kpis": [[label, value, fmt] for label, value, fmt in kpis],
+        "tables": [["Yearly Cash Flow", {
+            "Year": list(yearly["years"]),
+            "Cash Flow": list(yearly["cash_flows"]),
+            "Cumulative Cash Flow": list(yearly["cumulative_cf"]),
+            "NPV": list(yearly["npv_vals"]),
+            "ROI (%)": list(yearly["roi_vals"]),
+        }]],
+        "waterfall": bridge,
+        "flows": {
+            "title": "Cumulative Cash Flow and NPV",
+            "x_title": "Year",
+            "x": list(yearly["years"]),
+            "series": {"Cumulative Cash Flow": list(yearly["cumulative_cf"]), "NPV": list(yearly["npv_vals"])},
+        },
+    }
+
+
+# The new_app1.py report. calc holds one scenario of the model, shaped
+# like roi_engine.scenario(roi_engine.evaluate(...)): the margin cascade,
+# the investment and the yearly cash flows. Shared by the page export and
+# batch_reports.py.
+def scenario_report(calc, analysis_years, annual_iiot_cost, subtitle=""):
+    return investment_report(
+        "IIoT Investment Report",
+        [
+            ("Total Investment", calc["total_iiot_investment"], "{:,.0f}"),
+            ("Net Annual Benefit", calc["net_annual_benefit"], "{:,.0f}"),
+            ("Profit Before IIoT", calc["profit_from_margin"], "{:,.0f}"),
+            ("Profit After IIoT", calc["profit_after"], "{:,.0f}"),
+            (f"NPV ({analysis_years} years)", calc["npv_vals"][-1], "{:,.0f}"),
+            ("ROI (%)", calc["roi_vals"][-1], "{:.1f}%"),
+            ("IRR", calc["irr"] * 100 if calc["irr"] is not None else None, "{:.1f}%"),
+            ("Payback (Years)", calc["payback_period"], "{:.2f}"),
+            ("Discounted Payback (Years)", calc["discounted_payback"], "{:.2f}"),
+        ],
+        calc,
+        waterfall(
+            "Annual Profit Bridge",
+            ["Profit Before IIoT", "Incremental Profit", "Annual IIoT Cost", "Profit After IIoT Costs"],
+            [calc["profit_from_margin"], calc["incremental_profit"], -annual_iiot_cost,
+             calc["profit_from_margin"] + calc["net_annual_benefit"]],
+            ["absolute", "relative", "relative", "total"]
+        ),
+        subtitle
+    )
+
+
+def _kpi_text(value, fmt):
+    return "n/a" if value is None else fmt.format(value)
+
+
+def _cell(value):
+    if isinstance(value, str):
+        return value
+    if isinstance(value, int) or float(value).is_integer() and abs(value) < 1e4:
+        return f"{value:,.0f}"
+    return f"{value:,.0f}" if abs(value) >= 100 else f"{value:,.2f}"
+
+
+# --------------------------------------------------
+# PDF (matplotlib, no pyplot)
+# --------------------------------------------------
+# Like charts.py, each page is a template built once and then only has its
+# texts, bar geometry and line data swapped per report. Axes positions are
+# fixed, so no layout pass runs at save time. Templates are per thread
+# (render threads, bulk worker processes), never shared between two
+# renders in flight.
+_templates = threading.local()
+
+
+def _template(key, build):
+    cache = _templates.__dict__.setdefault("figures", {})
+    if key not in cache:
+        cache[key] = build()
+    return cache[key]
+
+
+def _table_pages(report):
+    for name, table in report["tables"]:
+        columns = list(table)
+        rows = list(zip(*table.values()))
+        for start in range(0, max(len(rows), 1), TABLE_ROWS_PER_PAGE):
+            yield name, columns, rows[start:start + TABLE_ROWS_PER_PAGE]
+
+
+# Title, subtitle and one table; the table itself is rebuilt per page since
+# its shape changes
+class _TablePage:
+
+    def __init__(self, title_size):
+        from matplotlib.figure import Figure
+
+        self.fig = Figure(figsize=PAGE_SIZE)
+        self.title = self.fig.text(0.05, 0.92, "", fontsize=title_size, weight="bold")
+        self.subtitle = self.fig.text(0.05, 0.88, "", fontsize=11, color="gray")
+        self.ax = self.fig.add_axes((0.05, 0.05, 0.9, 0.8))
+        self.ax.axis("off")
+        self.table = None
+
+    def update(self, title, subtitle, columns, rows):
+        self.title.set_text(title)
+        self.subtitle.set_text(subtitle)
+        if self.table is not None:
+            self.table.remove()
+            self.table = None
+        if rows:
+            self.table = self.ax.table(cellText=[[_cell(v) for v in row] for row in rows], colLabels=columns,
+                                       loc="upper center", cellLoc="right")
+            self.table.auto_set_font_size(False)
+            self.table.set_fontsize(9)
+            self.table.scale(1, 1.3)
+        return self.fig
+
+
+def _waterfall_bars(bridge):
+    total = 0.0
+    bottoms, heights, colors = [], [], []
+    for value, measure in zip(bridge["values"], bridge["measures"]):
+        if measure == "relative":
+            bottoms.append(total if value >= 0 else total + value)
+            heights.append(abs(value))
+            colors.append(INCREASE_COLOR if value >= 0 else DECREASE_COLOR)
+            total += value
+        else:
+            total = value if measure == "absolute" else total
+            bottoms.append(min(total, 0.0))
+            heights.append(abs(total))
+            colors.append(TOTAL_COLOR)
+    return bottoms, heights, colors
+
+
+# Waterfall on the left, cash flow / NPV lines on the right; one template
+# per bar count and series names
+class _ChartPage:
+
+    def __init__(self, n_bars, series):
+        from matplotlib.figure import Figure
+
+        self.fig = Figure(figsize=PAGE_SIZE)
+        self.bar_ax = self.fig.add_axes((0.08, 0.16, 0.38, 0.74))
+        self.line_ax = self.fig.add_axes((0.57, 0.16, 0.38, 0.74))
+
+        positions = list(range(n_bars))
+        self.bars = self.bar_ax.bar(positions, [0.0] * n_bars)
+        self.values = [self.bar_ax.text(x, 0.0, "", ha="center", va="bottom", fontsize=8) for x in positions]
+        self.bar_ax.set_xticks(positions)
+        self.bar_ax.axhline(0, color="gray", linewidth=0.8)
+        self.bar_ax.margins(y=0.08)
+        self.bar_ax.yaxis.set_major_formatter("{x:,.0f}")
+
+        self.lines = [self.line_ax.plot([], [], marker="o", label=name)[0] for name in series]
+        self.line_ax.axhline(0, color="gray", linewidth=0.8, linestyle=":")
+        self.line_ax.yaxis.set_major_formatter("{x:,.0f}")
+        self.line_ax.legend()
+
+    def update(self, bridge, flows):
+        for i, (bottom, height, color) in enumerate(zip(*_waterfall_bars(bridge))):
+            self.bars[i].set_y(bottom)
+            self.bars[i].set_height(height)
+            self.bars[i].set_color(color)
+            self.values[i].set_text(f"{bridge['values'][i]:,.0f}")
+            self.values[i].set_position((i, bottom + height))
+        self.bar_ax.set_xticklabels(bridge["labels"], rotation=15, ha="right", fontsize=8)
+        self.bar_ax.set_title(bridge["title"])
+        self.bar_ax.relim()
+        self.bar_ax.autoscale_view()
+
+        for line, values in zip(self.lines, flows["series"].values()):
+            line.set_data(flows["x"], values)
+        self.line_ax.set_title(flows["title"])
+        self.line_ax.set_xlabel(flows["x_title"])
+        self.line_ax.relim()
+        self.line_ax.autoscale_view()
+        return self.fig
+
+
+def _pdf(report, progress):
+    from matplotlib.backends.backend_pdf import PdfPages
+
+    buffer = io.BytesIO()
+    with PdfPages(buffer) as pdf:
+        summary = _template("summary", lambda: _TablePage(20))
+        pdf.savefig(summary.update(report["title"], report["subtitle"], ["Metric", "Value"],
+                                   [[label, _kpi_text(value, fmt)] for label, value, fmt in report["kpis"]]))
+        progress(0.25, "Summary page")
+
+        bridge, flows = report["waterfall"], report["flows"]
+        charts = _template(("charts", len(bridge["values"]), tuple(flows["series"])),
+                           lambda: _ChartPage(len(bridge["values"]), list(flows["series"])))
+        pdf.savefig(charts.update(bridge, flows))
+        progress(0.6, "Charts")
+
+        tables = _template("table", lambda: _TablePage(14))
+        for name, columns, rows in _table_pages(report):
+            pdf.savefig(tables.update(name, "", columns, rows))
+        progress(0.9, "Tables")
+    return buffer.getvalue()
+
+
+# --------------------------------------------------
+# EXCEL (pandas, openpyxl or xlsxwriter)
+# --------------------------------------------------
+# Numbers stay numbers (no formatting) so the customer can work with them;
+# the charts are in the PDF, the sheets carry their data.
+def _xlsx(report, progress):
+    import pandas as pd
+
+    engine = next(m for m in FORMATS["xlsx"][2] if _installed(m))
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine=engine) as writer:
+        pd.DataFrame([[label, value] for label, value, _ in report["kpis"]],
+                     columns=["Metric", "Value"]).to_excel(writer, sheet_name="Summary", index=False)
+        progress(0.3, "Summary sheet")
+        for name, table in report["tables"]:
+            pd.DataFrame(table).to_excel(writer, sheet_name=name[:31], index=False)
+        progress(0.6, "Tables")
+        bridge = report["waterfall"]
+        pd.DataFrame({"Step": bridge["labels"], "Value": bridge["values"], "Measure": bridge["measures"]}) \
+            .to_excel(writer, sheet_name="Waterfall", index=False)
+        flows = report["flows"]
+        pd.DataFrame(dict({flows["x_title"]: flows["x"]}, **flows["series"])) \
+            .to_excel(writer, sheet_name="Cash Flow Chart", index=False)
+        progress(0.9, "Chart data")
+    return buffer.getvalue()
+
+
+_RENDERERS = {"pdf": _pdf, "xlsx": _xlsx}
+
+
+def render(report, fmt, progress=None):
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown report format {fmt!r}")
+    if fmt not in available_formats():
+        raise ImportError(f"{FORMATS[fmt][0]} export needs one of: {', '.join(FORMATS[fmt][2])}")
+    return _RENDERERS[fmt](report, progress or (lambda fraction, message: None))
+
+
+# Rendered documents go through the on-disk result cache as well: the same
+# report requested again (by any session or process) is not rendered twice.
+# Editing this module changes the namespace and so drops old documents.
+_NAMESPACE = f"reports.render:{result_cache.fingerprint(render)}"
+
+
+def report_key(report, fmt):
+    return result_cache.input_key(_NAMESPACE, [report, fmt])
+
+
+# --------------------------------------------------
+# JOB QUEUE
+# --------------------------------------------------
+# Jobs are keyed by report_key, so submitting a report that is already
+# queued, running or done returns the existing job. A job is a dict with
+# status ("queued", "running", "done", "failed"), progress (0..1), message,
+# data (the document once done) and error; status() returns a copy.
+#
+# The document is rendered (or read back from the result cache) by
+# _render_job in a worker process; the server process only keeps the job
+# table, updated from the future's done-callback. The renderer's page
+# progress comes back through a dict shared with the workers by a
+# multiprocessing manager, which the queue starts with its first job.
+class QueueFull(Exception):
+    pass
+
+
+def _render_job(key, report, fmt, progress=None):
+    data = result_cache.get(key) if result_cache.CACHE_DIR else None
+    if data is None:
+        def report_progress(fraction, message):
+            if progress is not None:
+                progress[key] = (fraction, message)
+
+        data = render(report, fmt, report_progress)
+        if result_cache.CACHE_DIR:
+            result_cache.put(key, data)
+    return data
+
+
+class ReportQueue:
+
+    def __init__(self, workers=None, max_pending=MAX_PENDING, keep=KEEP_DONE):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.keep = keep
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()
+        self._futures = {}
+        self._manager = None
+        self._progress = None
+
+    def pending(self):
+        with self._lock:
+            return sum(job["status"] in ("queued", "running") for job in self._jobs.values())
+
+    def submit(self, report, fmt):
+        key = report_key(report, fmt)
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and job["status"] != "failed":
+                self._jobs.move_to_end(key)
+                return key
+            if sum(j["status"] in ("queued", "running") for j in self._jobs.values()) >= self.max_pending:
+                raise QueueFull(f"{self.max_pending} reports are already being generated")
+            self._jobs[key] = {"status": "queued", "progress": 0.0, "message": "Queued",
+                               "format": fmt, "data": None, "error": None}
+            self._trim()
+        try:
+            future = parallel.get_pool(self.workers).submit(_render_job, key, report, fmt, self._shared_progress())
+        except Exception as exc:
+            self._update(key, status="failed", message="Failed", error=str(exc))
+            return key
+        with self._lock:
+            self._futures[key] = future
+        future.add_done_callback(lambda future: self._finish(key, future))
+        return key
+
+    def status(self, key):
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None:
+                return None
+            job = dict(job)
+            future = self._futures.get(key)
+            progress = self._progress
+        if job["status"] == "queued" and future is not None and future.running():
+            fraction, message = progress.get(key, (0.0, "Rendering")) if progress is not None else (0.0, "Rendering")
+            job.update(status="running", progress=fraction, message=message)
+        return job
+
+    def _shared_progress(self):
+        import multiprocessing
+
+        with self._lock:
+            if self._manager is None:
+                self._manager = multiprocessing.get_context("spawn").Manager()
+                self._progress = self._manager.dict()
+            return self._progress
+
+    def _update(self, key, **fields):
+        with self._lock:
+            self._jobs[key].update(fields)
+
+    def _finish(self, key, future):
+        with self._lock:
+            self._futures.pop(key, None)
+            if self._progress is not None:
+                self._progress.pop(key, None)
+            if key not in self._jobs:
+                return
+        if future.cancelled():
+            self._update(key, status="failed", message="Failed", error="cancelled")
+        elif future.exception() is not None:
+            self._update(key, status="failed", message="Failed", error=str(future.exception()))
+        else:
+            self._update(key, status="done", progress=1.0, message="Ready", data=future.result())
+
+    # Drops the oldest finished jobs beyond keep; queued / running jobs stay
+    def _trim(self):
+        finished = [key for key, job in self._jobs.items() if job["status"] in ("done", "failed")]
+        for key in finished[:max(len(finished) - self.keep, 0)]:
+            del self._jobs[key]
+
+    # The pool is shared with the scenario engine; only this queue's jobs
+    # are cancelled
+    def shutdown(self):
+        with self._lock:
+            futures = list(self._futures.values())
+        for future in futures:
+            future.cancel()
+        with self._lock:
+            if self._manager is not None:
+                self._manager.shutdown()
+                self._manager = self._progress = None
@@ -0,0 +1,211 @@
+import functools
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import tempfile
+import threading
+
+import numpy as np
+
+# --------------------------------------------------
+# RESULT CACHE SETTINGS
+# --------------------------------------------------
+# st.cache_data only lives inside one server process. This cache sits under
+# it on disk so every Streamlit process on the host (and batch runs) share
+# results: one pickle per canonical input hash, written atomically, evicted
+# least recently used first once the directory passes CACHE_MAX_BYTES.
+# ROI_RESULT_CACHE_DIR="" turns it off.
+#
+# Entries are unpickled, so anyone who can write to CACHE_DIR can run code
+# in every process that reads it. The directory is created private to the
+# user running the app (0700); an existing directory is used as it is, so
+# point ROI_RESULT_CACHE_DIR only at a directory no other user can write.
+CACHE_DIR = os.environ.get(
+    "ROI_RESULT_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".result_cache"))
+CACHE_MAX_BYTES = int(float(os.environ.get("ROI_RESULT_CACHE_MB", "256")) * 1024 * 1024)
+
+# The directory is scanned for eviction at most once per EVICT_EVERY writes
+EVICT_EVERY = 64
+
+_lock = threading.Lock()
+_writes = 0
+stats = {"hits": 0, "misses": 0, "errors": 0}
+
+
+def _count(name):
+    with _lock:
+        stats[name] += 1
+
+
+# --------------------------------------------------
+# CANONICAL KEYS
+# --------------------------------------------------
+# Inputs that mean the same scenario hash the same: 5000 and 5000.0, a list
+# and an array, positional and keyword arguments, defaults left out or
+# passed explicitly. Floats must match exactly. An array keys as the nested
+# list it holds; only an empty one keeps its shape, which the list loses.
+def canonical(value):
+    if isinstance(value, np.ndarray):
+        if value.size == 0:
+            return {"__array__": [], "shape": list(value.shape)}
+        return canonical(value.tolist())
+    if isinstance(value, (list, tuple)):
+        return [canonical(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): canonical(v) for k, v in sorted(value.items())}
+    if value is None or isinstance(value, (str, bool)):
+        return value
+    if isinstance(value, np.bool_):
+        return bool(value)
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return float(value)
+    raise TypeError(f"cannot build a cache key from {type(value).__name__}")
+
+
+def input_key(namespace, arguments):
+    payload = json.dumps([namespace, canonical(arguments)], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+# Source of the cached function's module and of its dependencies: editing
+# the model invalidates every stored result without bumping a version.
+def fingerprint(fn, depends=()):
+    digest = hashlib.sha256(fn.__qualname__.encode())
+    for source in [inspect.getsourcefile(fn), *(inspect.getsourcefile(m) for m in depends)]:
+        with open(source, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+# --------------------------------------------------
+# DISK STORE
+# --------------------------------------------------
+def _path(key):
+    return os.path.join(CACHE_DIR, key[:2], key + ".pkl")
+
+
+def get(key):
+    try:
+        with open(_path(key), "rb") as f:
+            value = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        _count("errors")
+        return None
+    try:
+        os.utime(_path(key))
+    except OSError:
+        pass
+    return value
+
+
+def put(key, value):
+    global _writes
+    path = _path(key)
+    tmp = None
+    try:
+        os.makedirs(CACHE_DIR, mode=0o700, exist_ok=True)
+        os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except Exception:
+        # A full or read-only disk only costs the cache, never the result
+        _count("errors")
+        if tmp is not None and os.path.exists(tmp):
+            os.remove(tmp)
+        return
+
+    with _lock:
+        _writes += 1
+        due = _writes % EVICT_EVERY == 1
+    if due:
+        evict()
+
+
+def _entries():
+    for shard in os.scandir(CACHE_DIR):
+        if shard.is_dir():
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(".pkl"):
+                    yield entry
+
+
+# Least recently used first (a hit touches the file's mtime) until the
+# directory is back under max_bytes
+def evict(max_bytes=None):
+    max_bytes = CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    try:
+        files = []
+        for entry in _entries():
+            try:
+                info = entry.stat()
+            except FileNotFoundError:
+                continue
+            files.append((info.st_mtime, info.st_size, entry.path))
+    except FileNotFoundError:
+        return 0
+
+    total = sum(size for _, size, _ in files)
+    removed = 0
+    for _, size, path in sorted(files):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        removed += 1
+    return removed
+
+
+def clear():
+    return evict(max_bytes=0)
+
+
+def size():
+    try:
+        return sum(entry.stat().st_size for entry in _entries())
+    except FileNotFoundError:
+        return 0
+
+
+# --------------------------------------------------
+# DECORATOR
+# --------------------------------------------------
+def _arguments(signature, args, kwargs):
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    return dict(bound.arguments)
+
+
+# Wraps a pure function of plain values (numbers, strings, lists, arrays).
+# depends lists the modules whose source the result also depends on.
+def persistent(depends=()):
+    def decorate(fn):
+        signature = inspect.signature(fn)
+        namespace = f"{fn.__module__}.{fn.__qualname__}:{fingerprint(fn, depends)}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not CACHE_DIR:
+                return fn(*args, **kwargs)
+
+            key = input_key(namespace, _arguments(signature, args, kwargs))
+
+            value = get(key)
+            if value is not None:
+                _count("hits")
+                return value
+
+            _count("misses")
+            value = fn(*args, **kwargs)
+            put(key, value)
+            return value
+        return wrapper
+    return decorate
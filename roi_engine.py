@@ -0,0 +1,504 @@
+import numpy as np
+
+# --------------------------------------------------
+# MODEL CONSTANTS
+# --------------------------------------------------
+AMORTISATION_YEARS = 10
+WORKING_DAYS = 300
+
+# Inputs of the new_app.py / new_app1.py model, in the order the UI asks for them
+INPUT_FIELDS = (
+    "annual_turnover",
+    "profit_margin",
+    "sales_admin_margin",
+    "mat_margin",
+    "labor_margin",
+    "units_per_year",
+    "capital_cost",
+    "iiot_cost",
+    "imp_cost",
+    "prod_inc_per",
+    "annual_iiot_cost",
+)
+
+# Widget labels used by new_app.py / new_app1.py
+INPUT_LABELS = {
+    "annual_turnover": "Annual Turnover",
+    "profit_margin": "Profit Margin (%)",
+    "sales_admin_margin": "Sales & Admin Margin (%)",
+    "mat_margin": "Material Cost (%)",
+    "labor_margin": "Labor Cost (%)",
+    "units_per_year": "Production Units / Year",
+    "capital_cost": "Capital Cost",
+    "iiot_cost": "IIoT License Cost",
+    "imp_cost": "Implementation Cost",
+    "prod_inc_per": "Production Increase (%)",
+    "annual_iiot_cost": "License fee/Annual cost",
+}
+
+# Smallest value each widget accepts
+INPUT_MIN_VALUES = {f: 0.0 for f in INPUT_FIELDS}
+INPUT_MIN_VALUES["units_per_year"] = 1.0
+
+# Defaults baked into new_app.py / new_app1.py
+DEFAULT_INPUTS = {
+    "annual_turnover": 1_000_000.0,
+    "profit_margin": 10.0,
+    "sales_admin_margin": 10.0,
+    "mat_margin": 40.0,
+    "labor_margin": 20.0,
+    "units_per_year": 5000.0,
+    "capital_cost": 1_000_000.0,
+    "iiot_cost": 50_000.0,
+    "imp_cost": 25_000.0,
+    "prod_inc_per": 15.0,
+    "annual_iiot_cost": 10_000.0,
+}
+
+
+def _as_arrays(*values):
+    arrays = np.broadcast_arrays(*[np.asarray(v, dtype=float) for v in values])
+    return [np.atleast_1d(a) for a in arrays]
+
+
+# --------------------------------------------------
+# MARGIN CASCADE
+# --------------------------------------------------
+# Every argument may be a scalar or an array of scenarios; they are broadcast
+# against each other and every derived quantity comes back as a 1-D array.
+def margin_cascade(annual_turnover, profit_margin, sales_admin_margin, mat_margin,
+                   labor_margin, units_per_year, capital_cost, prod_inc_per):
+    (annual_turnover, profit_margin, sales_admin_margin, mat_margin, labor_margin,
+     units_per_year, capital_cost, prod_inc_per) = _as_arrays(
+        annual_turnover, profit_margin, sales_admin_margin, mat_margin,
+        labor_margin, units_per_year, capital_cost, prod_inc_per)
+
+    profit_from_margin = annual_turnover * profit_margin / 100
+    revenue = annual_turnover - profit_from_margin
+    sales_admin_cost = revenue * sales_admin_margin / 100
+    mfg_expense = revenue - sales_admin_cost
+
+    mat_cost = mfg_expense * mat_margin / 100
+    labor_cost = mfg_expense * labor_margin / 100
+
+    annual_capital_amort = capital_cost / AMORTISATION_YEARS
+
+    cost_per_unit = mfg_expense / units_per_year
+    mat_per_unit = mat_cost / units_per_year
+    fixed_per_unit = annual_capital_amort / units_per_year
+    labor_per_unit = labor_cost / units_per_year
+    prod_per_day = units_per_year / WORKING_DAYS
+
+    units_after = units_per_year * (1 + prod_inc_per / 100)
+    cost_per_unit_after = mfg_expense / units_after
+    prod_per_day_after = units_after / WORKING_DAYS
+    fixed_per_unit_after = annual_capital_amort / units_after
+    labor_per_unit_after = labor_cost / units_after
+
+    savings_per_unit = (labor_per_unit + fixed_per_unit) - (labor_per_unit_after + fixed_per_unit_after)
+
+    profit_after = profit_from_margin + (units_after * savings_per_unit)
+    incremental_profit = profit_after - profit_from_margin
+
+    return {
+        "profit_from_margin": profit_from_margin,
+        "revenue": revenue,
+        "sales_admin_cost": sales_admin_cost,
+        "mfg_expense": mfg_expense,
+        "mat_cost": mat_cost,
+        "labor_cost": labor_cost,
+        "annual_capital_amort": annual_capital_amort,
+        "cost_per_unit": cost_per_unit,
+        "mat_per_unit": mat_per_unit,
+        "fixed_per_unit": fixed_per_unit,
+        "labor_per_unit": labor_per_unit,
+        "prod_per_day": prod_per_day,
+        "units_after": units_after,
+        "cost_per_unit_after": cost_per_unit_after,
+        "prod_per_day_after": prod_per_day_after,
+        "fixed_per_unit_after": fixed_per_unit_after,
+        "labor_per_unit_after": labor_per_unit_after,
+        "savings_per_unit": savings_per_unit,
+        "profit_after": profit_after,
+        "incremental_profit": incremental_profit,
+    }
+
+
+# --------------------------------------------------
+# IRR / INTERPOLATED PAYBACK
+# --------------------------------------------------
+# Vectorized root finder for NPV(rate) = 0 over a (scenario x period) cash
+# flow matrix. Each row keeps a sign-changing bracket; a Newton step is taken
+# when it lands inside the bracket, otherwise the bracket is bisected, so
+# every row converges even when Newton alone would not. Only rows that have
+# not converged yet are re-evaluated. The rate is per period of the cash
+# flow matrix.
+#
+# The bracket is the nearest sign change to rate 0 found on IRR_GRID, up to
+# very high rates and down towards -99%, so flows whose NPV is negative
+# at both ends of the range (e.g. escalating costs that turn the late flows
+# negative) still find the root between them. Rows without a sign change on
+# the grid (e.g. never-positive flows), or whose residual never gets within
+# tolerance, return NaN.
+IRR_GRID = (-0.99, -0.9, -0.5, -0.1, 0.0, 0.1, 0.5, 1.0, 2.0, 10.0, 100.0, 1e4)
+
+
+# NPV and dNPV/drate by Horner's scheme in x = 1 / (1 + rate); flows are
+# passed period-major (periods x scenarios) so each step reads one row.
+def _npv_and_slope(flows_by_period, rate):
+    x = 1 / (1 + rate)
+    npv = np.zeros_like(rate)
+    d_npv = np.zeros_like(rate)
+    for flow in flows_by_period[::-1]:
+        d_npv = d_npv * x + npv
+        npv = npv * x + flow
+    return npv, -d_npv * x * x
+
+
+# Walks rows (all still without a bracket, NPV f_start at rate 0) along the
+# grid points, filling lo / hi / f_lo of those that change sign; returns the
+# rows left without a bracket.
+def _walk_grid(by_period, rows, f_start, points, lo, hi, f_lo):
+    start = 0.0
+    for rate in points:
+        if rows.size == 0:
+            break
+        flows = by_period if rows.size == by_period.shape[1] else by_period[:, rows]
+        f = _npv_and_slope(flows, np.full(rows.size, float(rate)))[0]
+        f_low = f if rate < start else f_start
+        found = np.isfinite(f_start) & np.isfinite(f) & (f_low != 0) & (np.sign(f_start) != np.sign(f))
+        hit = rows[found]
+        lo[hit], hi[hit], f_lo[hit] = min(start, rate), max(start, rate), f_low[found]
+        rows, f_start, start = rows[~found], f[~found], rate
+    return rows
+
+
+# Per row, the nearest grid interval around rate 0 with a finite sign change.
+# NPV tends to the period-0 flow as the rate grows, so rows whose NPV at 0
+# already has that sign search downwards first and the others upwards; both
+# then try the other direction. An NPV of exactly zero on a grid point is
+# picked up by the interval ending there. Grid points are only evaluated for
+# rows still without a bracket, so most rows cost one NPV evaluation (NPV at
+# 0 is the plain sum of the flows). Returns the row indices and brackets.
+def _irr_brackets(by_period, grid):
+    n = by_period.shape[1]
+    lo, hi, f_lo = np.full(n, np.nan), np.full(n, np.nan), np.full(n, np.nan)
+    zero = int(np.searchsorted(grid, 0.0))
+    up, down = grid[zero + 1:], grid[zero - 1::-1] if zero > 0 else ()
+    f_zero = by_period.sum(axis=0)
+
+    downwards_first = np.sign(f_zero) == np.sign(by_period[0])
+    for rows, first, second in ((np.flatnonzero(~downwards_first), up, down),
+                                (np.flatnonzero(downwards_first), down, up)):
+        rows = _walk_grid(by_period, rows, f_zero[rows], first, lo, hi, f_lo)
+        _walk_grid(by_period, rows, f_zero[rows], second, lo, hi, f_lo)
+
+    active = np.flatnonzero(np.isfinite(lo))
+    return active, lo[active], hi[active], f_lo[active]
+
+
+def irr(cash_flows, grid=IRR_GRID, tol=1e-10, max_iter=100):
+    cash_flows = np.atleast_2d(np.asarray(cash_flows, dtype=float))
+    by_period = np.ascontiguousarray(cash_flows.T)
+    n_periods = cash_flows.shape[1] - 1
+    result = np.full(len(cash_flows), np.nan)
+
+    with np.errstate(over="ignore", invalid="ignore", divide="ignore"):
+        active, lo, hi, f_lo = _irr_brackets(by_period, grid)
+        flows = by_period[:, active]
+        # NPV residual that counts as zero, relative to the size of the row's flows
+        f_tol = tol * np.abs(flows).sum(axis=0)
+
+        # Start from (inflows / outlay) ** (2 / (n + 1)) - 1, which is close
+        # to the IRR of a level annuity, kept inside the bracket
+        rate = np.abs(flows[1:].sum(axis=0) / flows[0]) ** (2 / (n_periods + 1)) - 1
+        rate = np.where(np.isfinite(rate) & (rate > lo) & (rate < hi), rate, (lo + hi) / 2)
+
+        for _ in range(max_iter):
+            if active.size == 0:
+                break
+            f, slope = _npv_and_slope(flows, rate)
+
+            # Only a rate whose NPV is within tolerance is stored
+            converged = np.abs(f) <= f_tol
+            result[active[converged]] = rate[converged]
+
+            same_side = np.sign(f) == np.sign(f_lo)
+            lo = np.where(same_side, rate, lo)
+            f_lo = np.where(same_side, f, f_lo)
+            hi = np.where(same_side, hi, rate)
+
+            newton = rate - f / slope
+            inside = np.isfinite(newton) & (newton > lo) & (newton < hi)
+            next_rate = np.where(inside, newton, (lo + hi) / 2)
+
+            # A bracket that has shrunk to nothing without meeting the
+            # tolerance (a pole, not a root) stays NaN
+            stalled = hi - lo <= tol * (1 + np.abs(rate))
+            keep = ~(converged | stalled)
+            active, flows, lo, hi, f_lo, f_tol, rate = (
+                active[keep], flows[:, keep], lo[keep], hi[keep], f_lo[keep], f_tol[keep], next_rate[keep])
+
+    return result
+
+
+# Period at which a cumulative series first turns non-negative (after period
+# 0), linearly interpolated inside that period; NaN when it never does.
+def interpolated_payback(cumulative, flows):
+    recovered = cumulative[:, 1:] >= 0
+    period = recovered.argmax(axis=1) + 1
+    rows = np.arange(len(period))
+
+    shortfall = -cumulative[rows, period - 1]
+    step = flows[rows, period]
+    fraction = np.divide(shortfall, step, out=np.zeros_like(shortfall), where=step != 0)
+
+    return np.where(recovered.any(axis=1), period - 1 + np.clip(fraction, 0, 1), np.nan)
+
+
+# --------------------------------------------------
+# YEAR-BY-YEAR CASH FLOWS (scenario x year matrices)
+# --------------------------------------------------
+# Year 0 carries the one-time investment, years 1..analysis_years the net
+# annual benefit. payback_year is the first year > 0 with a non-negative
+# cumulative cash flow, or 0 when the investment is not recovered;
+# payback_period / discounted_payback are the interpolated (fractional)
+# equivalents on the plain and discounted cumulative cash flows, NaN when
+# not recovered.
+def yearly_cash_flows(total_iiot_investment, net_annual_benefit, analysis_years, discount_rate,
+                      solve_irr=True):
+    total_iiot_investment, net_annual_benefit, discount_rate = _as_arrays(
+        total_iiot_investment, net_annual_benefit, discount_rate)
+
+    years = np.arange(analysis_years + 1)
+
+    cash_flows = np.repeat(net_annual_benefit[:, None], analysis_years + 1, axis=1)
+    cash_flows[:, 0] = -total_iiot_investment
+
+    cumulative_cf = np.cumsum(cash_flows, axis=1)
+
+    discount_factors = (1 + discount_rate[:, None]) ** years
+    discounted_cf = cash_flows / discount_factors
+    npv_vals = np.cumsum(discounted_cf, axis=1)
+
+    investment = total_iiot_investment[:, None]
+    roi_vals = np.divide(cumulative_cf, investment,
+                         out=np.zeros_like(cumulative_cf), where=investment != 0) * 100
+
+    recovered = cumulative_cf[:, 1:] >= 0
+    payback_year = np.where(recovered.any(axis=1), recovered.argmax(axis=1) + 1, 0)
+
+    result = {
+        "years": years,
+        "cash_flows": cash_flows,
+        "cumulative_cf": cumulative_cf,
+        "npv_vals": npv_vals,
+        "roi_vals": roi_vals,
+        "payback_year": payback_year,
+        "payback_period": interpolated_payback(cumulative_cf, cash_flows),
+        "discounted_payback": interpolated_payback(npv_vals, discounted_cf),
+        "npv": npv_vals[:, -1],
+        "roi": roi_vals[:, -1],
+    }
+    if solve_irr:
+        result["irr"] = irr(cash_flows)
+    return result
+
+
+# --------------------------------------------------
+# MONTH-BY-MONTH CASH FLOWS (scenario x month matrices)
+# --------------------------------------------------
+# Month 0 carries the one-time investment. In month m the incremental
+# profit arrives at ramp(m) / 12 of its annual value (it is linear in the
+# production increase, so ramping the increase ramps the profit), and the
+# annual IIoT cost at 1 / 12 of its value, escalated once a year. Discounting
+# uses the annual rate compounded monthly, so 12 months discount like one
+# year of yearly_cash_flows(); irr is annualised the same way.
+# payback_month is the first month > 0 with a non-negative cumulative cash
+# flow (0 when not recovered); payback_period / discounted_payback are
+# interpolated and in months.
+MONTHS_PER_YEAR = 12
+MAX_ANALYSIS_YEARS = 30
+RAMP_SHAPES = ("linear", "s-curve")
+
+# IRR_GRID as monthly rates, so the IRR bracket search steps through the
+# same annual rates
+MONTHLY_IRR_GRID = tuple((1 + rate) ** (1 / MONTHS_PER_YEAR) - 1 for rate in IRR_GRID)
+
+
+# Share of the full production increase reached in months 1..n_months, one
+# row per scenario: linear reaches 1 after ramp_months, s-curve follows a
+# smoothstep over the same span. ramp_months = 0 means no ramp-up.
+def ramp_curve(ramp_months, n_months, shape="linear"):
+    ramp_months = np.atleast_1d(np.asarray(ramp_months, dtype=float))
+    months = np.arange(1, n_months + 1)
+    progress = np.divide(months, ramp_months[:, None],
+                         out=np.ones((len(ramp_months), n_months)), where=ramp_months[:, None] > 0)
+    progress = np.clip(progress, 0, 1)
+    if shape == "s-curve":
+        progress = progress * progress * (3 - 2 * progress)
+    return progress
+
+
+def monthly_cash_flows(total_iiot_investment, incremental_profit, annual_iiot_cost, analysis_years,
+                       discount_rate, ramp_months=0, ramp_shape="linear", cost_escalation=0.0,
+                       solve_irr=True):
+    (total_iiot_investment, incremental_profit, annual_iiot_cost, discount_rate,
+     ramp_months, cost_escalation) = _as_arrays(
+        total_iiot_investment, incremental_profit, annual_iiot_cost, discount_rate,
+        ramp_months, cost_escalation)
+
+    n_months = analysis_years * MONTHS_PER_YEAR
+    months = np.arange(n_months + 1)
+    year_index = (months[1:] - 1) // MONTHS_PER_YEAR
+
+    benefit = incremental_profit[:, None] / MONTHS_PER_YEAR * ramp_curve(ramp_months, n_months, ramp_shape)
+    cost = annual_iiot_cost[:, None] / MONTHS_PER_YEAR * (1 + cost_escalation[:, None]) ** year_index
+
+    cash_flows = np.empty((len(benefit), n_months + 1))
+    cash_flows[:, 0] = -total_iiot_investment
+    cash_flows[:, 1:] = benefit - cost
+
+    cumulative_cf = np.cumsum(cash_flows, axis=1)
+
+    discount_factors = (1 + discount_rate[:, None]) ** (months / MONTHS_PER_YEAR)
+    discounted_cf = cash_flows / discount_factors
+    npv_vals = np.cumsum(discounted_cf, axis=1)
+
+    investment = total_iiot_investment[:, None]
+    roi_vals = np.divide(cumulative_cf, investment,
+                         out=np.zeros_like(cumulative_cf), where=investment != 0) * 100
+
+    recovered = cumulative_cf[:, 1:] >= 0
+    payback_month = np.where(recovered.any(axis=1), recovered.argmax(axis=1) + 1, 0)
+
+    result = {
+        "months": months,
+        "cash_flows": cash_flows,
+        "cumulative_cf": cumulative_cf,
+        "npv_vals": npv_vals,
+        "roi_vals": roi_vals,
+        "payback_month": payback_month,
+        "payback_period": interpolated_payback(cumulative_cf, cash_flows),
+        "discounted_payback": interpolated_payback(npv_vals, discounted_cf),
+        "npv": npv_vals[:, -1],
+        "roi": roi_vals[:, -1],
+    }
+    if solve_irr:
+        result["irr"] = (1 + irr(cash_flows, grid=MONTHLY_IRR_GRID)) ** MONTHS_PER_YEAR - 1
+    return result
+
+
+# --------------------------------------------------
+# FULL EVALUATION
+# --------------------------------------------------
+# One vectorized pass over the new_app1.py model. new_app.py is the same model
+# with annual_iiot_cost = 0.
+def evaluate(annual_turnover, profit_margin, sales_admin_margin, mat_margin, labor_margin,
+             units_per_year, capital_cost, iiot_cost, imp_cost, prod_inc_per,
+             annual_iiot_cost=0.0, analysis_years=5, discount_rate=0.10, solve_irr=True):
+    (annual_turnover, profit_margin, sales_admin_margin, mat_margin, labor_margin,
+     units_per_year, capital_cost, iiot_cost, imp_cost, prod_inc_per,
+     annual_iiot_cost, discount_rate) = _as_arrays(
+        annual_turnover, profit_margin, sales_admin_margin, mat_margin, labor_margin,
+        units_per_year, capital_cost, iiot_cost, imp_cost, prod_inc_per,
+        annual_iiot_cost, discount_rate)
+
+    result = margin_cascade(annual_turnover, profit_margin, sales_admin_margin, mat_margin,
+                            labor_margin, units_per_year, capital_cost, prod_inc_per)
+
+    total_iiot_investment = iiot_cost + imp_cost
+    net_annual_benefit = result["incremental_profit"] - annual_iiot_cost
+
+    result["total_iiot_investment"] = total_iiot_investment
+    result["net_annual_benefit"] = net_annual_benefit
+    result.update(yearly_cash_flows(total_iiot_investment, net_annual_benefit,
+                                    analysis_years, discount_rate, solve_irr))
+    return result
+
+
+def evaluate_inputs(inputs, analysis_years=5, discount_rate=0.10, solve_irr=True):
+    return evaluate(*(inputs.get(f, DEFAULT_INPUTS[f]) for f in INPUT_FIELDS),
+                    analysis_years=analysis_years, discount_rate=discount_rate, solve_irr=solve_irr)
+
+
+# Pull scenario i out of an evaluate() result as plain Python values, the
+# shape the Streamlit pages work with (floats for KPIs, lists for series).
+# Undefined KPIs (NaN IRR / payback) come back as None.
+def scenario(result, i=0):
+    out = {}
+    for key, value in result.items():
+        if key in ("years", "months"):
+            out[key] = value.tolist()
+        elif np.ndim(value) == 2:
+            out[key] = value[i].tolist()
+        else:
+            item = value[i].item()
+            out[key] = None if item != item else item
+    return out
+
+
+# --------------------------------------------------
+# MULTI-LINE PLANT (example.py)
+# --------------------------------------------------
+# Each production line's units are compounded through incremental_pcts; the
+# value added is the incremental units times the line's unit profit. Lines
+# are array elements, so the cost grows with the number of increment steps
+# (at most a handful), not with the number of lines.
+LINE_FIELDS = ("avg_unit_price", "avg_unit_cost", "prod_unit")
+
+
+def line_value_added(avg_unit_price, avg_unit_cost, prod_unit, incremental_pcts):
+    avg_unit_price, avg_unit_cost, prod_unit = _as_arrays(avg_unit_price, avg_unit_cost, prod_unit)
+
+    unit_profit = avg_unit_price - avg_unit_cost
+    old_units = prod_unit
+    new_units = old_units
+    step_values = np.zeros((len(old_units), len(incremental_pcts)))
+
+    for idx, pct in enumerate(incremental_pcts):
+        new_units = new_units * (1 + pct / 100)
+        step_values[:, idx] = (new_units - old_units) * unit_profit
+
+    incremental_units = new_units - old_units
+    value_added = incremental_units * unit_profit
+
+    return {
+        "unit_profit": unit_profit,
+        "old_units": old_units,
+        "new_units": new_units,
+        "incremental_units": incremental_units,
+        "value_added": value_added,
+        "step_values": step_values,
+        "step_value_added": step_values.sum(axis=0),
+        "total_old_profit": (old_units * unit_profit).sum(),
+        "total_annual_benefit": value_added.sum(),
+    }
+
+
+# Discounted-benefit view used by example.py: ROI is the present value of
+# the net annual cash flow over the investment, payback is undiscounted.
+# IRR and discounted payback come from the same investment / net annual
+# cash flow series as new_app1.py (None when undefined).
+def plant_investment(net_annual_cashflow, investment_cost, total_annual_benefit,
+                     analysis_years, discount_rate):
+    result = yearly_cash_flows(investment_cost, net_annual_cashflow, analysis_years, discount_rate)
+    yearly = scenario(result)
+
+    # Year 1..n of the discounted cash flows; the year-0 investment is undiscounted
+    pv_cashflows = result["cash_flows"][0, 1:] / (1 + discount_rate) ** result["years"][1:]
+    npv = yearly["npv"]
+    roi_percent = (npv + investment_cost) / investment_cost * 100 if investment_cost else 0
+
+    payback_years = investment_cost / total_annual_benefit if total_annual_benefit > 0 else 0
+    payback_months = payback_years * 12 if payback_years else 0
+
+    return {
+        "pv_cashflows": pv_cashflows.tolist(),
+        "npv": npv,
+        "roi_percent": roi_percent,
+        "payback_years": payback_years,
+        "payback_months": payback_months,
+        "irr": yearly["irr"],
+        "discounted_payback_months": yearly["discounted_payback"] * 12 if yearly["discounted_payback"] is not None else None,
+    }
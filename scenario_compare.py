@@ -0,0 +1,71 @@
+import numpy as np
+
+import roi_engine
+
+# --------------------------------------------------
+# SCENARIO COMPARISON (new_app1.py)
+# --------------------------------------------------
+# Up to MAX_SCENARIOS named variants of the page inputs, evaluated as the
+# rows of one roi_engine.evaluate() call. A variant lists only the
+# COMPARE_FIELDS it changes, as absolute values; anything it leaves out (or
+# blank) takes the page value on every run. Values in the table do not
+# follow later changes to the page inputs.
+MAX_SCENARIOS = 50
+
+COMPARE_FIELDS = ("prod_inc_per", "iiot_cost", "imp_cost", "annual_iiot_cost")
+
+# Starting rows as multiples of the page inputs: the production increase
+# and the license pricing moved together. preset_scenarios() turns them
+# into absolute values once, from the inputs at the time it is called (the
+# page does so on first display and on "Reset").
+PRESETS = {
+    "Conservative": {"prod_inc_per": 0.5, "iiot_cost": 1.2, "imp_cost": 1.2, "annual_iiot_cost": 1.2},
+    "Expected": {"prod_inc_per": 1.0, "iiot_cost": 1.0, "imp_cost": 1.0, "annual_iiot_cost": 1.0},
+    "Aggressive": {"prod_inc_per": 1.5, "iiot_cost": 0.9, "imp_cost": 0.9, "annual_iiot_cost": 0.9},
+}
+
+# KPIs shown per scenario, in table order
+KPI_LABELS = {
+    "npv": "NPV",
+    "roi": "ROI (%)",
+    "irr": "IRR (%)",
+    "payback_period": "Payback (Years)",
+    "discounted_payback": "Discounted Payback (Years)",
+    "total_iiot_investment": "Investment",
+    "net_annual_benefit": "Net Annual Benefit",
+}
+
+
+def preset_scenarios(base_inputs):
+    return [
+        dict({"Scenario": name}, **{field: base_inputs[field] * scale for field, scale in factors.items()})
+        for name, factors in PRESETS.items()
+    ]
+
+
+# scenarios: list of {"Scenario": name, field: value, ...} rows. Returns the
+# scenario names and the evaluate() result with one row per scenario.
+def evaluate(base_inputs, scenarios, analysis_years=5, discount_rate=0.10):
+    if len(scenarios) > MAX_SCENARIOS:
+        raise ValueError(f"at most {MAX_SCENARIOS} scenarios can be compared, got {len(scenarios)}")
+
+    names = [
+        row.get("Scenario") if isinstance(row.get("Scenario"), str) and row.get("Scenario") else f"Scenario {i + 1}"
+        for i, row in enumerate(scenarios)
+    ]
+    inputs = {}
+    for field in roi_engine.INPUT_FIELDS:
+        base = base_inputs.get(field, roi_engine.DEFAULT_INPUTS[field])
+        column = np.array([row.get(field, base) for row in scenarios], dtype=float)
+        inputs[field] = np.where(np.isnan(column), base, column)
+
+    return names, roi_engine.evaluate_inputs(inputs, analysis_years=analysis_years, discount_rate=discount_rate)
+
+
+# {label: per-scenario values} for KPI_LABELS; IRR in percent
+def kpi_table(result):
+    table = {}
+    for field, label in KPI_LABELS.items():
+        values = np.asarray(result[field], dtype=float)
+        table[label] = values * 100 if field == "irr" else values
+    return table
@@ -0,0 +1,82 @@
+import streamlit as st
+
+import scenario_store
+
+# --------------------------------------------------
+# SAVED SCENARIOS (sidebar panel)
+# --------------------------------------------------
+# A page passes the session_state keys of the widgets that make up its
+# inputs plus its computed KPIs. Saving stores the current widget values;
+# loading writes them back into session_state from a button callback (which
+# runs before the next script run), so every widget picks its value up in
+# one step. on_load lets a page restore state that is not a plain widget.
+
+
+@st.cache_resource
+def get_store(path=scenario_store.DEFAULT_PATH):
+    return scenario_store.ScenarioStore(path)
+
+
+def _load(scenario_id, on_load):
+    inputs = get_store().load(scenario_id)["inputs"]
+    st.session_state.update(inputs.get("widgets", {}))
+    if on_load is not None:
+        on_load(inputs)
+    st.session_state["scenario_status"] = f"Loaded scenario #{scenario_id}"
+
+
+def _save(page, inputs, outputs):
+    customer = st.session_state.get("scenario_customer", "").strip()
+    if not customer:
+        st.session_state["scenario_status"] = "Enter a customer before saving"
+        return
+    scenario_id = get_store().save(
+        customer, page, inputs, outputs,
+        tags=scenario_store.parse_tags(st.session_state.get("scenario_tags", "")),
+        name=st.session_state.get("scenario_name", ""))
+    st.session_state["scenario_status"] = f"Saved scenario #{scenario_id}"
+
+
+def _describe(row):
+    npv = f"NPV {row['npv']:,.0f}" if row["npv"] is not None else "NPV n/a"
+    name = f" · {row['name']}" if row["name"] else ""
+    return f"{row['customer']}{name} · {row['created_at'][:10]} · {npv}"
+
+
+def render(page, widget_keys, outputs, extra_inputs=None, on_load=None):
+    store = get_store()
+    inputs = {"widgets": {key: st.session_state[key] for key in widget_keys if key in st.session_state}}
+    inputs.update(extra_inputs or {})
+
+    with st.sidebar.expander("Saved Scenarios"):
+        status = st.session_state.pop("scenario_status", None)
+        if status:
+            st.caption(status)
+
+        st.text_input("Customer", key="scenario_customer")
+        st.text_input("Scenario Name", key="scenario_name")
+        st.text_input("Tags (comma separated)", key="scenario_tags")
+        st.button("Save Scenario", on_click=_save, args=(page, inputs, outputs), use_container_width=True)
+
+        st.divider()
+
+        customer = st.text_input("Search Customer", key="scenario_search_customer", placeholder="Customer name starts with")
+        tag = st.selectbox("Tag", ["Any"] + store.tags(), key="scenario_search_tag")
+        since = st.date_input("Saved Since", value=None, key="scenario_search_since")
+
+        rows = store.search(customer=customer.strip() or None, tag=None if tag == "Any" else tag,
+                            page=page, since=since.isoformat() if since else None, limit=200)
+
+        if not rows:
+            st.caption("No saved scenarios match.")
+            return
+
+        by_id = {row["id"]: row for row in rows}
+        scenario_id = st.selectbox("Scenario", list(by_id), format_func=lambda i: _describe(by_id[i]),
+                                   key="scenario_pick")
+        if by_id[scenario_id]["tags"]:
+            st.caption(f"Tags: {by_id[scenario_id]['tags']}")
+
+        b1, b2 = st.columns(2)
+        b1.button("Load", on_click=_load, args=(scenario_id, on_load), use_container_width=True)
+        b2.button("Delete", on_click=store.delete, args=(scenario_id,), use_container_width=True)
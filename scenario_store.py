@@ -0,0 +1,147 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+# --------------------------------------------------
+# SCENARIO STORE (SQLite)
+# --------------------------------------------------
+# Saved scenarios keep the page they came from, the widget values needed to
+# restore the page (inputs) and the computed KPIs (outputs), both as JSON.
+# The headline KPIs are also stored as columns so listings never parse JSON.
+# Customer, creation date and tags are indexed; listings are newest first
+# and always bounded by a LIMIT.
+DEFAULT_PATH = os.environ.get(
+    "ROI_SCENARIO_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "scenarios.db"))
+
+SUMMARY_FIELDS = ("npv", "roi", "irr", "payback")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scenarios (
+    id INTEGER PRIMARY KEY,
+    customer TEXT NOT NULL COLLATE NOCASE,
+    name TEXT NOT NULL DEFAULT '',
+    page TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    npv REAL,
+    roi REAL,
+    irr REAL,
+    payback REAL,
+    inputs TEXT NOT NULL,
+    outputs TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_scenarios_customer ON scenarios (customer, created_at);
+CREATE INDEX IF NOT EXISTS idx_scenarios_created ON scenarios (created_at);
+CREATE TABLE IF NOT EXISTS scenario_tags (
+    tag TEXT NOT NULL COLLATE NOCASE,
+    scenario_id INTEGER NOT NULL REFERENCES scenarios (id) ON DELETE CASCADE,
+    PRIMARY KEY (tag, scenario_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_tags_scenario ON scenario_tags (scenario_id);
+"""
+
+_LIST_COLUMNS = "s.id, s.customer, s.name, s.page, s.created_at, s.npv, s.roi, s.irr, s.payback"
+
+
+def parse_tags(text):
+    return sorted({tag.strip() for tag in text.split(",") if tag.strip()}, key=str.lower)
+
+
+# One connection per store, shared by the Streamlit script threads and
+# serialised with a lock; WAL lets other processes read while one writes.
+class ScenarioStore:
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def save(self, customer, page, inputs, outputs, tags=(), name=""):
+        customer = customer.strip()
+        if not customer:
+            raise ValueError("customer is required")
+        created_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO scenarios (customer, name, page, created_at, npv, roi, irr, payback, inputs, outputs)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (customer, name.strip(), page, created_at,
+                 *(outputs.get(field) for field in SUMMARY_FIELDS),
+                 json.dumps(inputs), json.dumps(outputs)))
+            scenario_id = cursor.lastrowid
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO scenario_tags (tag, scenario_id) VALUES (?, ?)",
+                [(tag, scenario_id) for tag in tags])
+        return scenario_id
+
+    # customer matches as a case-insensitive prefix; since / until are ISO
+    # dates or timestamps (until is inclusive of that whole day).
+    def search(self, customer=None, tag=None, page=None, since=None, until=None, limit=100):
+        where, params = [], []
+        if customer:
+            where.append("s.customer >= ? AND s.customer < ?")
+            params += [customer, customer + "￿"]
+        if tag:
+            where.append("s.id IN (SELECT scenario_id FROM scenario_tags WHERE tag = ?)")
+            params.append(tag)
+        if page:
+            where.append("s.page = ?")
+            params.append(page)
+        if since:
+            where.append("s.created_at >= ?")
+            params.append(str(since))
+        if until:
+            where.append("s.created_at < ?")
+            params.append(str(until) + "￿")
+
+        sql = (f"SELECT {_LIST_COLUMNS},"
+               " (SELECT group_concat(tag, ', ') FROM scenario_tags t WHERE t.scenario_id = s.id) AS tags"
+               " FROM scenarios s")
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY s.created_at DESC, s.id DESC LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params)]
+
+    def load(self, scenario_id):
+        with self._lock:
+            row = self._conn.execute(f"SELECT {_LIST_COLUMNS}, s.inputs, s.outputs FROM scenarios s WHERE s.id = ?",
+                                     (scenario_id,)).fetchone()
+            if row is None:
+                raise KeyError(scenario_id)
+            tags = [r[0] for r in self._conn.execute(
+                "SELECT tag FROM scenario_tags WHERE scenario_id = ? ORDER BY tag", (scenario_id,))]
+        scenario = dict(row)
+        scenario["inputs"] = json.loads(scenario["inputs"])
+        scenario["outputs"] = json.loads(scenario["outputs"])
+        scenario["tags"] = tags
+        return scenario
+
+    def delete(self, scenario_id):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM scenarios WHERE id = ?", (scenario_id,))
+
+    def customers(self, limit=1000):
+        with self._lock:
+            return [r[0] for r in self._conn.execute(
+                "SELECT DISTINCT customer FROM scenarios ORDER BY customer LIMIT ?", (limit,))]
+
+    def tags(self, limit=1000):
+        with self._lock:
+            return [r[0] for r in self._conn.execute(
+                "SELECT DISTINCT tag FROM scenario_tags ORDER BY tag LIMIT ?", (limit,))]
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM scenarios").fetchone()[0]
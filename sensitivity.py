@@ -0,0 +1,94 @@
+import numpy as np
+
+import roi_engine
+
+# --------------------------------------------------
+# SENSITIVITY INPUTS
+# --------------------------------------------------
+# Every model input plus the discount rate (as a fraction) can be varied.
+SENSITIVITY_FIELDS = roi_engine.INPUT_FIELDS + ("discount_rate",)
+
+SENSITIVITY_LABELS = dict(roi_engine.INPUT_LABELS, discount_rate="Discount Rate")
+
+METRICS = {"NPV": "npv", "ROI (%)": "roi", "Payback (Years)": "payback_year"}
+
+
+# Only the requested engine results are returned, and IRR (the expensive
+# one) is only solved when "irr" is among them.
+def _evaluate(base_inputs, overrides, analysis_years, metrics):
+    inputs = dict(base_inputs)
+    inputs.update(overrides)
+    discount_rate = inputs.pop("discount_rate")
+    result = roi_engine.evaluate_inputs(inputs, analysis_years=analysis_years, discount_rate=discount_rate,
+                                        solve_irr="irr" in metrics)
+    out = {metric: result[metric] for metric in metrics}
+    if "payback_year" in out:
+        # Not-recovered paybacks become NaN so they show as gaps, not as year 0
+        out["payback_year"] = np.where(out["payback_year"] > 0, out["payback_year"], np.nan)
+    return out
+
+
+def value_range(base_value, spread_pct, steps, field):
+    low = max(base_value * (1 - spread_pct / 100), roi_engine.INPUT_MIN_VALUES.get(field, 0.0))
+    high = base_value * (1 + spread_pct / 100)
+    return np.linspace(low, high, steps)
+
+
+# --------------------------------------------------
+# ONE-WAY SENSITIVITY (tornado)
+# --------------------------------------------------
+# Each field is swept across base +/- spread_pct while the others stay at
+# base. All fields x steps scenarios go through the engine as one batch;
+# results come back as (len(fields), steps) matrices, one per metric
+# (engine result names, e.g. "npv" or "irr").
+def one_way(base_inputs, fields=SENSITIVITY_FIELDS, spread_pct=20.0, steps=21, analysis_years=5,
+            metrics=tuple(METRICS.values())):
+    fields = list(fields)
+    n = len(fields) * steps
+
+    values = np.array([value_range(base_inputs[f], spread_pct, steps, f) for f in fields])
+
+    overrides = {}
+    for i, field in enumerate(fields):
+        column = np.full(n, float(base_inputs[field]))
+        column[i * steps:(i + 1) * steps] = values[i]
+        overrides[field] = column
+
+    result = _evaluate(base_inputs, overrides, analysis_years, metrics)
+    grid = {key: value.reshape(len(fields), steps) for key, value in result.items()}
+    grid["fields"] = fields
+    grid["values"] = values
+    return grid
+
+
+# Rows for a tornado chart: the metric at the low and high end of each
+# input's range, widest swing first.
+def tornado(grid, metric="npv"):
+    rows = []
+    for i, field in enumerate(grid["fields"]):
+        low, high = grid[metric][i, 0], grid[metric][i, -1]
+        rows.append({
+            "field": field,
+            "label": SENSITIVITY_LABELS[field],
+            "low_value": grid["values"][i, 0],
+            "high_value": grid["values"][i, -1],
+            "low": low,
+            "high": high,
+            "swing": abs(high - low),
+        })
+    return sorted(rows, key=lambda r: r["swing"], reverse=True)
+
+
+# --------------------------------------------------
+# TWO-WAY SENSITIVITY (heatmap)
+# --------------------------------------------------
+# Results are (len(y_values), len(x_values)) matrices, row = y value.
+def two_way(base_inputs, x_field, x_values, y_field, y_values, analysis_years=5, metrics=tuple(METRICS.values())):
+    x_grid, y_grid = np.meshgrid(np.asarray(x_values, dtype=float), np.asarray(y_values, dtype=float))
+
+    result = _evaluate(base_inputs, {x_field: x_grid.ravel(), y_field: y_grid.ravel()}, analysis_years,
+                       metrics)
+    grid = {key: value.reshape(x_grid.shape) for key, value in result.items()}
+    grid["x_values"] = x_grid[0]
+    grid["y_values"] = y_grid[:, 0]
+    return grid
@@ -0,0 +1,58 @@
+import zipfile
+
+import pandas as pd
+import pytest
+
+import batch_reports
+import reports
+
+FMT = "xlsx" if "xlsx" in reports.available_formats() else "pdf"
+
+
+@pytest.fixture
+def scenarios(tmp_path):
+    path = tmp_path / "scenarios.csv"
+    pd.DataFrame({"Plant": ["North", "South", "East"], "prod_inc_per": [10.0, 20.0, 30.0]}).to_csv(path, index=False)
+    return str(path)
+
+
+def _render(scenarios, archive, **kwargs):
+    return batch_reports.render_file(scenarios, archive, fmt=FMT, name_column="Plant", batch_size=2, **kwargs)
+
+
+def test_rerun_resumes_and_skips_done_rows(scenarios, tmp_path):
+    archive = str(tmp_path / "reports.zip")
+    assert _render(scenarios, archive).written == 3
+    with zipfile.ZipFile(archive) as zf:
+        assert zf.namelist() == [f"00000{i}_{name}.{FMT}" for i, name in enumerate(["North", "South", "East"])]
+
+    progress = _render(scenarios, archive)
+    assert (progress.written, progress.skipped) == (0, 3)
+    assert _render(scenarios, archive, overwrite=True).written == 3
+
+
+def test_archive_without_central_directory_is_salvaged(scenarios, tmp_path):
+    archive = str(tmp_path / "reports.zip")
+    _render(scenarios, archive)
+    with zipfile.ZipFile(archive) as zf:
+        last = zf.infolist()[-1]
+    # A hard kill while the last document was being written
+    with open(archive, "r+b") as f:
+        f.truncate(last.header_offset + 100)
+
+    assert batch_reports.done_rows(archive, FMT) == {0, 1}
+    progress = _render(scenarios, archive)
+    assert (progress.written, progress.skipped) == (1, 2)
+    with zipfile.ZipFile(archive) as zf:
+        assert len(zf.namelist()) == 3 and zf.testzip() is None
+
+
+def test_resume_in_another_format_is_refused(scenarios, tmp_path):
+    archive = str(tmp_path / "reports.zip")
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("000000_North.other", b"x")
+    with pytest.raises(batch_reports.MixedArchive):
+        batch_reports.done_rows(archive, FMT)
+    with pytest.raises(batch_reports.MixedArchive):
+        _render(scenarios, archive)
+    assert _render(scenarios, archive, overwrite=True).written == 3
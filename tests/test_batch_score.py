@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import batch_score
+import roi_engine
+
+
+def test_blank_cells_score_as_defaults():
+    defaults = roi_engine.DEFAULT_INPUTS
+    df = pd.DataFrame({"annual_turnover": [np.nan, defaults["annual_turnover"]], "prod_inc_per": [np.nan, np.nan]})
+    scored = batch_score.score_chunk(df)
+    expected = roi_engine.evaluate_inputs({})
+    assert not scored[list(batch_score.OUTPUT_FIELDS)].isna().any().any()
+    np.testing.assert_allclose(scored["npv"], expected["npv"][0])
+
+
+def test_empty_csv_gives_empty_output(tmp_path):
+    source = tmp_path / "empty.csv"
+    source.write_text("")
+    assert batch_score.score_file(str(source), str(tmp_path / "scored.csv")) == 0
+    assert (tmp_path / "scored.csv").exists()
+
+
+def test_parquet_chunks_share_one_schema(tmp_path):
+    pytest.importorskip("pyarrow")
+    # The first chunk has only integers and a blank column; later ones do not
+    df = pd.DataFrame({
+        "annual_turnover": [5_000_000] * 3 + [np.nan] * 3,
+        "labor_margin": [np.nan] * 3 + [10.0] * 3,
+        "note": [None] * 3 + ["x"] * 3,
+    })
+    df["annual_turnover"] = df["annual_turnover"].astype("Int64")
+    source, target = tmp_path / "in.parquet", tmp_path / "out.parquet"
+    df.to_parquet(source)
+    assert batch_score.score_file(str(source), str(target), chunk_size=3) == 6
+    scored = pd.read_parquet(target)
+    assert len(scored) == 6 and scored["note"].tolist()[3:] == ["x"] * 3
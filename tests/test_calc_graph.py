@@ -0,0 +1,65 @@
+import pytest
+
+import calc_graph
+import roi_engine
+
+
+def _model():
+    model = calc_graph.margin_graph()
+    model.set(**roi_engine.DEFAULT_INPUTS, analysis_years=5, discount_rate=0.10)
+    model.values()
+    model.recomputed.clear()
+    return model
+
+
+def test_input_change_recomputes_downstream_only():
+    model = _model()
+    model.set(annual_iiot_cost=roi_engine.DEFAULT_INPUTS["annual_iiot_cost"] + 1)
+    model.values()
+    assert sorted(model.recomputed) == sorted(model.downstream("annual_iiot_cost"))
+    assert sorted(model.recomputed) == ["net_annual_benefit", "yearly"]
+
+
+def test_unchanged_value_stops_propagation():
+    model = _model()
+    model.set(labor_margin=roi_engine.DEFAULT_INPUTS["labor_margin"])
+    model.values()
+    assert model.recomputed == []
+
+    graph = calc_graph.CalcGraph()
+    graph.input("x")
+    graph.node(lambda x: x > 0, name="positive")
+    graph.node(lambda positive: "yes" if positive else "no", name="label")
+    graph.set(x=1)
+    assert graph["label"] == "yes"
+    graph.set(x=2)
+    graph["label"]
+    assert graph.recomputed == ["positive", "label", "positive"]
+
+
+def test_reading_a_node_computes_only_its_inputs():
+    model = _model()
+    model.set(iiot_cost=1.0, annual_turnover=1.0)
+    model["total_iiot_investment"]
+    assert model.recomputed == ["total_iiot_investment"]
+
+
+def test_matches_batch_engine():
+    model = _model()
+    expected = roi_engine.evaluate_inputs(roi_engine.DEFAULT_INPUTS)
+    assert model["profit_after"] == pytest.approx(expected["profit_after"][0])
+    assert model["yearly"]["npv"] == pytest.approx(expected["npv"][0])
+
+
+def test_graph_rejects_bad_definitions():
+    graph = calc_graph.CalcGraph()
+    graph.input("a")
+    with pytest.raises(ValueError):
+        graph.node(lambda b: b, name="c")
+    with pytest.raises(ValueError):
+        graph.input("a")
+    graph.node(lambda a: a + 1, name="b")
+    with pytest.raises(KeyError):
+        graph.set(b=1)
+    with pytest.raises(KeyError):
+        graph["b"]
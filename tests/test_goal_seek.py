@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+import goal_seek
+import roi_engine
+
+BASE = dict(roi_engine.DEFAULT_INPUTS, discount_rate=0.10)
+
+
+def test_solve_many_rows():
+    targets = np.array([1.0, 4.0, 9.0])
+    roots = goal_seek.solve(lambda x, rows: x * x - targets[rows], np.zeros(3), np.full(3, 10.0))
+    np.testing.assert_allclose(roots, [1.0, 2.0, 3.0], atol=1e-8)
+
+
+def test_bracket_widens_upper_bound():
+    targets = np.array([5.0, 500.0])
+    low, high = goal_seek.bracket(lambda x, rows: x - targets[rows], np.zeros(2), np.ones(2))
+    assert np.all(high >= targets)
+    assert high[0] == 16.0 and high[1] == 1024.0
+
+
+def test_bracket_gives_up_without_root():
+    low, high = goal_seek.bracket(lambda x, rows: np.ones_like(x), np.zeros(1), np.ones(1), max_steps=3)
+    assert high[0] == 64.0
+    assert np.isnan(goal_seek.solve(lambda x, rows: np.ones_like(x), low, high)[0])
+
+
+def test_seek_reaches_npv_target_outside_initial_bracket():
+    target = 10 * roi_engine.evaluate_inputs(BASE, discount_rate=0.10)["npv"][0]
+    result = goal_seek.seek(BASE, "prod_inc_per", "npv", [target])
+    assert result["values"][0] > 2 * BASE["prod_inc_per"]
+    assert result["achieved"][0] == pytest.approx(target, rel=1e-6)
+
+
+def test_seek_without_solution_is_nan():
+    # IRR cannot exceed the undiscounted return however low the annual cost
+    result = goal_seek.seek(BASE, "annual_iiot_cost", "irr", [1e6])
+    assert np.isnan(result["values"][0])
+    assert np.isnan(result["achieved"][0])
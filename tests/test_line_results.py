@@ -0,0 +1,75 @@
+import numpy as np
+
+import line_results
+import roi_engine
+
+PCTS = (10.0, 5.0)
+
+
+def _lines(n=6):
+    rng = np.random.default_rng(0)
+    return rng.uniform(50, 150, n), rng.uniform(20, 80, n), rng.integers(100, 1000, n).astype(float)
+
+
+def _assert_fresh(result, price, cost, units, pcts=PCTS):
+    expected = roi_engine.line_value_added(price, cost, units, pcts)
+    table = result["table"]
+    for field in line_results.PER_LINE_FIELDS:
+        np.testing.assert_array_equal(getattr(table, field), expected[field])
+    assert result["total_annual_benefit"] == expected["total_annual_benefit"]
+
+
+def test_unchanged_and_reordered_rows_are_reused():
+    price, cost, units = _lines()
+    state = line_results.LineResults()
+    state.update(price, cost, units, PCTS)
+    assert state.rows_recomputed == 6
+
+    state.update(price, cost, units, PCTS)
+    assert state.rows_recomputed == 0
+
+    # Reorder and delete rows: every remaining row is found by its values
+    order = [5, 3, 1, 0]
+    result = state.update(price[order], cost[order], units[order], PCTS)
+    assert state.rows_recomputed == 0
+    _assert_fresh(result, price[order], cost[order], units[order])
+
+
+def test_edited_and_added_rows_are_recomputed():
+    price, cost, units = _lines()
+    state = line_results.LineResults()
+    state.update(price, cost, units, PCTS)
+
+    price = np.append(price, 99.0)
+    cost = np.append(cost, 10.0)
+    units = np.append(units, 500.0)
+    price[2] += 1
+    result = state.update(price, cost, units, PCTS)
+    assert state.rows_recomputed == 2
+    _assert_fresh(result, price, cost, units)
+
+
+def test_new_increments_recompute_every_row():
+    price, cost, units = _lines()
+    state = line_results.LineResults()
+    state.update(price, cost, units, PCTS)
+    result = state.update(price, cost, units, (20.0,))
+    assert state.rows_recomputed == 6
+    _assert_fresh(result, price, cost, units, (20.0,))
+
+
+def test_negative_zero_matches_zero():
+    state = line_results.LineResults()
+    state.update([0.0, 1.0], [0.0, 1.0], [10.0, 10.0], PCTS)
+    state.update([-0.0, 1.0], [0.0, 1.0], [10.0, 10.0], PCTS)
+    assert state.rows_recomputed == 0
+
+
+def test_line_names():
+    price, cost, units = _lines(3)
+    state = line_results.LineResults()
+    table = state.update(price, cost, units, PCTS)["table"]
+    assert table.line_names() == ["Line 1", "Line 2", "Line 3"]
+    assert list(table.frame(1)["Line"]) == ["Line 2", "Line 3"]
+    named = state.result(["A", "B", "C"])["table"]
+    assert list(named.line_names(0, 2)) == ["A", "B"]
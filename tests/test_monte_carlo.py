@@ -0,0 +1,34 @@
+import warnings
+
+import numpy as np
+import pytest
+
+import monte_carlo
+
+
+def test_lognormal_spread_keeps_median():
+    spec = monte_carlo.spread_spec("Lognormal", 100.0, 20.0)
+    sample = monte_carlo.sample_input(np.random.default_rng(0), spec, 200_000)
+    assert np.median(sample) == pytest.approx(100.0, rel=0.01)
+    assert monte_carlo.spread_spec("Lognormal", 0.0, 20.0) == 0.0
+
+
+def test_simulate_without_irr():
+    sim = monte_carlo.simulate({"prod_inc_per": ("normal", 40, 5)}, 1_000, seed=1, solve_irr=False)
+    assert "irr" not in sim
+    assert all(v is None for v in monte_carlo.summarize(sim)["irr_percentiles"].values())
+
+
+def test_summarize_without_any_irr():
+    # The license cost exceeds any benefit, so no scenario is cash-positive
+    sim = monte_carlo.simulate({"annual_iiot_cost": 1e12}, 100, seed=1)
+    assert np.isnan(sim["irr"]).all()
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        summary = monte_carlo.summarize(sim)
+    assert all(v is None for v in summary["irr_percentiles"].values())
+
+
+def test_simulate_rejects_empty_run():
+    with pytest.raises(ValueError):
+        monte_carlo.simulate({}, 0)
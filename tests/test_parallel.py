@@ -0,0 +1,25 @@
+import numpy as np
+
+import parallel
+
+
+def test_evaluate_empty_input():
+    result = parallel.evaluate({"incremental_profit": [], "total_iiot_investment": []}, workers=1)
+    assert set(result) == set(parallel.KPI_FIELDS)
+    assert all(len(values) == 0 for values in result.values())
+
+
+def test_evaluate_monthly_empty_input():
+    inputs = {"total_iiot_investment": [], "incremental_profit": [], "annual_iiot_cost": []}
+    result = parallel.evaluate_monthly(inputs, workers=1)
+    assert set(result) == set(parallel.MONTHLY_KPI_FIELDS)
+    assert all(len(values) == 0 for values in result.values())
+
+
+def test_chunked_matches_single_chunk():
+    rng = np.random.default_rng(0)
+    inputs = {"incremental_profit": rng.uniform(0, 5e6, 1_000), "total_iiot_investment": rng.uniform(1e6, 1e7, 1_000)}
+    whole = parallel.evaluate(inputs, workers=1)
+    chunked = parallel.evaluate(inputs, workers=1, chunk_size=64)
+    for field in parallel.KPI_FIELDS:
+        np.testing.assert_array_equal(whole[field], chunked[field])
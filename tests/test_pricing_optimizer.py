@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import portfolio
+import pricing_optimizer
+import roi_engine
+
+
+@pytest.fixture(scope="module")
+def customers():
+    return portfolio.sample_portfolio(300)
+
+
+def _best_by_brute_force(customers, prices, max_payback, min_coverage):
+    profit = pricing_optimizer.incremental_profit(customers)
+    segments = customers["Plant Type"].to_numpy()
+    best = {}
+    for segment in sorted(set(segments)):
+        seg_profit = profit[segments == segment]
+        revenues = []
+        for iiot_cost, imp_cost, annual in prices:
+            yearly = roi_engine.yearly_cash_flows(np.full(len(seg_profit), iiot_cost + imp_cost), seg_profit - annual,
+                                                  5, 0.10, solve_irr=False)
+            buyers = (yearly["payback_period"] <= max_payback).sum()
+            covered = buyers / len(seg_profit) >= min_coverage
+            revenues.append(buyers * (iiot_cost + imp_cost + annual * 5) if covered else -np.inf)
+        best[segment] = int(np.argmax(revenues)) if np.isfinite(max(revenues)) else None
+    return best
+
+
+def test_picks_highest_revenue_tier_per_segment(customers):
+    prices = pricing_optimizer.price_grid(steps=4)
+    tiers = pricing_optimizer.optimize(customers, prices=prices, chunk_size=50)
+    expected = _best_by_brute_force(customers, prices, 1.5, 0.8)
+
+    assert list(tiers["Segment"]) == sorted(expected)
+    for _, row in tiers.iterrows():
+        index = expected[row["Segment"]]
+        if index is None:
+            assert np.isnan(row["iiot_cost"])
+        else:
+            assert tuple(row[list(pricing_optimizer.PRICE_FIELDS)]) == tuple(prices[index])
+    assert tiers["Customers"].sum() == len(customers)
+
+
+def test_chunking_does_not_change_tiers(customers):
+    prices = pricing_optimizer.price_grid(steps=5)
+    whole = pricing_optimizer.optimize(customers, prices=prices)
+    chunked = pricing_optimizer.optimize(customers, prices=prices, chunk_size=100)
+    pd.testing.assert_frame_equal(whole, chunked)
+
+
+def test_no_tier_reaches_coverage(customers):
+    tiers = pricing_optimizer.optimize(customers, max_payback=0.0, prices=pricing_optimizer.price_grid(steps=3))
+    assert tiers[list(pricing_optimizer.PRICE_FIELDS)].isna().all().all()
+    assert (tiers["Buyers"] == 0).all()
+
+
+def test_unknown_payback_kind(customers):
+    with pytest.raises(ValueError):
+        pricing_optimizer.optimize(customers, payback_kind="irr")
@@ -0,0 +1,81 @@
+import importlib.util
+import os
+
+import numpy as np
+import pytest
+
+import result_cache
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache")
+    monkeypatch.setattr(result_cache, "CACHE_DIR", path)
+    return path
+
+
+def _load(path):
+    spec = importlib.util.spec_from_file_location(path.stem, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_equivalent_inputs_share_a_key():
+    assert result_cache.input_key("ns", {"x": 5000, "ys": [1, 2]}) == \
+        result_cache.input_key("ns", {"ys": np.array([1.0, 2.0]), "x": 5000.0})
+    assert result_cache.input_key("ns", {"x": 1.0}) != result_cache.input_key("ns", {"x": 1.0 + 1e-12})
+    assert result_cache.input_key("ns", {"x": 1}) != result_cache.input_key("other", {"x": 1})
+    with pytest.raises(TypeError):
+        result_cache.canonical(object())
+
+
+def test_call_styles_hit_the_same_entry(cache_dir):
+    calls = []
+
+    @result_cache.persistent()
+    def scale(values, factor=2):
+        calls.append(1)
+        return np.asarray(values) * factor
+
+    first = scale([1, 2, 3])
+    np.testing.assert_array_equal(scale(np.array([1.0, 2.0, 3.0]), factor=2.0), first)
+    np.testing.assert_array_equal(scale(values=[1, 2, 3], factor=2), first)
+    assert len(calls) == 1
+    scale([1, 2, 3], 3)
+    assert len(calls) == 2
+
+
+def test_fingerprint_changes_with_dependency_source(tmp_path):
+    dep = tmp_path / "cache_dep.py"
+    dep.write_text("RATE = 1\n")
+    module = _load(dep)
+    before = result_cache.fingerprint(test_fingerprint_changes_with_dependency_source, (module,))
+    assert result_cache.fingerprint(test_fingerprint_changes_with_dependency_source, (module,)) == before
+    dep.write_text("RATE = 2\n")
+    assert result_cache.fingerprint(test_fingerprint_changes_with_dependency_source, (module,)) != before
+
+
+def test_evict_removes_least_recently_used(cache_dir):
+    keys = [result_cache.input_key("ns", i) for i in range(4)]
+    for age, key in enumerate(keys):
+        result_cache.put(key, b"x" * 1000)
+        os.utime(result_cache._path(key), (1_000 + age, 1_000 + age))
+    # A hit makes the oldest entry the most recently used
+    assert result_cache.get(keys[0]) == b"x" * 1000
+
+    result_cache.evict(max_bytes=result_cache.size() // 2)
+    assert result_cache.get(keys[1]) is None and result_cache.get(keys[2]) is None
+    assert result_cache.get(keys[0]) is not None and result_cache.get(keys[3]) is not None
+    assert result_cache.clear() == 2 and result_cache.size() == 0
+
+
+def test_unreadable_entry_is_a_miss(cache_dir):
+    key = result_cache.input_key("ns", 1)
+    result_cache.put(key, 1)
+    with open(result_cache._path(key), "wb") as f:
+        f.write(b"not a pickle")
+    errors = result_cache.stats["errors"]
+    assert result_cache.get(key) is None
+    assert result_cache.stats["errors"] == errors + 1
+    assert oct(os.stat(cache_dir).st_mode & 0o777) == "0o700"
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+import roi_engine
+
+
+def _npv(flows, rate):
+    return (np.asarray(flows, dtype=float) / (1 + rate) ** np.arange(len(flows))).sum()
+
+
+def test_irr_root_between_negative_ends():
+    # NPV is negative near -100% and at 100%, positive at 0%
+    flows = [-100, 60, 60, -10]
+    rate = roi_engine.irr(flows)[0]
+    assert rate == pytest.approx(0.0725, abs=1e-3)
+    assert abs(_npv(flows, rate)) <= 1e-8 * np.abs(flows).sum()
+
+
+def test_irr_without_root_is_nan():
+    assert np.isnan(roi_engine.irr([-100, -5])[0])
+    assert np.isnan(roi_engine.irr([0, 0])[0])
+
+
+def test_irr_rows_are_roots_or_nan():
+    rng = np.random.default_rng(1)
+    flows = rng.normal(0, 100, (5_000, 11))
+    flows[:, 0] = -3 * np.abs(flows[:, 0])
+    rates = roi_engine.irr(flows)
+
+    solved = np.flatnonzero(np.isfinite(rates))
+    residual = np.array([_npv(flows[i], rates[i]) for i in solved])
+    assert (np.abs(residual) <= 1e-8 * np.abs(flows[solved]).sum(axis=1)).all()
+    # A positive undiscounted sum with a negative outlay always has a root above 0
+    assert not (np.isnan(rates) & (flows.sum(axis=1) > 0)).any()
+
+
+@pytest.mark.parametrize("cost_escalation", [0.05, 0.06, 0.07])
+def test_monthly_irr_with_cost_escalation(cost_escalation):
+    base = roi_engine.evaluate_inputs(roi_engine.DEFAULT_INPUTS)
+    result = roi_engine.monthly_cash_flows(
+        base["total_iiot_investment"], base["incremental_profit"], roi_engine.DEFAULT_INPUTS["annual_iiot_cost"],
+        30, 0.10, ramp_months=6, ramp_shape="linear", cost_escalation=cost_escalation)
+
+    flows = result["cash_flows"][0]
+    assert flows[-1] < 0
+    annual = result["irr"][0]
+    assert np.isfinite(annual)
+    assert abs(_npv(flows, (1 + annual) ** (1 / 12) - 1)) <= 1e-6 * np.abs(flows).sum()
+
+
+def test_monthly_irr_solved_across_escalation_range():
+    n = 1_000
+    result = roi_engine.monthly_cash_flows(
+        np.full(n, 5e5), np.full(n, 3e5), np.full(n, 5e4), 30, 0.10,
+        ramp_months=6, cost_escalation=np.linspace(0, 0.12, n))
+    assert (result["npv"] > 0).all()
+    assert np.isfinite(result["irr"]).all()
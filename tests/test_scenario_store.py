@@ -0,0 +1,52 @@
+import pytest
+
+import scenario_store
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = scenario_store.ScenarioStore(str(tmp_path / "scenarios.db"))
+    yield store
+    store.close()
+
+
+def test_save_load_round_trip(store):
+    inputs = {"annual_turnover": 5_000_000.0, "line_table": [{"Line": "A", "prod_unit": 10}]}
+    outputs = {"npv": 1234.5, "roi": 12.0, "irr": None, "payback": None}
+    scenario_id = store.save(" ACME Corp ", "new_app1.py", inputs, outputs, tags=["trade show", "q3"], name="Base")
+
+    scenario = store.load(scenario_id)
+    assert scenario["customer"] == "ACME Corp"
+    assert scenario["name"] == "Base"
+    assert scenario["inputs"] == inputs
+    assert scenario["outputs"] == outputs
+    assert scenario["npv"] == 1234.5 and scenario["payback"] is None
+    assert scenario["tags"] == ["q3", "trade show"]
+
+
+def test_search_by_prefix_tag_page_and_date(store):
+    first = store.save("ACME Corp", "new_app1.py", {}, {"npv": 1.0}, tags=["q3"])
+    second = store.save("Acme Tools", "example.py", {}, {"npv": 2.0})
+    store.save("Other", "new_app1.py", {}, {"npv": 3.0}, tags=["q3"])
+
+    assert [row["id"] for row in store.search(customer="acme")] == [second, first]
+    assert [row["id"] for row in store.search(customer="acme", tag="Q3")] == [first]
+    assert [row["id"] for row in store.search(customer="acme", page="example.py")] == [second]
+    today = store.load(first)["created_at"][:10]
+    assert len(store.search(since=today, until=today)) == 3
+    assert store.search(until="2000-01-01") == []
+    assert len(store.search(limit=2)) == 2
+
+
+def test_delete_drops_tags(store):
+    scenario_id = store.save("ACME", "app.py", {}, {}, tags=["q3"])
+    store.delete(scenario_id)
+    assert store.count() == 0
+    assert store.tags() == []
+    with pytest.raises(KeyError):
+        store.load(scenario_id)
+
+
+def test_customer_is_required(store):
+    with pytest.raises(ValueError):
+        store.save("  ", "app.py", {}, {})
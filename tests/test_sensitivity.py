@@ -0,0 +1,28 @@
+import numpy as np
+
+import roi_engine
+import sensitivity
+
+BASE = dict(roi_engine.DEFAULT_INPUTS, discount_rate=0.10)
+
+
+def test_default_metrics_skip_irr(monkeypatch):
+    calls = []
+    evaluate_inputs = roi_engine.evaluate_inputs
+
+    def spy(*args, **kwargs):
+        calls.append(kwargs.get("solve_irr", True))
+        return evaluate_inputs(*args, **kwargs)
+
+    monkeypatch.setattr(roi_engine, "evaluate_inputs", spy)
+    grid = sensitivity.one_way(BASE, steps=5)
+    sensitivity.two_way(BASE, "prod_inc_per", [10, 20], "annual_iiot_cost", [1e4, 2e4])
+    assert calls == [False, False]
+    assert set(sensitivity.METRICS.values()) <= set(grid)
+
+
+def test_irr_metric_matches_engine():
+    grid = sensitivity.two_way(BASE, "prod_inc_per", [10, 20], "annual_iiot_cost", [1e4, 2e4], metrics=("irr",))
+    inputs = dict(BASE, prod_inc_per=20, annual_iiot_cost=2e4)
+    expected = roi_engine.evaluate_inputs(inputs, discount_rate=inputs.pop("discount_rate"))["irr"]
+    np.testing.assert_allclose(grid["irr"][1, 1], expected[0])